@@ -1,52 +1,105 @@
-from lib.tuning import Tuning
-import usb.core
-import usb.util
-import numpy as np
-import matplotlib.pyplot as pyplot
-from gpiozero import PWMOutputDevice
-from time import sleep
-from lib.i2c_hapticmotordriver import HapticMotorDriver
-
-# Initialize the Haptic Motor Driver
-#hap_driver = HapticMotorDriver()  # Correctly instantiate the driver
-
-# USB device setup for microphone
-dev = usb.core.find(idVendor=0x2886, idProduct=0x0018)
-
-if dev:
-    Mic_tuning = Tuning(dev)
-    """ UNCOMMENT FOR VISUALIZED GRAPH (1)
+from lib.tuning import find
+from lib.doa_poller import DOAPoller
+from lib.haptic_mapping import HapticPanner
+from lib.metrics import METRICS
+
+# Motors around the wearer, one per TCA9548A channel, in degrees of the array's DOA
+MOTOR_ANGLES = [0, 90, 180, 270]
+
+def polar_plot():
+    """
+    Polar graph of the latest direction; matplotlib is only imported when plotting is asked for.
+
+    :return: Function drawing one direction in degrees
+    """
+    import numpy as np
+    import matplotlib.pyplot as pyplot
+
     # Initialize the plot
     fig1 = pyplot.figure()
     Polar_Graph = fig1.add_subplot(111, projection='polar')
     Polar_Graph.set_rticks([1])  # Aesthetic radius ticks
     Polar_Graph.set_title("Mic_tuning.direction Location", va='bottom')
+
+    def draw(direction):
+        # Clear the plot and redraw
+        Polar_Graph.clear()
+        Polar_Graph.set_rticks([1])
+        theta = np.radians(direction)  # More precise conversion
+        Polar_Graph.scatter([theta], [1], c='r')
+        Polar_Graph.set_title("Mic_tuning.direction Location", va='bottom')
+
+        pyplot.draw()
+        pyplot.pause(0.1)  # Adjust as necessary
+    return draw
+
+def motor_ring(bus):
+    """
+    Sets up the DA7280 behind every TCA9548A channel of MOTOR_ANGLES and keeps the motors that answer.
+
+    :param bus: SMBus-like object of the I2C bus of the multiplexer
+    :return: HapticScheduler (not started) of the motors that answered, or None when none did, and their angles
+    """
+    from lib.haptic_scheduler import HapticScheduler
+    channels = range(len(MOTOR_ANGLES))
+    scheduler = HapticScheduler(bus, channels)
+    ready = scheduler.setup()
+    missing = [channel for channel in channels if channel not in ready]
+    if missing:
+        print("No motor driver answering on channels {}, skipping them".format(missing))
+    if not ready:
+        return None, MOTOR_ANGLES
+    if missing:
+        scheduler = HapticScheduler(bus, ready)
+    return scheduler, [MOTOR_ANGLES[channel] for channel in ready]
+
+def main(plot=False, vibrate=False):
     """
-    while True:
-        try:
-            direction = Mic_tuning.direction
-            print(direction)  # Prints angle of direction of sound
-            
-            # Vibrate motor based on direction
-            if 90 < direction < 180:
-                print("Vibrate")
-                #Uncomment below for vibration
-                #hap_driver.set_vibration(127)  # Corrected method call
-            else:
-                print("")
-                #hap_driver.set_vibration(0)  # Corrected method call
-                
-            """UNCOMMENT FOR VISUALIZED GRAPH (2)
-            # Clear the plot and redraw
-            Polar_Graph.clear()
-            Polar_Graph.set_rticks([1])
-            theta = np.radians(direction)  # More precise conversion
-            Polar_Graph.scatter([theta], [1], c='r')
-            Polar_Graph.set_title("Mic_tuning.direction Location", va='bottom')
-
-            pyplot.draw()
-            pyplot.pause(0.1)  # Adjust as necessary
-            """
-        except KeyboardInterrupt:
-          #  motor.value = 0  # Ensure motor is turned off when exiting
-            break
+    :param plot: Show the direction on a polar graph
+    :param vibrate: Drive the motor ring through a HapticScheduler on I2C bus 1
+    """
+    scheduler, motor_angles = None, MOTOR_ANGLES
+    if vibrate:
+        from smbus2 import SMBus
+        scheduler, motor_angles = motor_ring(SMBus(1))
+        if scheduler is not None:
+            scheduler.start()
+    panner = HapticPanner(motor_angles, scheduler=scheduler)
+
+    # Angles and motor levels go to the metrics endpoint/dump (ECHO_METRICS_PORT, ECHO_METRICS_DUMP) instead of the console
+    METRICS.start_from_env()
+
+    poller = None
+    try:
+        # USB device setup for microphone
+        Mic_tuning = find()
+        if Mic_tuning is None:
+            print("No device found")
+            return
+
+        # Poll the board at a fixed rate in the background and only wake up on changes
+        poller = DOAPoller(Mic_tuning, rate=10, hysteresis=10).start()
+        draw = polar_plot() if plot else None
+        while True:
+            direction = poller.events.get().angle
+            METRICS.gauge("doa.angle", direction)  # Angle of direction of sound
+            METRICS.count("doa.events")
+
+            # Spread the direction over the motor ring; with a scheduler attached this drives the motors
+            levels = panner.update(direction)
+            METRICS.gauge("haptics.levels", levels)
+
+            if draw is not None:
+                draw(direction)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            scheduler.stop()  # Turns every motor off
+        if poller is not None:
+            poller.stop()
+            print(poller.stats())
+            print(METRICS.report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Single entry point of the ECHO tools. Every mode imports only the modules it needs
+when it runs, so `--help` or a tuning read does not pay for numpy, scipy, Tk,
+matplotlib or the I2C/USB libraries of the other modes.
+
+Usage: python echo.py {board,volume,replay,tuning,mux,run} ...
+
+    board [--plot] [--vibrate]      DOA angle of the ReSpeaker firmware, panned onto the motor ring
+    volume [--processes]            Loudest-microphone DOA with the threshold GUI
+    replay RECORDING.wav [...]      Offline replay of a recording, see replay.py
+    tuning [-p | -r | NAME [VALUE]] Read or write ReSpeaker parameters, see lib/tuning.py
+    mux CHANNEL [CHANNEL ...]       Pulse the haptic motors behind TCA9548A channels
+    run [--follow audio|board] [--vibrate] [--seconds S] [--processes]
+                                    Audio DOA, board DOA and haptics together in one asyncio runtime
+"""
+import sys
+import argparse
+
+def board(args, rest):
+    from boardDOA import main
+    main(plot=args.plot, vibrate=args.vibrate)
+
+def volume(args, rest):
+    from volumeDOA import main
+    main(processes=args.processes)
+
+def replay(args, rest):
+    from replay import main
+    main(rest)
+
+def tuning(args, rest):
+    from lib.tuning import main
+    main(rest)
+
+def mux(args, rest):
+    from lib.i2c_multiplexer import pulse
+    pulse(args.channels, args.intensity, args.seconds)
+
+def run(args, rest):
+    import asyncio
+    from lib.runtime import Runtime
+    from lib.tuning import find
+    from lib.replay import StageTimer
+    from lib.mp_pipeline import CaptureSource
+    from lib.metrics import METRICS
+    from replay import srp_pipeline
+
+    METRICS.start_from_env()
+    tuning = find()
+    if tuning is None and args.follow == "board":
+        sys.exit("No device found")
+    scheduler = panner = None
+    if args.vibrate:
+        from smbus2 import SMBus
+        from lib.haptic_mapping import HapticPanner
+        from boardDOA import motor_ring
+        # The runtime flushes the scheduler on its own I/O pool, so it is set up but not started
+        scheduler, motor_angles = motor_ring(SMBus(1))
+        panner = HapticPanner(motor_angles) if scheduler is not None else None
+    pipeline = None
+    if args.processes:
+        from lib.mp_pipeline import ProcessPipeline
+        from volumeDOA import bandpass_taps, initial_volume_threshold
+        from replay import mic_positions, MIC_CHANNELS
+        pipeline = ProcessPipeline(CaptureSource(), mic_positions(), bandpass_taps(), mic_channels=MIC_CHANNELS,
+                                   volume_threshold=initial_volume_threshold, start_method="spawn").start()
+        # The angles of the DOA process take the place of the audio chunks
+        source, process = pipeline.angles, float
+    else:
+        source, process = CaptureSource(), srp_pipeline(StageTimer())
+    runtime = Runtime(source, process, tuning, scheduler, panner, follow=args.follow)
+    try:
+        print(asyncio.run(runtime.run(args.seconds)))
+    except KeyboardInterrupt:
+        print(runtime.stats())
+    finally:
+        if pipeline is not None:
+            print(pipeline.metrics())
+            pipeline.stop()
+
+def parser():
+    parser = argparse.ArgumentParser(prog="echo.py", description="ECHO sound direction tools.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    sub = modes.add_parser("board", help="DOA of the ReSpeaker firmware, panned onto the motor ring")
+    sub.add_argument("--plot", action="store_true", help="Show the direction on a polar graph (matplotlib)")
+    sub.add_argument("--vibrate", action="store_true", help="Drive the motors on I2C bus 1")
+    sub.set_defaults(run=board)
+
+    sub = modes.add_parser("volume", help="Loudest-microphone DOA with the threshold GUI")
+    sub.add_argument("--processes", action="store_true",
+                     help="SRP-PHAT DOA with capture, DSP and DOA in separate processes")
+    sub.set_defaults(run=volume)
+
+    # These two hand their arguments over to the parser of the tool
+    sub = modes.add_parser("replay", help="Replay a recording through the DOA pipeline", add_help=False)
+    sub.set_defaults(run=replay, forward=True)
+
+    sub = modes.add_parser("tuning", help="Read or write ReSpeaker parameters", add_help=False)
+    sub.set_defaults(run=tuning, forward=True)
+
+    sub = modes.add_parser("mux", help="Pulse the haptic motors behind TCA9548A channels")
+    sub.add_argument("channels", type=int, nargs="+", help="Mux channels 0-7")
+    sub.add_argument("--intensity", type=int, default=50, help="Vibration intensity 0-255")
+    sub.add_argument("--seconds", type=float, default=2.0, help="Duration of every pulse")
+    sub.set_defaults(run=mux)
+
+    sub = modes.add_parser("run", help="Audio DOA, board DOA and haptics together in one asyncio runtime")
+    sub.add_argument("--follow", choices=["audio", "board"], default="audio", help="Angles driving the motors")
+    sub.add_argument("--vibrate", action="store_true", help="Drive the motors on I2C bus 1")
+    sub.add_argument("--seconds", type=float, help="Stop after this many seconds")
+    sub.add_argument("--processes", action="store_true",
+                     help="Capture, DSP and DOA in separate processes instead of the audio and DSP threads")
+    sub.set_defaults(run=run)
+    return parser
+
+def main(argv=None):
+    cli = parser()
+    args, rest = cli.parse_known_args(argv)
+    if rest and not getattr(args, "forward", False):
+        cli.error("unrecognized arguments: {}".format(" ".join(rest)))
+    args.run(args, rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
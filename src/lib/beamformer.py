@@ -0,0 +1,99 @@
+import numpy as np
+from lib.srp import ModeVector, Grid, tol
+
+class Beamformer:
+    """
+    Frequency-domain beamformer steered by a DOA estimate.
+
+    Steering vectors come from a ModeVector over a ring of quantized azimuths
+    (every `resolution` degrees). Delay-and-sum uses w = a / num_mics; MVDR uses
+    w = R^-1 a / (a^H R^-1 a) with a diagonally loaded spatial covariance R.
+    Weights are cached per quantized angle, so pointing the beam at an angle seen
+    before is a dictionary lookup; set_covariance() clears the MVDR weights.
+    A whole STFT block (num_mics, num_freq_bins, num_frames) is combined by one
+    batched matrix product. MVDR behaves as delay-and-sum until a covariance is set.
+    """
+
+    def __init__(self, L, fs, nfft, c=343.0, method="das", resolution=1.0, colatitude=np.pi / 2, loading=1e-2, mode="far", r=None):
+        """
+        :param L: Microphone positions, shape (2 or 3, num_mics)
+        :param fs: Sampling frequency
+        :param nfft: FFT length
+        :param c: Speed of sound
+        :param method: 'das' (delay-and-sum) or 'mvdr'
+        :param resolution: Quantization step of the steering azimuth in degrees
+        :param colatitude: Colatitude of the steering directions in radians
+        :param loading: Diagonal loading of the MVDR covariance, relative to its average power per bin
+        :param mode: 'far' or 'near' field mode vectors
+        :param r: Source distance of the near-field mode vectors
+        """
+        if method not in ("das", "mvdr"):
+            raise ValueError("Unknown beamformer '{}'.".format(method))
+        self.method = method
+        self.resolution = resolution
+        self.loading = loading
+        self.num_mics = L.shape[1]
+        steps = int(round(360 / resolution))
+        self.grid = Grid(np.radians(np.arange(steps) * resolution), colatitude, r if mode == "near" else None)
+        self.mode_vec = ModeVector(L, fs, nfft, c, self.grid, mode=mode)
+        self.R_inv = None
+        self._weights = {}  # Quantized angle index: weights of shape (num_freq_bins, num_mics)
+        self.hits = 0
+        self.misses = 0
+        self.azimuth = None  # Quantized azimuth of the last process() call
+
+    def angle_index(self, azimuth):
+        """
+        :param azimuth: Steering azimuth in degrees
+        :return: Index of the nearest quantized azimuth
+        """
+        return int(round(azimuth / self.resolution)) % self.grid.n_points
+
+    def set_covariance(self, R):
+        """
+        Sets the spatial covariance the MVDR weights are derived from.
+
+        :param R: Covariance matrices, shape (num_freq_bins, num_mics, num_mics), e.g. SpatialCovariance.R
+        """
+        power = np.real(np.einsum("fmm->f", R)) / self.num_mics
+        loaded = R + (self.loading * power + tol)[:, None, None] * np.eye(self.num_mics)
+        self.R_inv = np.linalg.inv(loaded)
+        if self.method == "mvdr":
+            self._weights.clear()
+
+    def weights(self, azimuth):
+        """
+        Beamformer weights for a steering azimuth, from the cache when possible.
+
+        :param azimuth: Steering azimuth in degrees
+        :return: Weights of shape (num_freq_bins, num_mics)
+        """
+        k = self.angle_index(azimuth)
+        w = self._weights.get(k)
+        if w is not None:
+            self.hits += 1
+            return w
+        self.misses += 1
+        a = np.exp(1j * self.mode_vec.omega[:, None] * self.mode_vec.tau[0, :, k])
+        if self.method == "mvdr" and self.R_inv is not None:
+            Ra = (self.R_inv @ a[:, :, None])[:, :, 0]
+            w = Ra / (np.sum(a.conj() * Ra, axis=1, keepdims=True) + tol)
+        else:
+            w = a / self.num_mics
+        self._weights[k] = w
+        return w
+
+    def process(self, X, azimuth):
+        """
+        Combines all channels of an STFT block into the beam pointing at azimuth.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :param azimuth: Steering azimuth in degrees
+        :return: Beamformed spectra. Shape: (num_freq_bins, num_frames)
+        """
+        w = self.weights(azimuth)
+        self.azimuth = self.angle_index(azimuth) * self.resolution
+        return (w.conj()[:, None, :] @ np.asarray(X).transpose(1, 0, 2))[:, 0, :]
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "angles": len(self._weights)}
@@ -0,0 +1,219 @@
+import threading
+from collections import deque
+import numpy as np
+
+# PortAudio callback constants, so this module imports without PyAudio
+PA_CONTINUE = 0
+PA_INPUT_OVERFLOW = 0x2
+
+class ChunkRing:
+    """
+    Preallocated ring of chunk-sized slots shared by one producer and one consumer.
+
+    Slots move between a free list and a ready queue (deques, whose append/popleft
+    are atomic), so neither side takes a lock on the audio path. The consumer gets a
+    view of a slot, which stays untouched until its next read() or release().
+
+    When the producer finds no free slot, the policy decides: 'drop-oldest' recycles
+    the oldest unread slot, 'block' waits up to block_timeout for the consumer and
+    then drops the new chunk. Every discarded chunk is counted in dropped_frames.
+    """
+
+    def __init__(self, chunk, channels, slots=16, policy="drop-oldest", block_timeout=0.05, dtype=np.int16):
+        """
+        :param chunk: Frames per slot
+        :param channels: Interleaved channels per frame
+        :param slots: Number of slots
+        :param policy: 'drop-oldest' or 'block'
+        :param block_timeout: Seconds the producer waits for a free slot under the 'block' policy
+        :param dtype: Sample type
+        """
+        if policy not in ("drop-oldest", "block"):
+            raise ValueError("Unknown backpressure policy '{}'.".format(policy))
+        self.chunk = chunk
+        self.channels = channels
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._slots = np.zeros((slots, chunk, channels), dtype=dtype)
+        self._lengths = np.zeros(slots, dtype=int)
+        self._free = deque(range(slots))
+        self._ready = deque()
+        self._held = None
+        self._data_event = threading.Event()
+        self._space_event = threading.Event()
+
+        self.frames_written = 0
+        self.frames_read = 0
+        self.dropped_frames = 0
+
+    def _take_slot(self):
+        try:
+            return self._free.popleft()
+        except IndexError:
+            pass
+        if self.policy == "drop-oldest":
+            try:
+                slot = self._ready.popleft()
+                self.dropped_frames += self._lengths[slot]
+                return slot
+            except IndexError:
+                return None  # The consumer raced us to the last ready slot
+        # Block: give the consumer a moment to release a slot
+        self._space_event.clear()
+        try:
+            return self._free.popleft()
+        except IndexError:
+            pass
+        if self._space_event.wait(self.block_timeout):
+            try:
+                return self._free.popleft()
+            except IndexError:
+                pass
+        return None
+
+    def write(self, data):
+        """
+        Producer side: copies one chunk into a slot.
+
+        :param data: Interleaved int16 bytes or an array of shape (frames, channels)
+        :return: True when the chunk was stored
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data, dtype=self._slots.dtype).reshape(-1, self.channels)
+        frames = data.shape[0]
+        slot = self._take_slot()
+        if slot is None:
+            self.dropped_frames += frames
+            return False
+        self._slots[slot, :frames] = data
+        self._lengths[slot] = frames
+        self.frames_written += frames
+        self._ready.append(slot)
+        self._data_event.set()
+        return True
+
+    def release(self):
+        """
+        Consumer side: hands the slot of the last read() back to the producer.
+        """
+        if self._held is not None:
+            self._free.append(self._held)
+            self._held = None
+            self._space_event.set()
+
+    def read(self, timeout=None):
+        """
+        Consumer side: returns the oldest unread chunk as a view into the ring.
+
+        :param timeout: Seconds to wait for data (None waits forever)
+        :return: View of shape (frames, channels), or None on timeout
+        """
+        self.release()
+        while True:
+            self._data_event.clear()
+            try:
+                slot = self._ready.popleft()
+                break
+            except IndexError:
+                if not self._data_event.wait(timeout):
+                    return None
+        self._held = slot
+        frames = self._lengths[slot]
+        self.frames_read += frames
+        return self._slots[slot, :frames]
+
+    def __len__(self):
+        """
+        Number of chunks waiting to be read.
+        """
+        return len(self._ready)
+
+class Capture:
+    """
+    PyAudio capture in callback mode, writing into a ChunkRing.
+
+    PortAudio calls back on its own thread with every chunk; the callback only copies
+    it into a preallocated slot and counts input overflows reported by the device.
+    Consumers call read() and get views, so a slow processing step shows up in the
+    overrun and dropped-frame counters instead of silently losing audio.
+    """
+
+    def __init__(self, rate=16000, channels=6, chunk=1024, device_index=None, width=2,
+                 slots=16, policy="drop-oldest", open_stream=None):
+        """
+        :param rate: Sampling rate
+        :param channels: Interleaved channels
+        :param chunk: Frames per callback
+        :param device_index: PyAudio input device index
+        :param width: Bytes per sample
+        :param slots: Chunks the ring can hold
+        :param policy: 'drop-oldest' or 'block' backpressure
+        :param open_stream: Function (callback) -> stream used instead of PyAudio, e.g. a fake for tests
+        """
+        self.rate = rate
+        self.channels = channels
+        self.chunk = chunk
+        self.device_index = device_index
+        self.width = width
+        self.ring = ChunkRing(chunk, channels, slots, policy)
+        self.open_stream = open_stream
+        self.overruns = 0  # Callbacks flagged with an input overflow by PortAudio
+        self.callbacks = 0
+        self._pa = None
+        self.stream = None
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        self.callbacks += 1
+        if status_flags & PA_INPUT_OVERFLOW:
+            self.overruns += 1
+        self.ring.write(in_data)
+        return None, PA_CONTINUE
+
+    def start(self):
+        if self.open_stream is not None:
+            self.stream = self.open_stream(self._callback)
+        else:
+            import pyaudio
+            self._pa = pyaudio.PyAudio()
+            self.stream = self._pa.open(
+                rate=self.rate,
+                format=self._pa.get_format_from_width(self.width),
+                channels=self.channels,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.chunk,
+                stream_callback=self._callback
+            )
+        self.stream.start_stream()
+        return self
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def read(self, timeout=None):
+        """
+        :return: View of the next chunk with shape (frames, channels), or None on timeout
+        """
+        return self.ring.read(timeout)
+
+    def stats(self):
+        return {
+            "callbacks": self.callbacks,
+            "overruns": self.overruns,
+            "frames_written": self.ring.frames_written,
+            "frames_read": self.ring.frames_read,
+            "dropped_frames": self.ring.dropped_frames,
+            "queued_chunks": len(self.ring),
+        }
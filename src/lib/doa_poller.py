@@ -0,0 +1,150 @@
+import time
+import queue
+import threading
+from collections import namedtuple
+
+DOAEvent = namedtuple("DOAEvent", ["angle", "time"])
+
+def angle_distance(a, b):
+    """
+    Smallest distance between two angles in degrees.
+    """
+    return abs((a - b + 180) % 360 - 180)
+
+class DOAPoller:
+    """
+    Background sampler of the board DOA angle (Tuning.direction).
+
+    Polls at a fixed rate in its own thread and only publishes meaningful changes:
+    a new angle must differ from the last published one by at least `hysteresis`
+    degrees and be confirmed by `confirm` consecutive readings. Events go to a
+    bounded queue (the oldest event is dropped when it is full) and to an optional
+    callback, so consumers react to changes instead of polling the USB bus.
+    """
+
+    def __init__(self, tuning, rate=10.0, hysteresis=10.0, confirm=2, maxsize=16, callback=None):
+        """
+        :param tuning: Tuning instance (or anything with a `direction` property)
+        :param rate: Polls per second
+        :param hysteresis: Minimum change in degrees before a new angle is published
+        :param confirm: Consecutive readings required to accept a change
+        :param maxsize: Capacity of the event queue
+        :param callback: Function called with every DOAEvent, from the poller thread
+        """
+        self.tuning = tuning
+        self.period = 1.0 / rate
+        self.hysteresis = hysteresis
+        self.confirm = confirm
+        self.callback = callback
+        self.events = queue.Queue(maxsize=maxsize)
+
+        self.angle = None  # Last published angle
+        self._candidate = None
+        self._candidate_count = 0
+
+        self.polls = 0
+        self.published = 0
+        self.dropped = 0
+        self.errors = 0
+        self.cpu_time = 0.0  # CPU seconds used by the poller thread
+        self.started = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="DOAPoller", daemon=True)
+
+    def start(self):
+        self.started = time.monotonic()
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def update(self, angle, now=None):
+        """
+        Feeds one reading through the hysteresis filter.
+
+        :param angle: DOA angle in degrees
+        :param now: Time stamp of the reading (default time.monotonic())
+        :return: DOAEvent when the reading is published, None otherwise
+        """
+        if self.angle is not None and angle_distance(angle, self.angle) < self.hysteresis:
+            self._candidate = None
+            return None
+
+        # A change has to persist for `confirm` readings before it is published
+        if self._candidate is not None and angle_distance(angle, self._candidate) < self.hysteresis:
+            self._candidate_count += 1
+        else:
+            self._candidate = angle
+            self._candidate_count = 1
+        if self.angle is not None and self._candidate_count < self.confirm:
+            return None
+
+        self.angle = angle
+        self._candidate = None
+        event = DOAEvent(angle, time.monotonic() if now is None else now)
+        self._publish(event)
+        return event
+
+    def _publish(self, event):
+        self.published += 1
+        while True:
+            try:
+                self.events.put_nowait(event)
+                break
+            except queue.Full:
+                try:
+                    self.events.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        if self.callback is not None:
+            self.callback(event)
+
+    def _run(self):
+        cpu_start = time.thread_time()
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                angle = self.tuning.direction
+            except Exception:
+                self.errors += 1  # USB hiccup, try again on the next tick
+            else:
+                self.polls += 1
+                if angle is not None:
+                    self.update(angle)
+            self.cpu_time = time.thread_time() - cpu_start
+
+            # Fixed rate without drift; skip ticks that were missed entirely
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                deadline = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def stats(self):
+        """
+        Poll, event and CPU statistics since start.
+
+        :return: Dictionary of counters and rates
+        """
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        transfers = getattr(self.tuning, "transfers", self.polls)
+        return {
+            "polls": self.polls,
+            "published": self.published,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "polls_per_sec": self.polls / elapsed if elapsed else 0.0,
+            "transfers_per_sec": transfers / elapsed if elapsed else 0.0,
+            "cpu_percent": 100.0 * self.cpu_time / elapsed if elapsed else 0.0,
+        }
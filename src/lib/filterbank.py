@@ -0,0 +1,120 @@
+import inspect
+import numpy as np
+
+# numpy >= 2.0 can write the FFT straight into a preallocated array
+_FFT_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+class FIRFilterBank:
+    """
+    Stateful FIR filter applied to all channels of a chunked audio stream at once.
+
+    Chunks are filtered as one continuous signal: the state left by one chunk is the
+    initial state of the next, so there are no transients at chunk boundaries and the
+    output matches filtering the concatenated recording offline.
+
+    Two methods are available. 'direct' runs lfilter along the sample axis of all
+    channels with a carried zi. 'fft' uses overlap-save FFT convolution, where the
+    state is simply the last len(b) - 1 input samples. Both write into a preallocated
+    output buffer that is reused by the next call.
+    """
+
+    def __init__(self, b, num_channels, chunk=1024, method="fft", dtype=np.float64):
+        """
+        Initializes the filter state and buffers.
+
+        :param b: FIR filter taps
+        :param num_channels: Number of channels, the second axis of every chunk
+        :param chunk: Largest number of samples per channel filtered at once
+        :param method: 'fft' for overlap-save convolution or 'direct' for lfilter
+        :param dtype: Floating point type of the output
+        """
+        if method not in ("fft", "direct"):
+            raise ValueError("Unknown filter method '{}'.".format(method))
+
+        self.b = np.asarray(b, dtype=dtype)
+        self.num_channels = num_channels
+        self.chunk = chunk
+        self.method = method
+        self.order = self.b.shape[0] - 1
+
+        # Last `order` input samples of every channel, oldest first
+        self.history = np.zeros((self.order, num_channels), dtype=dtype)
+        self._out = np.empty((chunk, num_channels), dtype=dtype)
+
+        if method == "direct":
+            from scipy.signal import lfilter  # Only the direct method needs scipy
+            self._lfilter = lfilter
+            self.zi = np.zeros((self.order, num_channels), dtype=dtype)
+            # Maps the input history to the lfilter state of the transposed direct form
+            self._zi_map = np.zeros((self.order, self.order), dtype=dtype)
+            for k in range(self.order):
+                for j in range(self.order - k):
+                    self._zi_map[k, self.order - 1 - j] = self.b[k + 1 + j]
+        else:
+            self.nfft = 1 << int(np.ceil(np.log2(self.order + chunk)))
+            self.B = np.fft.rfft(self.b, self.nfft)[:, None]
+            self._block = np.zeros((self.nfft, num_channels), dtype=dtype)
+            self._spec = np.empty((self.nfft // 2 + 1, num_channels), dtype=np.result_type(dtype, np.complex64))
+            self._conv = np.empty((self.nfft, num_channels), dtype=dtype)
+
+    def reset(self):
+        """
+        Clears the filter state, as if the stream started over.
+        """
+        self.history[:] = 0
+        if self.method == "direct":
+            self.zi[:] = 0
+
+    def _update_history(self, x):
+        """
+        Shifts the newest input samples into the history.
+        """
+        n = x.shape[0]
+        if n >= self.order:
+            self.history[:] = x[n - self.order:]
+        else:
+            self.history[:-n] = self.history[n:]
+            self.history[-n:] = x
+
+    def process(self, x):
+        """
+        Filters one chunk of all channels, continuing from the previous chunk.
+
+        :param x: Chunk of shape (samples, num_channels), any numeric dtype
+        :return: View of the filtered chunk with shape (samples, num_channels), overwritten by the next call
+        """
+        n = x.shape[0]
+        if n > self.chunk:
+            raise ValueError("Chunk of {} samples exceeds the configured maximum of {}.".format(n, self.chunk))
+        out = self._out[:n]
+
+        if self.method == "direct":
+            y, self.zi = self._lfilter(self.b, 1, x, axis=0, zi=self.zi)
+            out[:] = y
+        else:
+            # Overlap-save: the history followed by the chunk, zero padded to nfft
+            block = self._block
+            block[:self.order] = self.history
+            block[self.order:self.order + n] = x
+            block[self.order + n:] = 0
+            if _FFT_OUT:
+                np.fft.rfft(block, axis=0, out=self._spec)
+                self._spec *= self.B
+                np.fft.irfft(self._spec, self.nfft, axis=0, out=self._conv)
+            else:
+                self._conv[:] = np.fft.irfft(np.fft.rfft(block, axis=0) * self.B, self.nfft, axis=0)
+            out[:] = self._conv[self.order:self.order + n]
+
+        self._update_history(x)
+        return out
+
+    def skip(self, x):
+        """
+        Advances the filter state over a chunk without computing its output, so that
+        filtering can resume later exactly as if the chunk had been filtered.
+
+        :param x: Chunk of shape (samples, num_channels)
+        """
+        self._update_history(x)
+        if self.method == "direct":
+            self.zi = self._zi_map @ self.history
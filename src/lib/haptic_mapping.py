@@ -0,0 +1,124 @@
+import numpy as np
+
+def pan_weights(angles, motor_angles, law="pair", width=90.0):
+    """
+    Panning weights of a ring of motors for a batch of directions.
+
+    'pair' spreads a direction over the two motors around it with constant power
+    (sin/cos of the position between them); 'cosine' gives every motor within
+    width / 2 degrees a raised-cosine share.
+
+    :param angles: Directions in degrees, shape (n,)
+    :param motor_angles: Direction of every motor in degrees, shape (num_motors,)
+    :param law: 'pair' or 'cosine'
+    :param width: Lobe width in degrees of the 'cosine' law
+    :return: Weights in [0, 1], shape (n, num_motors)
+    """
+    angles = np.asarray(angles, dtype=float)[:, None] % 360
+    motor_angles = np.asarray(motor_angles, dtype=float) % 360
+    if law == "cosine":
+        distance = np.abs((motor_angles[None, :] - angles + 180) % 360 - 180)
+        return np.where(distance < width / 2, 0.5 + 0.5 * np.cos(2 * np.pi * distance / width), 0.0)
+    if law != "pair":
+        raise ValueError("Unknown panning law '{}'.".format(law))
+
+    if motor_angles.shape[0] == 1:
+        return np.ones((angles.shape[0], 1))
+
+    # Neighbouring motors around the ring, in angular order
+    order = np.argsort(motor_angles)
+    ring = motor_angles[order]
+    gaps = (np.roll(ring, -1) - ring) % 360
+    offset = (angles - ring[None, :]) % 360
+    # The motor a direction starts from is the last one at or before it
+    start = np.argmin(np.where(offset < gaps[None, :], offset, np.inf), axis=1)
+    frac = offset[np.arange(angles.shape[0]), start] / gaps[start]
+
+    weights = np.zeros((angles.shape[0], motor_angles.shape[0]))
+    rows = np.arange(angles.shape[0])
+    weights[rows, order[start]] = np.cos(0.5 * np.pi * frac)
+    weights[rows, order[(start + 1) % ring.shape[0]]] += np.sin(0.5 * np.pi * frac)
+    return weights
+
+class HapticPanner:
+    """
+    Maps a DOA angle and a confidence to the intensities of a ring of haptic motors.
+
+    The panning weights of every direction step are precomputed into a lookup table
+    of shape (360 / resolution, num_motors), rebuilt only when the motor layout or
+    panning settings change. An update is then one table row scaled by the
+    confidence, and is handed to a HapticScheduler when one is attached.
+    """
+
+    def __init__(self, motor_angles, resolution=1.0, law="pair", width=90.0, max_intensity=255,
+                 min_confidence=0.0, scheduler=None):
+        """
+        :param motor_angles: Direction of every motor in degrees, in motor (scheduler) order
+        :param resolution: Direction step of the lookup table in degrees
+        :param law: Panning law, 'pair' or 'cosine'
+        :param width: Lobe width in degrees of the 'cosine' law
+        :param max_intensity: Intensity of a motor at full weight and confidence
+        :param min_confidence: Confidence below which every motor is off
+        :param scheduler: HapticScheduler receiving the intensities of update()
+        """
+        self.resolution = resolution
+        self.law = law
+        self.width = width
+        self.max_intensity = max_intensity
+        self.min_confidence = min_confidence
+        self.scheduler = scheduler
+        self.builds = 0
+        self._motor_angles = None
+        self.set_layout(motor_angles)
+
+    def set_layout(self, motor_angles, law=None, width=None):
+        """
+        Changes the motor layout or panning law, rebuilding the lookup table if anything changed.
+        """
+        motor_angles = np.asarray(motor_angles, dtype=float)
+        law = self.law if law is None else law
+        width = self.width if width is None else width
+        if (self._motor_angles is not None and law == self.law and width == self.width
+                and np.array_equal(motor_angles, self._motor_angles)):
+            return
+        self._motor_angles, self.law, self.width = motor_angles, law, width
+        steps = int(round(360 / self.resolution))
+        self.table = pan_weights(np.arange(steps) * self.resolution, motor_angles, law, width)
+        self.builds += 1
+
+    @property
+    def motor_angles(self):
+        return self._motor_angles
+
+    def intensities(self, angle, confidence=1.0):
+        """
+        :param angle: DOA angle in degrees
+        :param confidence: Confidence of the estimate in [0, 1]
+        :return: Integer intensity of every motor
+        """
+        if confidence < self.min_confidence:
+            return np.zeros(self.table.shape[1], dtype=int)
+        row = self.table[int(round(angle / self.resolution)) % self.table.shape[0]]
+        return (row * (min(confidence, 1.0) * self.max_intensity)).astype(int)
+
+    def intensities_batch(self, angles, confidences=None):
+        """
+        :param angles: DOA angles in degrees, shape (n,)
+        :param confidences: Confidences in [0, 1], shape (n,) (None for full confidence)
+        :return: Integer intensities, shape (n, num_motors)
+        """
+        rows = np.rint(np.asarray(angles) / self.resolution).astype(int) % self.table.shape[0]
+        scale = np.ones(rows.shape[0]) if confidences is None else np.minimum(np.asarray(confidences, dtype=float), 1.0)
+        scale = np.where(scale < self.min_confidence, 0.0, scale) * self.max_intensity
+        return (self.table[rows] * scale[:, None]).astype(int)
+
+    def update(self, angle, confidence=1.0):
+        """
+        Renders one DOA estimate, sending it to the attached scheduler.
+
+        :return: Integer intensity of every motor
+        """
+        levels = self.intensities(angle, confidence)
+        if self.scheduler is not None:
+            self.scheduler.set_all(levels)
+        return levels
@@ -0,0 +1,184 @@
+import time
+import threading
+import numpy as np
+
+try:
+    from lib.metrics import METRICS
+    from lib.i2c_hapticmotordriver import HapticMotorDriver, driver_init
+except ImportError:  # Run from inside lib/
+    from metrics import METRICS
+    from i2c_hapticmotordriver import HapticMotorDriver, driver_init
+
+class HapticScheduler:
+    """
+    Drives a set of haptic motors behind a TCA9548A multiplexer from a fixed-rate thread.
+
+    The DSP side only stores the wanted intensity of each motor with set() or
+    set_all(); nothing touches the bus on that thread. Every tick the scheduler
+    compares the wanted intensities with the last ones written, skips motors that
+    did not change, and writes the others grouped by mux channel, starting with
+    the channel that is already selected, so each channel is selected at most once.
+
+    The naive path (one mux select and one TOP_CTL2 write per motor update, as
+    i2c_multiplexer.py does) is tracked alongside, and transactions_saved() is the
+    difference to what was actually sent.
+    """
+
+    def __init__(self, bus, motors, rate=50.0, mux_address=HapticMotorDriver.Multiplexer_Address):
+        """
+        :param bus: SMBus-like object with write_byte, write_byte_data and read_byte_data
+        :param motors: Mux channel of every motor, or (channel, I2C address) pairs
+        :param rate: Ticks per second of the output thread
+        :param mux_address: I2C address of the multiplexer
+        """
+        self.bus = bus
+        self.period = 1.0 / rate
+        self.mux_address = mux_address
+        motors = [m if isinstance(m, tuple) else (m, HapticMotorDriver.DEVICE_ADDRESS) for m in motors]
+        self.channels = np.array([channel for channel, _ in motors])
+        self.addresses = [address for _, address in motors]
+        if np.any((self.channels < 0) | (self.channels > 7)):
+            raise ValueError("Channel must be 0-7")
+
+        self._desired = np.zeros(len(motors), dtype=int)
+        self._written = np.full(len(motors), -1)  # -1: unknown, always written on the next tick
+        self._selected = None  # Mux channel currently selected, None when unknown
+
+        self.requested = 0  # Motor updates asked for by set()/set_all()
+        self.register_writes = 0
+        self.mux_writes = 0
+        self.bus_errors = 0
+        self.ticks = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="HapticScheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, silence=True, timeout=1.0):
+        """
+        Stops the output thread, optionally turning every motor off first.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        if silence:
+            self._desired[:] = 0
+            self.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def set(self, motor, intensity):
+        """
+        Sets the wanted intensity of one motor; it is written on the next tick.
+
+        :param motor: Index of the motor
+        :param intensity: Intensity 0-255
+        """
+        self._desired[motor] = max(0, min(int(intensity), 255))
+        self.requested += 1
+
+    def set_all(self, intensities):
+        """
+        Sets the wanted intensities of all motors at once.
+
+        :param intensities: One intensity 0-255 per motor
+        """
+        self._desired[:] = np.clip(intensities, 0, 255)
+        self.requested += self._desired.shape[0]
+
+    def setup(self):
+        """
+        Checks the chip revision of every motor driver and puts it in DRO mode with frequency tracking.
+
+        :return: Indices of the motors that answered with the expected revision
+        """
+        ready = []
+        for motor, (channel, address) in enumerate(zip(self.channels, self.addresses)):
+            try:
+                self._select(channel)
+                if driver_init(self.bus, address):
+                    ready.append(motor)
+            except OSError:
+                self.bus_errors += 1
+                self._selected = None
+        return ready
+
+    def _select(self, channel):
+        if channel != self._selected:
+            self.bus.write_byte(self.mux_address, 1 << int(channel))
+            self.mux_writes += 1
+            self._selected = channel
+
+    def flush(self):
+        """
+        Writes every motor whose wanted intensity differs from the last written one.
+
+        :return: Number of bus transactions sent
+        """
+        self.ticks += 1
+        desired = self._desired.copy()
+        dirty = np.flatnonzero(desired != self._written)
+        if dirty.shape[0] == 0:
+            return 0
+
+        t0 = METRICS.start()
+        sent = self.register_writes + self.mux_writes
+        errors = self.bus_errors
+        # The selected channel goes first, the others in ascending order
+        channels = np.unique(self.channels[dirty])
+        if self._selected in channels:
+            channels = [self._selected] + [c for c in channels if c != self._selected]
+        for channel in channels:
+            try:
+                self._select(channel)
+            except OSError:
+                self.bus_errors += 1
+                self._selected = None
+                continue  # Retried on the next tick, the motors stay dirty
+            for motor in dirty[self.channels[dirty] == channel]:
+                try:
+                    self.bus.write_byte_data(self.addresses[motor], HapticMotorDriver.TOP_CTL2, int(desired[motor]))
+                    self.register_writes += 1
+                    self._written[motor] = desired[motor]
+                except OSError:
+                    self.bus_errors += 1
+                    self._written[motor] = -1
+        METRICS.stop("i2c.flush", t0)
+        if self.bus_errors != errors:
+            METRICS.count("i2c.errors", self.bus_errors - errors)
+        return self.register_writes + self.mux_writes - sent
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            self.flush()
+            # Fixed rate without drift; skip ticks that were missed entirely
+            deadline += self.period
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                deadline = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def transactions_saved(self):
+        """
+        Bus transactions avoided compared with a mux select and a register write per motor update.
+        """
+        return 2 * self.requested - (self.register_writes + self.mux_writes)
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "requested": self.requested,
+            "register_writes": self.register_writes,
+            "mux_writes": self.mux_writes,
+            "bus_errors": self.bus_errors,
+            "transactions_saved": self.transactions_saved(),
+        }
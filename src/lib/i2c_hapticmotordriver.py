@@ -1,4 +1,7 @@
-from smbus2 import SMBus
+try:
+    from lib.metrics import METRICS
+except ImportError:  # Run from inside lib/
+    from metrics import METRICS
 
 class HapticMotorDriver:
     DEVICE_ADDRESS = 0x4A
@@ -17,8 +20,17 @@ class HapticMotorDriver:
     
     
 
-    def __init__(self):
-        self.bus = SMBus(1)  # 1 indicates /dev/i2c-1
+    def __init__(self, bus=None, channel=None):
+        """
+        :param bus: SMBus-like object, /dev/i2c-1 when None
+        :param channel: Mux channel currently selected in front of the driver, None without a mux
+        """
+        if bus is None:
+            from smbus2 import SMBus
+            bus = SMBus(1)  # 1 indicates /dev/i2c-1
+        self.bus = bus
+        self.channel = channel
+        self.intensity = {}  # Last intensity written to TOP_CTL2, per mux channel
         if self._driver_init():
             print("Haptic Motor Driver initialized successfully.")
         else:
@@ -37,22 +49,42 @@ class HapticMotorDriver:
         self.bus.write_byte_data(self.DEVICE_ADDRESS, register, value)
 
     def _driver_init(self):
-        chip_rev = self._read_register(self.CHIP_REV_REG)
-        if chip_rev == self.EXPECTED_CHIP_REV:
-            # Set Operation Mode
-            self._write_register(self.TOP_CTL1, self.DRO_MODE)
-            # Enable Frequency Tracking
-            self._enable_freq_track(True)
-            return True
-        else:
-            return False
+        return driver_init(self.bus, self.DEVICE_ADDRESS)
 
     def _enable_freq_track(self, enable):
-        current_value = self._read_register(self.TOP_CFG1)
-        new_value = current_value | (1 << 3) if enable else current_value & ~(1 << 3)
-        self._write_register(self.TOP_CFG1, new_value)
+        enable_freq_track(self.bus, self.DEVICE_ADDRESS, enable)
 
     def set_vibration(self, intensity):
         intensity = max(0, min(intensity, 255))  # Ensure intensity is within bounds
-        self._write_register(self.TOP_CTL2, intensity)
-        print(f"Vibration intensity set to {intensity}.")
+        if self.intensity.get(self.channel) == intensity:
+            return  # Already set on this channel, skip the bus write
+        t0 = METRICS.start()
+        try:
+            self._write_register(self.TOP_CTL2, intensity)
+        except OSError:
+            METRICS.count("i2c.errors")
+            raise
+        METRICS.stop("i2c.write", t0)
+        self.intensity[self.channel] = intensity
+
+def driver_init(bus, address=HapticMotorDriver.DEVICE_ADDRESS):
+    """
+    Checks the chip revision of a DA7280 and puts it in DRO mode with frequency tracking.
+
+    :param bus: SMBus-like object, with the mux channel of the driver already selected
+    :param address: I2C address of the driver
+    :return: True when the driver answered with the expected revision
+    """
+    chip_rev = bus.read_byte_data(address, HapticMotorDriver.CHIP_REV_REG)
+    if chip_rev != HapticMotorDriver.EXPECTED_CHIP_REV:
+        return False
+    # Set Operation Mode
+    bus.write_byte_data(address, HapticMotorDriver.TOP_CTL1, HapticMotorDriver.DRO_MODE)
+    # Enable Frequency Tracking
+    enable_freq_track(bus, address, True)
+    return True
+
+def enable_freq_track(bus, address, enable):
+    current_value = bus.read_byte_data(address, HapticMotorDriver.TOP_CFG1)
+    new_value = current_value | (1 << 3) if enable else current_value & ~(1 << 3)
+    bus.write_byte_data(address, HapticMotorDriver.TOP_CFG1, new_value)
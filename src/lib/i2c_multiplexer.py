@@ -1,19 +1,21 @@
-from tuning import Tuning
-import usb.core
-import usb.util
-import numpy as np
-import matplotlib.pyplot as pyplot
-from gpiozero import PWMOutputDevice
-from time import sleep
-from i2c_hapticmotordriver import HapticMotorDriver 
-
-import smbus
 import time
 
+try:
+    from lib.i2c_hapticmotordriver import HapticMotorDriver
+except ImportError:  # Run from inside lib/
+    from i2c_hapticmotordriver import HapticMotorDriver
+
 class TCA9548:
     def __init__(self, address=0x70, bus=1):
+        """
+        :param address: I2C address of the multiplexer
+        :param bus: I2C bus number, or an SMBus-like object
+        """
         self.address = address
-        self.bus = smbus.SMBus(bus)
+        if isinstance(bus, int):
+            import smbus
+            bus = smbus.SMBus(bus)
+        self.bus = bus
         self.channels = 8
 
     def select_channel(self, channel):
@@ -21,52 +23,39 @@ class TCA9548:
         if channel >= self.channels:
             raise ValueError("Channel must be 0-7")
         self.bus.write_byte(self.address, 1 << channel)
-    
+
     def disable_all_channels(self):
         """Disables all channels."""
         self.bus.write_byte(self.address, 0x00)
 
+def pulse(channels=(2, 3), intensity=50, seconds=2.0, mux=None):
+    """
+    Vibrates the motor behind every channel in turn for a while, then turns it off.
+
+    :param channels: Mux channels to pulse
+    :param intensity: Vibration intensity 0-255
+    :param seconds: Duration of every pulse
+    :param mux: TCA9548 to use, one on bus 1 when None
+    """
+    mux = TCA9548() if mux is None else mux
+    for channel in channels:
+        hap = None
+        try:
+            mux.select_channel(channel)
+            print("Channel {} selected.".format(channel))
+            # I2C communication with the device on the selected channel
+            hap = HapticMotorDriver(mux.bus, channel)
+            hap.set_vibration(intensity)
+        except Exception as e:
+            print(e)
+        finally:
+            time.sleep(seconds)
+            if hap is not None:
+                hap.set_vibration(0)
+    # Disable all channels when done
+   # mux.disable_all_channels()
+    print("All channels disabled.")
+
 # Example usage
 if __name__ == "__main__":
-    mux = TCA9548()
-    
-    try:
-        # Select channel 3
-        mux.select_channel(2)
-        print("Channel 3 selected.")
-        # Add your I2C communication code here to communicate with devices on channel 3
-        hap = HapticMotorDriver()
-        hap.set_vibration(50)
-    except Exception as e:
-        print(e)
-    finally:
-        time.sleep(2)
-        hap.set_vibration(0)
-        # Disable all channels when done
-       # mux.disable_all_channels()
-        print("All channels disabled.")
-
-    try:
-        # Select channel 3
-        mux.select_channel(3)
-        print("Channel 3 selected.")
-        # Add your I2C communication code here to communicate with devices on channel 3
-        hap = HapticMotorDriver()
-        hap.set_vibration(50)
-    except Exception as e:
-        print(e)
-    finally:
-        time.sleep(2)
-        hap.set_vibration(0)
-        # Disable all channels when done
-       # mux.disable_all_channels()
-        print("All channels disabled.")
-        
-
-
-#
-    
-
-
-
-
+    pulse()
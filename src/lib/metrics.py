@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import threading
+
+class Histogram:
+    """
+    Rolling window of the last `size` samples of one measurement, plus running totals.
+    """
+
+    def __init__(self, size=1024):
+        self._values = [0.0] * size  # A list takes a float faster than an ndarray
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self._values[self.count % len(self._values)] = value
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, q=(50, 95, 99)):
+        """
+        :return: Percentiles of the samples in the window, zeros when empty
+        """
+        window = self._values[:min(self.count, len(self._values))]
+        if not window:
+            return [0.0] * len(q)
+        import numpy as np  # Only when read, the instrumented CLI modes may not need numpy otherwise
+        return [float(v) for v in np.percentile(window, q)]
+
+class Metrics:
+    """
+    Process-wide timers, counters and gauges for the hot loops.
+
+    Timing a stage is two calls, t0 = start() and stop(name, t0), so a disabled
+    registry costs one attribute check per call. Timers keep a rolling histogram
+    (p50/p95/p99 over the last `window` samples); counters only grow; gauges hold the
+    latest value of something (DOA angle, dropped frames). The state is read
+    through snapshot(), a local HTTP endpoint (serve) or a periodic JSON dump.
+    """
+
+    def __init__(self, enabled=True, window=1024):
+        """
+        :param enabled: Record anything at all
+        :param window: Samples kept per timer for the percentiles
+        """
+        self.enabled = enabled
+        self.window = window
+        self.timers = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """
+        :return: Start time for stop(), 0 when disabled
+        """
+        return time.perf_counter() if self.enabled else 0
+
+    def stop(self, name, t0):
+        """
+        Records the time since start() under the given timer name.
+        """
+        if self.enabled and t0:
+            self.observe(name, time.perf_counter() - t0)
+
+    def observe(self, name, value):
+        """
+        Adds one sample to a histogram, e.g. a latency in seconds.
+        """
+        if not self.enabled:
+            return
+        hist = self.timers.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.timers.setdefault(name, Histogram(self.window))
+        hist.add(value)
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function under the given name.
+        """
+        def decorator(func):
+            def timed(*args, **kwargs):
+                t0 = self.start()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.stop(name, t0)
+            return timed
+        return decorator
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.gauges.clear()
+        self.started = time.monotonic()
+
+    def snapshot(self):
+        """
+        :return: JSON-serializable dictionary of all timers (seconds), counters and gauges
+        """
+        timers = {}
+        for name, hist in list(self.timers.items()):
+            p50, p95, p99 = hist.percentiles()
+            timers[name] = {"count": hist.count, "total": hist.total, "max": hist.max,
+                            "p50": p50, "p95": p95, "p99": p99}
+        return {
+            "enabled": self.enabled,
+            "uptime": time.monotonic() - self.started,
+            "timers": timers,
+            "counters": dict(self.counters),
+            "gauges": {name: _plain(value) for name, value in list(self.gauges.items())},
+        }
+
+    def report(self):
+        """
+        :return: Human readable table of the snapshot
+        """
+        snap = self.snapshot()
+        lines = ["{:28} {:>8} {:>10} {:>10} {:>10}".format("timer", "count", "p50 [ms]", "p95 [ms]", "p99 [ms]")]
+        for name, t in sorted(snap["timers"].items()):
+            lines.append("{:28} {:8} {:10.3f} {:10.3f} {:10.3f}".format(
+                name, t["count"], 1e3 * t["p50"], 1e3 * t["p95"], 1e3 * t["p99"]))
+        for name, value in sorted(snap["counters"].items()):
+            lines.append("{:28} {:8}".format(name, value))
+        for name, value in sorted(snap["gauges"].items()):
+            lines.append("{:28} {}".format(name, value))
+        return "\n".join(lines)
+
+    def serve(self, port=8765, host="127.0.0.1"):
+        """
+        Serves the snapshot over HTTP from a daemon thread: JSON at /metrics, the text report elsewhere.
+
+        :return: The running HTTPServer (call shutdown() to stop it)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics"):
+                    body, kind = json.dumps(metrics.snapshot()).encode(), "application/json"
+                else:
+                    body, kind = metrics.report().encode(), "text/plain"
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the console for the application
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, name="MetricsServer", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return server
+
+    def dump_every(self, path, interval=5.0):
+        """
+        Writes the snapshot as JSON to path every interval seconds from a daemon thread.
+
+        :return: Event that stops the dumps when set
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                tmp = "{}.tmp".format(path)
+                with open(tmp, "w") as f:
+                    json.dump(self.snapshot(), f, indent=2)
+                os.replace(tmp, path)
+
+        thread = threading.Thread(target=run, name="MetricsDump", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return stop
+
+    def start_from_env(self):
+        """
+        Applies the ECHO_METRICS (0 disables), ECHO_METRICS_PORT (HTTP endpoint),
+        ECHO_METRICS_DUMP (JSON file) and ECHO_METRICS_INTERVAL (seconds) settings.
+        """
+        self.enabled = os.environ.get("ECHO_METRICS", "1") != "0"
+        if not self.enabled:
+            return
+        if os.environ.get("ECHO_METRICS_PORT"):
+            self.serve(int(os.environ["ECHO_METRICS_PORT"]))
+        if os.environ.get("ECHO_METRICS_DUMP"):
+            self.dump_every(os.environ["ECHO_METRICS_DUMP"], float(os.environ.get("ECHO_METRICS_INTERVAL", 5.0)))
+
+def _plain(value):
+    # numpy scalars and arrays as JSON numbers and lists
+    return value.tolist() if hasattr(value, "tolist") else value
+
+# Shared registry of the scripts and lib modules
+METRICS = Metrics(enabled=os.environ.get("ECHO_METRICS", "1") != "0")
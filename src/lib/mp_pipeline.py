@@ -0,0 +1,372 @@
+import sys
+import time
+import multiprocessing as mp
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+# Slots of the counters block at the end of every SharedRing; each is only written by one side
+WRITTEN, READ, DROPPED, PRODUCER_NS, CONSUMER_NS = range(5)
+
+class SharedRing:
+    """
+    Single-producer, single-consumer ring of fixed-shape slots in shared memory.
+
+    Samples never go through a pickled queue: the producer fills a slot of a
+    numpy array backed by multiprocessing.shared_memory and the consumer works on
+    a view of the same memory. Two semaphores count filled and free slots. Every
+    slot carries two float64 metadata values (capture time and a length), and the
+    ring keeps written/read/dropped counters visible to all processes.
+    """
+
+    def __init__(self, slots, shape, dtype, ctx=None):
+        """
+        :param slots: Number of slots
+        :param shape: Shape of one slot
+        :param dtype: Element type
+        :param ctx: multiprocessing context providing the semaphores
+        """
+        ctx = mp if ctx is None else ctx
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        data_bytes = slots * int(np.prod(self.shape)) * self.dtype.itemsize
+        self._layout = (data_bytes, data_bytes + 16 * slots)
+        self.shm = shared_memory.SharedMemory(create=True, size=self._layout[1] + 8 * 5)
+        self._owner = True
+        self.items = ctx.Semaphore(0)
+        self.spaces = ctx.Semaphore(slots)
+        self._attach()
+        self.counters[:] = 0
+
+    def _attach(self):
+        data_bytes, meta_end = self._layout
+        self.data = np.ndarray((self.slots,) + self.shape, self.dtype, buffer=self.shm.buf)
+        self.meta = np.ndarray((self.slots, 2), np.float64, buffer=self.shm.buf, offset=data_bytes)
+        self.counters = np.ndarray(5, np.int64, buffer=self.shm.buf, offset=meta_end)
+
+    def __getstate__(self):
+        return (self.shm.name, self.slots, self.shape, self.dtype, self._layout, self.items, self.spaces)
+
+    def __setstate__(self, state):
+        name, self.slots, self.shape, self.dtype, self._layout, self.items, self.spaces = state
+        # Only the creating process tracks and unlinks the block. Python 3.13 attaches without
+        # tracking; before 3.13 attaching registers the block too, so it is unregistered again.
+        if sys.version_info >= (3, 13):
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self._owner = False
+        self._attach()
+
+    def put(self, timeout=None):
+        """
+        Producer side: reserves the next slot.
+
+        :return: Slot index to fill before commit(), or None when no slot freed up in time
+        """
+        if not self.spaces.acquire(timeout=timeout):
+            return None
+        return int(self.counters[WRITTEN]) % self.slots
+
+    def commit(self):
+        """
+        Producer side: publishes the slot returned by put().
+        """
+        self.counters[WRITTEN] += 1
+        self.items.release()
+
+    def get(self, timeout=None):
+        """
+        Consumer side: waits for the next filled slot.
+
+        :return: Slot index, valid until done(), or None on timeout
+        """
+        if not self.items.acquire(timeout=timeout):
+            return None
+        return int(self.counters[READ]) % self.slots
+
+    def done(self):
+        """
+        Consumer side: hands the slot returned by get() back to the producer.
+        """
+        self.counters[READ] += 1
+        self.spaces.release()
+
+    def close(self):
+        self.data = self.meta = self.counters = None
+        self.shm.close()
+        if self._owner:
+            if sys.version_info < (3, 13):
+                # Before 3.13 the stages share this process's resource tracker, and their
+                # unregister in __setstate__ also dropped the entry unlink() removes
+                resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+
+class WavSource:
+    """
+    Picklable chunk source replaying a WAV file, paced to realtime or as fast as possible.
+    """
+
+    def __init__(self, path, chunk=1024, realtime=False):
+        self.path = path
+        self.chunk = chunk
+        self.realtime = realtime
+
+    def __call__(self):
+        from lib.replay import wav_chunks, wav_info
+        fs = wav_info(self.path)[0]
+        deadline = time.monotonic()
+        for data in wav_chunks(self.path, self.chunk):
+            if self.realtime:
+                deadline += data.shape[0] / fs
+                time.sleep(max(0.0, deadline - time.monotonic()))
+            yield data
+
+class CaptureSource:
+    """
+    Picklable chunk source reading the ReSpeaker through lib.capture.Capture.
+    """
+
+    def __init__(self, rate=16000, channels=6, chunk=1024, device_index=None):
+        self.args = (rate, channels, chunk, device_index)
+
+    def __call__(self):
+        from lib.capture import Capture
+        with Capture(*self.args) as capture:
+            while True:
+                chunk = capture.read(timeout=1.0)
+                if chunk is not None:
+                    yield chunk
+
+def capture_stage(source, out, stop, block):
+    """
+    Process body: copies source chunks into the raw ring. A live source never waits
+    for the DSP stage; when the ring is full the chunk is dropped and counted.
+    """
+    for data in source():
+        if stop.is_set():
+            break
+        slot = out.put(timeout=None if block else 0)
+        if slot is None:
+            out.counters[DROPPED] += 1
+            continue
+        start = time.perf_counter_ns()
+        out.data[slot, :data.shape[0]] = data
+        out.meta[slot] = (time.monotonic(), data.shape[0])
+        out.commit()
+        out.counters[PRODUCER_NS] += time.perf_counter_ns() - start
+    _put_sentinel(out, stop)
+
+def dsp_stage(config, raw, spec, stop, threshold):
+    """
+    Process body: bandpass and streaming STFT of every raw chunk into the spectrum ring.
+    Chunks whose loudest microphone stays below the shared volume threshold only
+    advance the filter state, like volumeDOA.process_chunk.
+    """
+    from lib.filterbank import FIRFilterBank
+    from lib.stft import StreamingSTFT
+
+    bandpass = FIRFilterBank(config["b"], config["channels"], config["chunk"])
+    stft = StreamingSTFT(config["channels"], config["nfft"], channels=config["mic_channels"], chunk=config["chunk"])
+    mics = config["mic_channels"]
+    while not stop.is_set():
+        slot = raw.get(timeout=0.1)
+        if slot is None:
+            continue
+        t_capture, length = raw.meta[slot]
+        if length == 0:
+            raw.done()
+            break
+        start = time.perf_counter_ns()
+        data = raw.data[slot, :int(length)]
+        if threshold.value > 0 and np.max(np.sum(np.abs(data[:, mics], dtype=np.int64), axis=0)) < threshold.value:
+            bandpass.skip(data)
+            if stft.samples_written:
+                stft.reset()  # Frames never span a quiet gap
+            raw.done()
+            raw.counters[CONSUMER_NS] += time.perf_counter_ns() - start
+            continue
+        X = stft.push(bandpass.process(data))
+        raw.done()
+        raw.counters[CONSUMER_NS] += time.perf_counter_ns() - start
+        if X.shape[2]:
+            out = _put_blocking(spec, stop)
+            if out is None:
+                break
+            spec.data[out, :, :, :X.shape[2]] = X
+            spec.meta[out] = (t_capture, X.shape[2])
+            spec.commit()
+    _put_sentinel(spec, stop)
+
+def doa_stage(config, spec, results, stop):
+    """
+    Process body: SRP-PHAT estimate of every spectrum block into the results ring.
+    """
+    from lib.srp import SRP
+
+    srp = SRP(config["L"], config["rate"], config["nfft"], **config.get("srp_kwargs", {}))
+    while not stop.is_set():
+        slot = spec.get(timeout=0.1)
+        if slot is None:
+            continue
+        t_capture, frames = spec.meta[slot]
+        if frames == 0:
+            spec.done()
+            break
+        start = time.perf_counter_ns()
+        angle = srp.Mic_tuning_direction(spec.data[slot, :, :, :int(frames)])
+        spec.done()
+        spec.counters[CONSUMER_NS] += time.perf_counter_ns() - start
+        out = _put_blocking(results, stop)
+        if out is None:
+            break
+        results.data[out] = angle
+        results.meta[out] = (t_capture, time.monotonic())
+        results.commit()
+    _put_sentinel(results, stop)
+
+def _put_blocking(ring, stop):
+    while not stop.is_set():
+        slot = ring.put(timeout=0.1)
+        if slot is not None:
+            return slot
+    return None
+
+def _put_sentinel(ring, stop):
+    # A zero length slot tells the next stage that the stream ended
+    slot = _put_blocking(ring, stop)
+    if slot is not None:
+        ring.meta[slot] = (time.monotonic(), 0)
+        ring.commit()
+
+class ProcessPipeline:
+    """
+    Opt-in pipeline running capture, bandpass/STFT and DOA in three processes.
+
+    The stages are connected by SharedRing buffers, so audio and spectra cross
+    process boundaries without pickling and each stage gets its own core and GIL.
+    The main process (e.g. the Tk GUI) only reads the small results ring. Enabled
+    with --processes in volumeDOA.py and `echo.py run`.
+    """
+
+    def __init__(self, source, L, b, rate=16000, channels=6, chunk=1024, nfft=512, mic_channels=(1, 2, 3, 4),
+                 slots=8, block_capture=False, srp_kwargs=None, start_method=None, volume_threshold=None):
+        """
+        :param source: Picklable callable returning an iterable of (samples, channels) int16 chunks
+        :param L: Microphone positions of the mic_channels, shape (3, num_mics)
+        :param b: Bandpass FIR taps
+        :param rate: Sampling rate
+        :param channels: Interleaved channels of the source
+        :param chunk: Largest chunk of the source
+        :param nfft: FFT length
+        :param mic_channels: Channels used for DOA
+        :param slots: Slots of every ring
+        :param block_capture: Let the capture stage wait for free slots (offline sources) instead of dropping
+        :param srp_kwargs: Extra keyword arguments of SRP
+        :param start_method: multiprocessing start method (default of the platform)
+        :param volume_threshold: Summed absolute level of the loudest microphone below which chunks are
+                                 skipped (None processes every chunk); can be changed later through threshold.value
+        """
+        ctx = mp.get_context(start_method)
+        self.config = dict(L=np.asarray(L), b=np.asarray(b), rate=rate, channels=channels, chunk=chunk,
+                           nfft=nfft, mic_channels=list(mic_channels), srp_kwargs=srp_kwargs or {})
+        stft_frames = chunk // (nfft // 2) + 1
+        self.raw = SharedRing(slots, (chunk, channels), np.int16, ctx)
+        self.spec = SharedRing(slots, (len(mic_channels), nfft // 2 + 1, stft_frames), np.complex128, ctx)
+        self.results_ring = SharedRing(4 * slots, (), np.float64, ctx)
+        self.stop_event = ctx.Event()
+        self.threshold = ctx.Value("d", volume_threshold or 0, lock=False)
+        self.processes = [
+            ctx.Process(target=capture_stage, args=(source, self.raw, self.stop_event, block_capture), name="capture"),
+            ctx.Process(target=dsp_stage, args=(self.config, self.raw, self.spec, self.stop_event, self.threshold),
+                        name="dsp"),
+            ctx.Process(target=doa_stage, args=(self.config, self.spec, self.results_ring, self.stop_event), name="doa"),
+        ]
+        self.latencies = []
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.monotonic()
+        for process in self.processes:
+            process.start()
+        return self
+
+    def results(self, timeout=None):
+        """
+        Generator of (angle, capture time, result time) until the source ends or stop() is called.
+
+        :param timeout: Seconds to wait for one result before giving up
+        """
+        ring = self.results_ring
+        while not self.stop_event.is_set():
+            slot = ring.get(timeout=timeout)
+            if slot is None:
+                return
+            t_capture, t_done = ring.meta[slot]
+            if t_done == 0:
+                ring.done()
+                self.finished = time.monotonic()
+                return
+            angle = float(ring.data[slot])
+            ring.done()
+            self.latencies.append(t_done - t_capture)
+            yield angle, t_capture, t_done
+
+    def angles(self, poll=0.5):
+        """
+        Generator of angles for lib.runtime.Runtime, with a None whenever poll seconds pass without one.
+
+        The volume gate publishes nothing while the room is quiet, so the runtime must not
+        wait in results() without a timeout: it could never join its audio thread on shutdown.
+
+        :param poll: Seconds to wait for a result before handing back a None
+        """
+        while True:
+            for angle, _, _ in self.results(timeout=poll):
+                yield angle
+            if self.finished is not None or self.stop_event.is_set():
+                return
+            yield None
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for ring in (self.raw, self.spec, self.results_ring):
+            ring.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def metrics(self):
+        """
+        End-to-end latency percentiles, throughput and per-stage load.
+
+        :return: Dictionary of metrics
+        """
+        end = self.finished or time.monotonic()
+        elapsed = end - self.started if self.started else 0.0
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        load = lambda ns: float(ns) * 1e-9 / elapsed if elapsed else 0.0
+        return {
+            "chunks": int(self.raw.counters[WRITTEN]),
+            "dropped_chunks": int(self.raw.counters[DROPPED]),
+            "results": len(self.latencies),
+            "chunks_per_sec": self.raw.counters[WRITTEN] / elapsed if elapsed else 0.0,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "latency_p99": float(np.percentile(latencies, 99)),
+            # Fraction of the wall time each stage spent working
+            "load": {
+                "capture": load(self.raw.counters[PRODUCER_NS]),
+                "dsp": load(self.raw.counters[CONSUMER_NS]),
+                "doa": load(self.spec.counters[CONSUMER_NS]),
+            },
+        }
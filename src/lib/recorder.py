@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import wave
+import threading
+import numpy as np
+
+RAW_VERSION = 1
+
+class WavSink:
+    """
+    Appends int16 chunks to a WAV file; the header is completed on close().
+    """
+
+    def __init__(self, path, rate, channels):
+        self.path = path
+        self._wf = wave.open(path, 'wb')
+        self._wf.setnchannels(channels)
+        self._wf.setsampwidth(2)
+        self._wf.setframerate(rate)
+        self.frames = 0
+
+    def write(self, data):
+        # writeframesraw leaves the header alone until close, writeframes rewrites it every call
+        self._wf.writeframesraw(np.ascontiguousarray(data).tobytes())
+        self.frames += data.shape[0]
+
+    def close(self):
+        self._wf.close()
+
+class RawSink:
+    """
+    Appends int16 chunks to a headerless interleaved file next to a JSON sidecar
+    (path + '.json') holding the rate, channels, dtype and frame count, so the
+    recording can be opened with load_raw() as a memory map.
+    """
+
+    def __init__(self, path, rate, channels):
+        self.path = path
+        self.header = {"version": RAW_VERSION, "rate": rate, "channels": channels, "dtype": "int16",
+                       "frames": 0, "start_time": time.time()}
+        self._f = open(path, 'wb')
+        self.frames = 0
+        self._write_header()  # An interrupted recording still has rate and channels
+
+    def _write_header(self):
+        self.header["frames"] = self.frames
+        with open(self.path + '.json', 'w') as f:
+            json.dump(self.header, f, indent=2)
+
+    def write(self, data):
+        self._f.write(np.ascontiguousarray(data, dtype=np.int16).data)
+        self.frames += data.shape[0]
+
+    def close(self):
+        self._f.close()
+        self._write_header()
+
+SINKS = {
+    "wav": (WavSink, ".wav"),
+    "raw": (RawSink, ".raw"),
+}
+
+def load_raw(path, channels=None):
+    """
+    Opens a raw recording as a read-only memory map without reading it.
+
+    :param path: Raw file written by the Recorder (the sidecar is path + '.json')
+    :param channels: Channels to keep, e.g. [1, 2, 3, 4]; slicing copies only those
+    :return: Array of shape (frames, channels) and the sidecar header
+    """
+    with open(path + '.json') as f:
+        header = json.load(f)
+    dtype = np.dtype(header["dtype"])
+    # The data size is authoritative, the sidecar frame count lags behind an interrupted take
+    frames = os.path.getsize(path) // (dtype.itemsize * header["channels"])
+    data = np.memmap(path, dtype=dtype, mode='r', shape=(frames, header["channels"])) if frames else \
+        np.zeros((0, header["channels"]), dtype=dtype)
+    if channels is not None:
+        data = data[:, channels]
+    return data, header
+
+class Recorder:
+    """
+    Streams takes from one open capture session straight to disk.
+
+    A writer thread reads chunks from a lib.capture.Capture and writes them to
+    the current file, so memory use does not grow with the length of a take and
+    the audio session stays open between takes (no PyAudio setup gap). Chunks
+    arriving between takes are read and discarded to keep the ring from
+    overflowing. A take can be split into parts after max_seconds or max_bytes,
+    and written as WAV or as raw int16 with a JSON sidecar (see load_raw).
+    """
+
+    def __init__(self, capture, directory=".", prefix="audio", format="wav", max_seconds=None, max_bytes=None):
+        """
+        :param capture: lib.capture.Capture (started by the recorder if needed)
+        :param directory: Folder of the recordings
+        :param prefix: File name prefix, take n is written to prefix + n
+        :param format: 'wav' or 'raw'
+        :param max_seconds: Start a new part after this many seconds of a take
+        :param max_bytes: Start a new part after this many bytes of audio data
+        """
+        if format not in SINKS:
+            raise ValueError("Unknown recording format '{}'.".format(format))
+        self.capture = capture
+        self.directory = directory
+        self.prefix = prefix
+        self.format = format
+        bytes_per_frame = 2 * capture.channels
+        limits = []
+        if max_seconds is not None:
+            limits.append(int(max_seconds * capture.rate))
+        if max_bytes is not None:
+            limits.append(max(1, int(max_bytes) // bytes_per_frame))
+        self.max_frames = min(limits) if limits else None  # Frames per part
+
+        self.files = []  # Every file written, in order
+        self.takes = 0
+        self.frames_written = 0
+        self.frames_discarded = 0  # Read between takes
+
+        self._lock = threading.Lock()
+        self._take = None  # Requested take: (name, frames or None, done event)
+        self._active = None  # Take the writer thread is writing
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="Recorder", daemon=True)
+
+    def start(self):
+        if self.capture.stream is None:
+            self.capture.start()
+        self._thread.start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def record(self, seconds=None, name=None):
+        """
+        Starts a take; it ends after `seconds` or on stop_take().
+
+        :param seconds: Length of the take, None until stop_take()
+        :param name: File name without extension, prefix + take number by default
+        :return: Event set when the take is finished and its files are closed
+        """
+        self.stop_take()
+        self.takes += 1
+        name = "{}{}".format(self.prefix, self.takes) if name is None else name
+        frames = None if seconds is None else int(round(seconds * self.capture.rate))
+        done = threading.Event()
+        with self._lock:
+            self._take = (name, frames, done)
+        return done
+
+    def stop_take(self, timeout=None):
+        """
+        Ends the current take and waits until its files are closed.
+        """
+        with self._lock:
+            take, self._take = self._take, None
+            if take is not None and take is not self._active:
+                take[2].set()  # Not picked up by the writer yet, nothing to close
+        if take is not None:
+            take[2].wait(timeout)
+
+    def close(self, timeout=2.0):
+        self.stop_take(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+        self.capture.stop()
+
+    def _path(self, name, part):
+        extension = SINKS[self.format][1]
+        suffix = "" if self.max_frames is None else "_{:03d}".format(part)
+        return os.path.join(self.directory, name + suffix + extension)
+
+    def _run(self):
+        sink_type = SINKS[self.format][0]
+        sink = None
+        current = None
+        part = take_frames = 0
+        while not self._stop.is_set():
+            chunk = self.capture.read(timeout=0.1)
+            with self._lock:
+                take = self._take
+                self._active = take
+            if take is not current:
+                # Stopped or replaced: close the last part of the previous take
+                if sink is not None:
+                    sink.close()
+                    sink = None
+                if current is not None:
+                    current[2].set()
+                current, part, take_frames = take, 0, 0
+            if chunk is None:
+                continue
+            if current is None:
+                self.frames_discarded += chunk.shape[0]
+                continue
+
+            name, length, done = current
+            pos = 0
+            while pos < chunk.shape[0] and (length is None or take_frames < length):
+                if sink is None:
+                    path = self._path(name, part)
+                    sink = sink_type(path, self.capture.rate, self.capture.channels)
+                    self.files.append(path)
+                # Frames that still fit the take and the current part
+                n = chunk.shape[0] - pos
+                if length is not None:
+                    n = min(n, length - take_frames)
+                if self.max_frames is not None:
+                    n = min(n, self.max_frames - sink.frames)
+                sink.write(chunk[pos:pos + n])
+                pos += n
+                take_frames += n
+                self.frames_written += n
+                if self.max_frames is not None and sink.frames >= self.max_frames:
+                    sink.close()
+                    sink = None
+                    part += 1
+            self.frames_discarded += chunk.shape[0] - pos
+
+            if length is not None and take_frames >= length:
+                if sink is not None:
+                    sink.close()
+                    sink = None
+                with self._lock:
+                    if self._take is current:
+                        self._take = None
+                    self._active = None
+                current = None
+                done.set()
+        if sink is not None:
+            sink.close()
+        if current is not None:
+            current[2].set()
+
+    def stats(self):
+        stats = dict(self.capture.stats())
+        stats.update({
+            "takes": self.takes,
+            "files": len(self.files),
+            "frames_recorded": self.frames_written,
+            "frames_discarded": self.frames_discarded,
+        })
+        return stats
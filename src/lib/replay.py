@@ -0,0 +1,164 @@
+import csv
+import time
+import wave
+import numpy as np
+
+def wav_chunks(path, chunk=1024):
+    """
+    Streams a multichannel int16 WAV in blocks, as the PyAudio stream would deliver them.
+
+    :param path: WAV file recorded by audioTrain.py / audioinput.py
+    :param chunk: Samples per channel in every block
+    :return: Generator of (samples, channels) int16 arrays; the last one may be shorter
+    """
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("Only 16 bit recordings are supported.")
+        channels = wf.getnchannels()
+        while True:
+            data = wf.readframes(chunk)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+
+def wav_info(path):
+    """
+    :return: (sampling rate, channels, samples per channel) of a WAV file
+    """
+    with wave.open(path, 'rb') as wf:
+        return wf.getframerate(), wf.getnchannels(), wf.getnframes()
+
+def load_labels(path):
+    """
+    Reads labeled angles from a CSV file with rows of start_s,end_s,angle.
+
+    :return: List of (start, end, angle) tuples
+    """
+    labels = []
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().startswith('#'):
+                continue
+            try:
+                labels.append(tuple(float(value) for value in row[:3]))
+            except ValueError:
+                continue  # Header line
+    return labels
+
+class StageTimer:
+    """
+    Collects the latency of every call of each named processing stage.
+    """
+
+    def __init__(self):
+        self.samples = {}  # stage name: list of seconds
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def wrap(self, name, func):
+        """
+        :return: func, timed under the given stage name
+        """
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timed
+
+    def percentiles(self, q=(50, 95, 99)):
+        """
+        :return: Dictionary of stage name: {'calls', 'p50', ...} with latencies in seconds
+        """
+        report = {}
+        for name, samples in self.samples.items():
+            values = np.percentile(samples, q)
+            report[name] = dict(calls=len(samples), total=float(np.sum(samples)))
+            report[name].update(('p{}'.format(p), float(v)) for p, v in zip(q, values))
+        return report
+
+class TimedProxy:
+    """
+    Forwards attribute access to a stage object, timing the listed methods.
+    """
+
+    def __init__(self, target, timer, name, methods):
+        self._target = target
+        for method in methods:
+            setattr(self, method, timer.wrap("{}.{}".format(name, method), getattr(target, method)))
+
+    def __getattr__(self, attr):
+        return getattr(self._target, attr)
+
+def angle_error(a, b):
+    """
+    Absolute angular distance in degrees, wrapped to [0, 180].
+    """
+    return abs((a - b + 180) % 360 - 180)
+
+def replay(path, process, chunk=1024, timer=None, labels=None, tolerance=20.0):
+    """
+    Streams a recording through a processing function as fast as possible.
+
+    :param path: WAV file to replay
+    :param process: Function called with every (samples, channels) chunk, returning an angle or None
+    :param chunk: Samples per channel in every block
+    :param timer: StageTimer also used by the stages inside process (a new one if None)
+    :param labels: Optional list of (start_s, end_s, angle) ground truth segments
+    :param tolerance: Largest angular error in degrees counted as correct
+    :return: Report dictionary with latency percentiles, realtime factor and accuracy
+    """
+    fs, _, num_samples = wav_info(path)
+    timer = StageTimer() if timer is None else timer
+    outputs = []
+
+    pos = 0
+    start = time.perf_counter()
+    for data in wav_chunks(path, chunk):
+        t0 = time.perf_counter()
+        result = process(data)
+        timer.add("chunk", time.perf_counter() - t0)
+        if result is not None:
+            outputs.append(((pos + data.shape[0] / 2) / fs, result))
+        pos += data.shape[0]
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "audio_seconds": num_samples / fs,
+        "processing_seconds": elapsed,
+        "realtime_factor": (num_samples / fs) / elapsed if elapsed else float("inf"),
+        "estimates": len(outputs),
+        "stages": timer.percentiles(),
+        "outputs": outputs,
+    }
+
+    if labels:
+        errors = []
+        for t, angle in outputs:
+            for seg_start, seg_end, truth in labels:
+                if seg_start <= t < seg_end:
+                    errors.append(angle_error(float(angle), truth))
+                    break
+        errors = np.array(errors)
+        report["labeled"] = len(errors)
+        report["accuracy"] = float(np.mean(errors <= tolerance)) if len(errors) else None
+        report["mean_error"] = float(np.mean(errors)) if len(errors) else None
+
+    return report
+
+def format_report(report):
+    """
+    :return: Human readable summary of a replay report
+    """
+    lines = ["audio {:.1f} s processed in {:.2f} s, realtime factor {:.1f}x, {} estimates".format(
+        report["audio_seconds"], report["processing_seconds"], report["realtime_factor"], report["estimates"])]
+    lines.append("{:24} {:>8} {:>10} {:>10} {:>10}".format("stage", "calls", "p50 [ms]", "p95 [ms]", "p99 [ms]"))
+    for name, stats in sorted(report["stages"].items()):
+        lines.append("{:24} {:8} {:10.3f} {:10.3f} {:10.3f}".format(
+            name, stats["calls"], 1e3 * stats["p50"], 1e3 * stats["p95"], 1e3 * stats["p99"]))
+    if report.get("labeled"):
+        lines.append("accuracy {:.1%} over {} labeled estimates, mean error {:.1f} deg".format(
+            report["accuracy"], report["labeled"], report["mean_error"]))
+    return "\n".join(lines)
@@ -0,0 +1,274 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from lib.doa_poller import DOAPoller
+from lib.metrics import METRICS
+
+END_OF_STREAM = object()  # Default of next() on the source, None is a source with nothing yet
+
+class Runtime:
+    """
+    asyncio runtime running audio processing, board DOA polling and haptic output in one process.
+
+    Every stage is a task on one event loop and nothing blocking runs on the loop
+    itself: chunks are read from the source on an audio thread and processed on a
+    DSP thread, USB control transfers and SMBus writes go to a bounded I/O thread
+    pool (at most io_workers calls in flight, further callers wait their turn).
+
+    The chunk queue between reading and processing is bounded. When it is full
+    the oldest chunk is dropped ('drop-oldest', for live capture) or the reader
+    waits ('block', for offline sources). Between the DOA stages and the haptic
+    output only the newest angle is kept, so a slow bus never queues stale angles.
+    stop() or cancelling run() ends every task, waits for the calls already in a
+    thread, closes the source and silences the motors.
+    """
+
+    def __init__(self, source=None, process=None, tuning=None, scheduler=None, panner=None, follow="audio",
+                 poll_rate=10.0, haptic_rate=50.0, hysteresis=10.0, queue_size=8, policy="drop-oldest", io_workers=2):
+        """
+        :param source: Callable returning an iterable of (samples, channels) chunks, e.g. mp_pipeline.CaptureSource;
+                       a None item means nothing arrived in time and is skipped
+        :param process: Function chunk -> DOA angle in degrees or None, run on the DSP thread
+        :param tuning: Tuning instance (or anything with a `direction` property) polled for the board DOA
+        :param scheduler: HapticScheduler (not started) whose flush() runs on the I/O pool
+        :param panner: HapticPanner turning angles into motor intensities
+        :param follow: Angles driving the motors, 'audio' (process) or 'board' (tuning)
+        :param poll_rate: Board DOA reads per second
+        :param haptic_rate: Haptic output ticks per second
+        :param hysteresis: Minimum change in degrees of the board DOA before it is published
+        :param queue_size: Chunks waiting for the DSP thread at most
+        :param policy: 'drop-oldest' or 'block' when the chunk queue is full
+        :param io_workers: Threads (and concurrent calls) of the I/O pool
+        """
+        if policy not in ("drop-oldest", "block"):
+            raise ValueError("Unknown backpressure policy '{}'.".format(policy))
+        if follow not in ("audio", "board"):
+            raise ValueError("Unknown angle source '{}'.".format(follow))
+        if scheduler is not None and panner is None:
+            raise ValueError("Haptic output needs a panner.")
+        self.source = source
+        self.process = process
+        self.tuning = tuning
+        self.scheduler = scheduler
+        self.panner = panner
+        self.follow = follow
+        self.poll_period = 1.0 / poll_rate
+        self.haptic_period = 1.0 / haptic_rate
+        self.queue_size = queue_size
+        self.policy = policy
+        self.io_workers = io_workers
+        # Hysteresis and confirmation of the board angle, without the poller thread
+        self.board_filter = DOAPoller(tuning, rate=poll_rate, hysteresis=hysteresis, maxsize=1) if tuning is not None else None
+
+        self.angle = None  # Newest followed angle, (degrees, time stamp)
+        self.rendered = None  # Angle last sent to the motors
+        self._loop = None
+        self._stop = None
+
+        self.chunks_read = 0
+        self.chunks_processed = 0
+        self.dropped_chunks = 0
+        self.queue_high = 0
+        self.estimates = 0
+        self.polls = 0
+        self.poll_errors = 0
+        self.board_events = 0
+        self.ticks = 0
+        self.transactions = 0
+        self.bus_errors = 0
+        self.io_calls = 0
+        self.latencies = []  # Seconds from capture (or poll) to the haptic write of an angle
+        self.started = None
+        self.finished = None
+
+    def stop(self):
+        """
+        Ends run(); safe to call from any thread.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _io(self, func, *args):
+        # Bounded: at most io_workers calls in flight, the others wait here on the loop
+        async with self._io_slots:
+            self.io_calls += 1
+            return await self._loop.run_in_executor(self._io_pool, func, *args)
+
+    async def _every(self, period, tick):
+        # Fixed rate without drift; skip ticks that were missed entirely
+        deadline = self._loop.time()
+        while True:
+            await tick()
+            deadline += period
+            delay = deadline - self._loop.time()
+            if delay < 0:
+                deadline = self._loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def _publish(self, origin, angle, stamp):
+        if origin == self.follow:
+            self.angle = (angle, stamp)
+
+    async def _read_audio(self):
+        chunks = self._chunks
+        while True:
+            t0 = METRICS.start()
+            chunk = await self._loop.run_in_executor(self._audio_pool, next, self._source_iter, END_OF_STREAM)
+            METRICS.stop("runtime.read", t0)
+            if chunk is END_OF_STREAM:
+                await chunks.put(None)
+                return
+            if chunk is None:
+                continue  # Lets a source that has nothing yet return to the loop, e.g. to shut down
+            # Sources may hand out views of their own buffers
+            item = (np.array(chunk), time.monotonic())
+            self.chunks_read += 1
+            if self.policy == "block":
+                await chunks.put(item)
+            else:
+                if chunks.full():
+                    chunks.get_nowait()
+                    self.dropped_chunks += 1
+                    METRICS.count("runtime.dropped_chunks")
+                chunks.put_nowait(item)
+            self.queue_high = max(self.queue_high, chunks.qsize())
+
+    async def _process_audio(self):
+        chunks = self._chunks
+        while True:
+            item = await chunks.get()
+            if item is None:
+                return
+            chunk, stamp = item
+            t0 = METRICS.start()
+            angle = await self._loop.run_in_executor(self._dsp_pool, self.process, chunk)
+            METRICS.stop("runtime.process", t0)
+            self.chunks_processed += 1
+            if angle is not None:
+                self.estimates += 1
+                self._publish("audio", angle, stamp)
+
+    async def _poll_board(self):
+        try:
+            angle = await self._io(getattr, self.tuning, "direction")
+        except Exception:
+            self.poll_errors += 1  # USB hiccup, try again on the next tick
+            return
+        self.polls += 1
+        if angle is not None and self.board_filter.update(angle) is not None:
+            self.board_events += 1
+            self._publish("board", angle, time.monotonic())
+
+    async def _render(self):
+        self.ticks += 1
+        stamp = None
+        if self.angle is not None and self.angle is not self.rendered:
+            self.rendered = self.angle
+            angle, stamp = self.angle
+            self.scheduler.set_all(self.panner.intensities(angle))
+        errors = self.scheduler.bus_errors
+        self.transactions += await self._io(self.scheduler.flush)
+        self.bus_errors += self.scheduler.bus_errors - errors
+        if stamp is not None:
+            self.latencies.append(time.monotonic() - stamp)
+
+    async def run(self, duration=None):
+        """
+        Runs every configured stage until stop(), the duration elapses, the source ends
+        or a stage fails (the error is raised after the cleanup).
+
+        :param duration: Seconds to run at most, None for no limit
+        :return: stats()
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._io_slots = asyncio.Semaphore(self.io_workers)
+        self._io_pool = ThreadPoolExecutor(self.io_workers, thread_name_prefix="runtime-io")
+        self._audio_pool = ThreadPoolExecutor(1, thread_name_prefix="runtime-audio")
+        self._dsp_pool = ThreadPoolExecutor(1, thread_name_prefix="runtime-dsp")
+        self._chunks = asyncio.Queue(self.queue_size)
+        self._source_iter = None
+        self.started = time.monotonic()
+
+        stages = []
+        if self.source is not None:
+            self._source_iter = iter(self.source())
+            stages.append(asyncio.ensure_future(self._read_audio()))
+            # The stream is over once the processing stage has drained the queue
+            end_of_stream = asyncio.ensure_future(self._process_audio())
+            stages.append(end_of_stream)
+        else:
+            end_of_stream = None
+        if self.tuning is not None:
+            stages.append(asyncio.ensure_future(self._every(self.poll_period, self._poll_board)))
+        if self.scheduler is not None:
+            stages.append(asyncio.ensure_future(self._every(self.haptic_period, self._render)))
+        stop = asyncio.ensure_future(self._stop.wait())
+
+        error = None
+        try:
+            pending = set(stages) | {stop}
+            deadline = None if duration is None else self._loop.time() + duration
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - self._loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                failed = [task for task in done if task is not stop and task.exception() is not None]
+                if failed:
+                    error = failed[0].exception()
+                    break
+                if not done or stop in done or end_of_stream in done:
+                    break  # Finished reader stages just leave the set
+        finally:
+            await self._shutdown(stages + [stop])
+        if error is not None:
+            raise error
+        return self.stats()
+
+    async def _shutdown(self, tasks):
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Calls already handed to a thread cannot be cancelled, wait for them off the loop
+        for pool in (self._audio_pool, self._dsp_pool):
+            await self._loop.run_in_executor(None, pool.shutdown)
+        if self._source_iter is not None and hasattr(self._source_iter, "close"):
+            self._source_iter.close()  # Stops a live capture
+        if self.scheduler is not None:
+            self.scheduler.set_all(np.zeros(len(self.scheduler.channels), dtype=int))
+            try:
+                self.transactions += await self._io(self.scheduler.flush)
+            except OSError:
+                self.bus_errors += 1
+        await self._loop.run_in_executor(None, self._io_pool.shutdown)
+        self.finished = time.monotonic()
+        self._loop = None
+
+    def stats(self):
+        """
+        Stage counters, haptic latency percentiles and achieved rates.
+
+        :return: Dictionary of metrics
+        """
+        end = self.finished or time.monotonic()
+        elapsed = end - self.started if self.started else 0.0
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "elapsed": elapsed,
+            "chunks_read": self.chunks_read,
+            "chunks_processed": self.chunks_processed,
+            "dropped_chunks": self.dropped_chunks,
+            "queue_high": self.queue_high,
+            "estimates": self.estimates,
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "polls_per_sec": self.polls / elapsed if elapsed else 0.0,
+            "board_events": self.board_events,
+            "ticks_per_sec": self.ticks / elapsed if elapsed else 0.0,
+            "transactions": self.transactions,
+            "bus_errors": self.bus_errors,
+            "io_calls": self.io_calls,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+        }
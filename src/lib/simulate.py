@@ -0,0 +1,268 @@
+import numpy as np
+from lib.srp import time_of_flight
+from lib.stft import StreamingSTFT, StreamingISTFT
+
+class Source:
+    """
+    A sound source for the ArraySimulator: where it is over time and what it emits.
+    """
+
+    def __init__(self, azimuth, colatitude=90.0, distance=None, signal=None, level_db=0.0, talk_fraction=0.3):
+        """
+        :param azimuth: Azimuth in degrees, or a function of time in seconds (vectorized) for a moving source
+        :param colatitude: Colatitude in degrees, or a function of time
+        :param distance: Distance from the array center in meters (near-field simulations only)
+        :param signal: Mono samples to emit, looped; None for speech-like noise bursts
+        :param level_db: Level relative to the simulator's level
+        :param talk_fraction: Fraction of the time the speech-like noise is active
+        """
+        self.azimuth = azimuth
+        self.colatitude = colatitude
+        self.distance = distance
+        self.signal = None if signal is None else np.asarray(signal, dtype=float)
+        self.gain = 10 ** (level_db / 20)
+        self.talk_fraction = talk_fraction
+
+    def position(self, t):
+        """
+        :param t: Times in seconds
+        :return: Azimuth and colatitude in degrees at every time
+        """
+        az = self.azimuth(t) if callable(self.azimuth) else np.full(np.shape(t), float(self.azimuth))
+        co = self.colatitude(t) if callable(self.colatitude) else np.full(np.shape(t), float(self.colatitude))
+        return np.asarray(az, dtype=float) % 360, np.asarray(co, dtype=float)
+
+def sweep(start, end, seconds):
+    """
+    Trajectory moving at constant speed from start to end degrees in the given time, then staying there.
+    """
+    return lambda t: start + (end - start) * np.clip(np.asarray(t) / seconds, 0.0, 1.0)
+
+class ArraySimulator:
+    """
+    Synthesizes the int16 streams of a microphone array hearing moving sources.
+
+    Everything happens in batched NumPy on blocks of block_seconds of audio. The
+    dry source signals and white noise go through one StreamingSTFT. Every source
+    frame is delayed per microphone by a fractional delay (a phase ramp) taken
+    from the same time-of-flight model as the DOA mode vectors, at the source's
+    position at that frame, so moving sources follow their trajectory smoothly.
+    The noise is mixed per frequency to the sinc coherence of a diffuse field (or
+    left spatially white). A reverberation tail is added as an exponentially
+    decaying noise response per source and microphone, with the given RT60 and
+    direct-to-reverberant ratio. A StreamingISTFT turns the sum back into samples.
+
+    Directions follow the DOA convention: azimuth 0 along the x axis of L,
+    counterclockwise, colatitude 90 degrees in the xy plane.
+    """
+
+    def __init__(self, L, fs=16000, c=343.0, mode="far", nfft=512, level=3000.0, snr_db=20.0, diffuse=True,
+                 rt60=None, drr_db=6.0, band=(100.0, 3500.0), block_seconds=4.0, seed=0):
+        """
+        :param L: Microphone positions, shape (2 or 3, num_mics)
+        :param fs: Sampling frequency
+        :param c: Speed of sound
+        :param mode: 'far' (plane waves) or 'near' (spherical waves from Source.distance, with 1/r gains)
+        :param nfft: FFT length of the simulation frames; trajectories are sampled every nfft / 2 samples
+        :param level: RMS of a talking source at level_db 0, in int16 units
+        :param snr_db: Source level over the noise at every microphone (None for no noise)
+        :param diffuse: Diffuse (sinc-coherent) noise instead of spatially white noise
+        :param rt60: Reverberation time in seconds (None for no reverberation)
+        :param drr_db: Direct-to-reverberant energy ratio
+        :param band: (low, high) frequencies in Hz of the speech-like noise
+        :param block_seconds: Audio synthesized per batch
+        :param seed: Seed of every random signal
+        """
+        if mode not in ("far", "near"):
+            raise ValueError("Unknown field mode '{}'.".format(mode))
+        self.L = np.asarray(L, dtype=float)
+        if self.L.shape[0] == 2:
+            self.L = np.vstack((self.L, np.zeros(self.L.shape[1])))
+        self.num_mics = self.L.shape[1]
+        self.fs = fs
+        self.c = c
+        self.mode = mode
+        self.nfft = nfft
+        self.hop = nfft // 2
+        self.level = level
+        self.noise_level = None if snr_db is None else level * 10 ** (-snr_db / 20)
+        self.diffuse = diffuse
+        self.rt60 = rt60
+        self.drr_db = drr_db
+        self.band = band
+        self.block = max(self.hop, int(block_seconds * fs) // self.hop * self.hop)
+        self.seed = seed
+
+        freqs = np.arange(nfft // 2 + 1) * fs / nfft
+        self.omega = 2 * np.pi * freqs
+        self._band_mask = ((freqs >= band[0]) & (freqs <= band[1])).astype(float)
+
+        # Diffuse field coherence sinc(2 f d / c) between every microphone pair, factored per frequency
+        d = np.linalg.norm(self.L[:, :, None] - self.L[:, None, :], axis=0)
+        coherence = np.sinc(2 * freqs[:, None, None] * d[None] / c)
+        coherence += 1e-6 * np.eye(self.num_mics)
+        self._mix = np.linalg.cholesky(coherence)
+
+    def _tails(self, rng, num_sources):
+        """
+        Exponentially decaying noise responses from every source to every microphone.
+
+        :return: Response length, FFT length of the block convolution and the spectra of shape (num_sources, num_mics, bins)
+        """
+        length = int(self.rt60 * self.fs)
+        t = np.arange(length) / self.fs
+        tails = rng.standard_normal((num_sources, self.num_mics, length)) * np.exp(-6.9 * t / self.rt60)
+        tails[..., :int(0.005 * self.fs)] = 0  # Reflections arrive after the direct sound
+        # The direct path has unit energy; scale the tail energy to the direct-to-reverberant ratio
+        tails *= 10 ** (-self.drr_db / 20) / np.sqrt(np.sum(tails ** 2, axis=-1, keepdims=True))
+        n_fft = 1 << int(np.ceil(np.log2(self.block + length - 1)))
+        return length, n_fft, np.fft.rfft(tails, n_fft)
+
+    def _speech(self, rng, source, state, n):
+        """
+        Talk spurts of 0.5 to 2 s with a 4 Hz syllable modulation, continuing the state of the previous block.
+        """
+        active = np.zeros(n, dtype=bool)
+        pos = 0
+        while pos < n:
+            if state["left"] == 0:
+                # Next talk spurt or pause, about talk_fraction of the time is talk
+                state["talking"] = not state["talking"]
+                talk = rng.uniform(0.5, 2.0) * self.fs
+                pause = talk * (1 - source.talk_fraction) / source.talk_fraction * rng.uniform(0.5, 1.5)
+                state["left"] = max(1, int(talk if state["talking"] else pause))
+            length = min(n - pos, state["left"])
+            active[pos:pos + length] = state["talking"]
+            state["left"] -= length
+            pos += length
+        t = (state["pos"] + np.arange(n)) / self.fs
+        state["pos"] += n
+        envelope = active * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        return envelope * rng.standard_normal(n)
+
+    def _delays(self, sources, times):
+        """
+        Per-frame delays in seconds and gains of every source at every microphone, shape (num_sources, num_mics, frames).
+        """
+        delays, gains = [], []
+        for source in sources:
+            az, co = np.radians(source.position(times))
+            if self.mode == "near" and source.distance is None:
+                raise ValueError("Near-field sources need a distance.")
+            r = 1.0 if self.mode == "far" else source.distance
+            x, y, z = r * np.sin(co) * np.cos(az), r * np.sin(co) * np.sin(az), r * np.cos(co)
+            # Microphones closer to the source hear it earlier than the array center by tau
+            tau = time_of_flight(self.L, x, y, z, self.c, self.mode)[0]
+            delays.append(-tau)
+            if self.mode == "far":
+                gains.append(np.ones_like(tau))
+            else:
+                gains.append(r / (r - tau * self.c))  # Spherical spreading relative to the center
+        return np.array(delays), np.array(gains)
+
+    def blocks(self, sources, seconds, num_channels=None, first_channel=0):
+        """
+        Generator of the simulated stream in blocks of block_seconds (the last one may be shorter).
+
+        :param sources: List of Source
+        :param seconds: Length of the stream
+        :param num_channels: Channels of the stream (default num_mics); extra channels stay silent
+        :param first_channel: Channel of the first microphone, e.g. 1 for the ReSpeaker 6-channel layout
+        :return: Generator of int16 arrays of shape (samples, num_channels)
+        """
+        rng = np.random.default_rng(self.seed)
+        num_channels = self.num_mics if num_channels is None else num_channels
+        K, M = len(sources), self.num_mics
+        total = int(round(seconds * self.fs))
+        use_noise = self.noise_level is not None
+        use_reverb = self.rt60 is not None and K > 0
+        stft = StreamingSTFT(K + (M if use_noise else 0) + (M if use_reverb else 0), self.nfft, chunk=self.block)
+        istft = StreamingISTFT(self.nfft)
+        if use_reverb:
+            tail_length, n_fft, tail_spectra = self._tails(rng, K)
+            carry = np.zeros((M, tail_length - 1))
+        states = [{"pos": 0, "talking": False, "left": int(rng.uniform(0, 1.0) * self.fs) + 1} for _ in sources]
+        # Speech-like noise is band limited in the STFT domain, its RMS while talking is level
+        speech = np.array([source.signal is None for source in sources], dtype=bool)
+        masks = np.where(speech[:, None], self._band_mask, 1.0)
+        band_gain = np.sqrt(self._band_mask.size / max(1.0, self._band_mask.sum()))
+        gain = np.array([source.gain for source in sources]) * self.level * np.where(speech, band_gain, 1.0)
+
+        # The first hop of the input only fills the first frame: synthesize from -hop and drop it
+        read = -self.hop
+        skip = self.hop
+        pending = []
+        buffered = emitted = 0
+        while emitted < total:
+            n = self.block
+            dry = np.empty((K, n))
+            for k, source in enumerate(sources):
+                if source.signal is None:
+                    dry[k] = self._speech(rng, source, states[k], n)
+                else:
+                    index = (read + np.arange(n)) % source.signal.shape[0]
+                    dry[k] = source.signal[index] / (np.std(source.signal) + 1e-12)
+            dry *= gain[:, None]
+            read += n
+            parts = [dry]
+            if use_noise:
+                parts.append(rng.standard_normal((M, n)) * self.noise_level)
+            if use_reverb:
+                # Overlap-add convolution of every source with its tail at every microphone
+                wet = np.fft.irfft(np.einsum("kf,kmf->mf", np.fft.rfft(dry, n_fft), tail_spectra), n_fft)
+                wet = wet[:, :n + tail_length - 1]
+                wet[:, :tail_length - 1] += carry
+                carry = wet[:, n:].copy()
+                parts.append(wet[:, :n])
+            X = stft.push(np.concatenate(parts).T)
+            frames = X.shape[2]
+
+            # Every source at its position at the center of every frame
+            first = stft.frames_out - frames
+            times = ((first + np.arange(frames)) * self.hop + self.nfft / 2 - self.hop) / self.fs
+            Y = np.zeros((M,) + X.shape[1:], dtype=complex)
+            if K:
+                delays, gains = self._delays(sources, times)
+                # exp(-j w d) for every bin as powers of the first bin's phasor, cheaper than one exp per bin
+                steering = np.empty(delays.shape[:2] + (self.omega.shape[0], frames), dtype=complex)
+                steering[:, :, 0] = gains
+                steering[:, :, 1:] = np.exp(-1j * self.omega[1] * delays)[:, :, None, :]
+                np.cumprod(steering, axis=2, out=steering)
+                Y += np.einsum("kft,kmft->mft", X[:K] * masks[:, :, None], steering)
+            if use_noise:
+                N = X[K:K + M]
+                Y += np.einsum("fmn,nft->mft", self._mix, N) if self.diffuse else N
+            if use_reverb:
+                Y += X[-M:] * masks.max(axis=0)[:, None]
+
+            out = istft.push(Y)[:, skip:]
+            skip = 0
+            pending.append(out)
+            buffered += out.shape[1]
+            # Hand out whole blocks, and whatever completes the stream
+            while buffered >= min(self.block, total - emitted):
+                data = np.concatenate(pending, axis=1)
+                count = min(self.block, total - emitted)
+                block = np.zeros((count, num_channels), dtype=np.int16)
+                block[:, first_channel:first_channel + M] = np.clip(np.round(data[:, :count].T), -32768, 32767)
+                pending = [data[:, count:]]
+                buffered -= count
+                emitted += count
+                yield block
+                if emitted >= total:
+                    return
+
+    def render(self, sources, seconds, num_channels=None, first_channel=0):
+        """
+        The whole simulated stream at once, see blocks().
+
+        :return: int16 array of shape (samples, num_channels)
+        """
+        return np.concatenate(list(self.blocks(sources, seconds, num_channels, first_channel)))
+
+    @staticmethod
+    def truth(sources, times):
+        """
+        Ground-truth azimuths in degrees of every source, shape (num_sources, len(times)).
+        """
+        return np.array([source.position(np.asarray(times, dtype=float))[0] for source in sources])
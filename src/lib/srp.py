@@ -1,17 +1,113 @@
 from __future__ import division, print_function
+import hashlib
+import os
 import numpy as np
 import warnings
+from collections import OrderedDict
 
 tol = 1e-14  # Tolerance value used to avoid division by zero
+CACHE_VERSION = 2  # Bump whenever the layout or the math (time_of_flight, steering) of cached tensors changes
+
+def geometry_key(*parts):
+    """
+    Hashes array geometry and grid parameters into a short key for on-disk caches.
+
+    :param parts: Arrays and scalars describing the cached tensor
+    :return: Hexadecimal key
+    """
+    h = hashlib.sha1(str(CACHE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            h.update("{}{}".format(part.dtype, part.shape).encode())
+            h.update(np.ascontiguousarray(part).tobytes())
+        else:
+            h.update(repr(part).encode())
+    return h.hexdigest()[:20]
+
+def load_or_build(cache_dir, prefix, key, shape, dtype, build, check=None):
+    """
+    Memory-maps a cached .npy tensor, rebuilding it when missing, truncated or stale.
+
+    :param cache_dir: Directory holding the cache files
+    :param prefix: File name prefix identifying the kind of tensor
+    :param key: Key returned by geometry_key
+    :param shape: Expected shape of the tensor
+    :param dtype: Expected dtype of the tensor
+    :param build: Function filling a writable array of the given shape in place
+    :param check: Optional function returning False when a loaded tensor is stale
+    :return: Read-only memory-mapped tensor and whether it came from the cache
+    """
+    dtype = np.dtype(dtype)
+    path = os.path.join(cache_dir, "{}_{}_{}.npy".format(prefix, key, dtype.name))
+    try:
+        cached = np.load(path, mmap_mode="r")
+        if cached.shape == tuple(shape) and cached.dtype == dtype and (check is None or check(cached)):
+            return cached, True
+        del cached
+    except (OSError, ValueError):
+        pass  # Missing or unreadable, rebuilt below
+
+    # Write to a private file first so readers never map a half-written tensor
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=tuple(shape))
+    build(out)
+    out.flush()
+    del out
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r"), False
+
+def time_of_flight(L, x, y, z, c, mode="far"):
+    """
+    Propagation term of the mode vectors for a set of points.
+
+    :param L: 2D numpy array of microphone positions
+    :param x: x coordinates of the points (unit directions in far-field mode)
+    :param y: y coordinates of the points
+    :param z: z coordinates of the points
+    :param c: Speed of sound
+    :param mode: 'far' (projection of every microphone on the direction) or 'near' (path length saved
+                 against the array origin) over c
+    :return: tau of shape (1, num_mics, num_points), how much earlier each microphone hears each point than the origin
+    """
+    # Initialize position vectors for the grid and microphone locations
+    p_x = np.asarray(x)[None, None, :]
+    p_y = np.asarray(y)[None, None, :]
+    p_z = np.asarray(z)[None, None, :]
+    r_x = L[0, None, :, None]
+    r_y = L[1, None, :, None]
+    r_z = L[2, None, :, None] if L.shape[0] == 3 else np.zeros((1, L.shape[1], 1))
+
+    # Compute distance based on the selected mode (far or near field)
+    if mode == "near":
+        # A lead like the far-field projection, which it approaches for distant points
+        dist = np.sqrt(p_x ** 2 + p_y ** 2 + p_z ** 2) - np.sqrt((p_x - r_x) ** 2 + (p_y - r_y) ** 2 + (p_z - r_z) ** 2)
+    elif mode == "far":
+        dist = (p_x * r_x) + (p_y * r_y) + (p_z * r_z)
+    else:
+        raise ValueError("Unknown field mode '{}'.".format(mode))
+
+    return dist / c  # Time of flight based on distance and speed of sound
 
 class ModeVector:
     """
     A class for handling mode vectors, allowing for on-the-fly computation or precomputation.
     Mode vectors are essential for the DOA algorithms, representing the phase delays
     across the microphone array for potential source locations.
+
+    Between the two extremes, a byte budget (cache_bytes) enables lazy mode: blocks of
+    band_size frequency bins are computed on first use and kept in an LRU cache that
+    never grows beyond the budget.
+
+    With a cache_dir, the precomputed tensor is stored as a .npy file keyed by the
+    geometry and memory-mapped on later starts instead of being recomputed.
+
+    tau is a relative lead in both field modes: how much earlier each microphone
+    hears each grid point than the array origin. In near mode it is no longer the
+    time of flight from the point to the microphone.
     """
     
-    def __init__(self, L, fs, nfft, c, grid, mode="far", precompute=False):
+    def __init__(self, L, fs, nfft, c, grid, mode="far", precompute=False, cache_bytes=None, band_size=16, dtype=np.complex128, cache_dir=None, freq_bins=None):
         """
         Initializes the ModeVector object with microphone locations, sampling frequency, and other parameters.
         
@@ -22,33 +118,48 @@ class ModeVector:
         :param grid: The grid object defining candidate source locations
         :param mode: 'far' or 'near', indicating the field mode
         :param precompute: Boolean flag indicating whether to precompute mode vectors
+        :param cache_bytes: Memory budget of the lazy band cache (None disables lazy mode)
+        :param band_size: Number of frequency bins per lazily computed block
+        :param dtype: Storage type of the mode vectors, np.complex128 or np.complex64
+        :param cache_dir: Directory of the on-disk cache of precomputed mode vectors (None disables it)
+        :param freq_bins: FFT bins the mode vectors are computed for (default all nfft / 2 + 1); row i of the tensor is bin freq_bins[i]
         """
         # Validate FFT length to be even
         if nfft % 2 == 1:
             raise ValueError("FFT length must be even.")
         
         self.precompute = precompute
+        self.dtype = np.dtype(dtype)
+        self.band_size = band_size
+        self.cache_bytes = cache_bytes
+        self.lazy = cache_bytes is not None and not precompute
 
-        # Initialize position vectors for the grid and microphone locations
-        p_x = grid.x[None, None, :]
-        p_y = grid.y[None, None, :]
-        p_z = grid.z[None, None, :]
-        r_x = L[0, None, :, None]
-        r_y = L[1, None, :, None]
-        r_z = L[2, None, :, None] if L.shape[0] == 3 else np.zeros((1, L.shape[1], 1))
+        self.tau = time_of_flight(L, grid.x, grid.y, grid.z, c, mode)
 
-        # Compute distance based on the selected mode (far or near field)
-        if mode == "near":
-            dist = np.sqrt((p_x - r_x) ** 2 + (p_y - r_y) ** 2 + (p_z - r_z) ** 2)
-        elif mode == "far":
-            dist = (p_x * r_x) + (p_y * r_y) + (p_z * r_z)
+        self.freq_bins = np.arange(nfft // 2 + 1) if freq_bins is None else np.asarray(freq_bins)
+        self.omega = 2 * np.pi * fs * self.freq_bins / nfft  # Angular frequencies
+        self.n_bands = -(-self.omega.shape[0] // band_size)
+        self.geometry_key = geometry_key(np.asarray(L, dtype=float), fs, nfft, c, mode,
+                                         grid.x, grid.y, grid.z, self.freq_bins)
+        self.from_cache = False
 
-        self.tau = dist / c  # Time of flight based on distance and speed of sound
-
-        self.omega = 2 * np.pi * fs * np.arange(nfft // 2 + 1) / nfft  # Angular frequencies
+        # LRU cache of lazily computed bands and its statistics
+        self._bands = OrderedDict()
+        self._cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
         if precompute:
-            self.modeVec = np.exp(1j * self.omega[:, None, None] * self.tau)
+            shape = (self.omega.shape[0],) + self.tau.shape[1:]
+            if cache_dir is None:
+                self.modeVec = np.empty(shape, dtype=self.dtype)
+                self.fillBands(self.modeVec)
+            else:
+                # The last bin has the largest phases, so any stale geometry shows there
+                check = lambda cached: np.allclose(cached[-1], self.computeOnFly((-1, slice(None), slice(None))), atol=1e-5)
+                self.modeVec, self.from_cache = load_or_build(cache_dir, "modevec", self.geometry_key, shape,
+                                                              self.dtype, self.fillBands, check)
         else:
             self.modeVec = None
 
@@ -61,6 +172,8 @@ class ModeVector:
         """
         if self.precompute:
             return self.modeVec[ref]
+        elif self.lazy:
+            return self.computeCached(ref)
         else:
             return self.computeOnFly(ref)
 
@@ -74,10 +187,234 @@ class ModeVector:
         # Dynamically compute mode vectors based on provided indices
         omega = self.omega[ref[0]]
         if len(ref) == 3:
-            return np.exp(1j * omega * self.tau[:, ref[1], ref[2]])
+            return np.exp(1j * omega * self.tau[:, ref[1], ref[2]]).astype(self.dtype, copy=False)
         else:
             raise ValueError("Incorrect indexing of mode vectors.")
 
+    def computeBand(self, band):
+        """
+        Computes the mode vectors of one block of frequency bins.
+
+        :param band: Index of the block of band_size bins
+        :return: Mode vectors. Shape: (bins in the band, num_mics, grid)
+        """
+        omega = self.omega[band * self.band_size:(band + 1) * self.band_size]
+        return np.exp(1j * omega[:, None, None] * self.tau).astype(self.dtype, copy=False)
+
+    def fillBands(self, out):
+        """
+        Fills the full mode vector tensor band by band, so complex64 storage never needs a complex128 copy.
+
+        :param out: Array of shape (number of freq_bins, num_mics, grid) to fill
+        """
+        for band in range(self.n_bands):
+            start = band * self.band_size
+            out[start:start + self.band_size] = self.computeBand(band)
+
+    def getBand(self, band):
+        """
+        Returns one block of frequency bins from the LRU cache, computing it on a miss.
+
+        :param band: Index of the block of band_size bins
+        :return: Mode vectors. Shape: (bins in the band, num_mics, grid)
+        """
+        block = self._bands.get(band)
+        if block is not None:
+            self.hits += 1
+            self._bands.move_to_end(band)
+            return block
+
+        self.misses += 1
+        block = self.computeBand(band)
+        if block.nbytes > self.cache_bytes:
+            return block  # Larger than the whole budget, never cached
+
+        # Evict the least recently used bands until the new one fits
+        while self._cached_bytes + block.nbytes > self.cache_bytes:
+            _, old = self._bands.popitem(last=False)
+            self._cached_bytes -= old.nbytes
+            self.evictions += 1
+        self._bands[band] = block
+        self._cached_bytes += block.nbytes
+        return block
+
+    def computeCached(self, ref):
+        """
+        Retrieves mode vectors for the given indices from the lazily computed bands.
+
+        :param ref: The indices to retrieve mode vectors for
+        :return: Retrieved mode vectors
+        """
+        if len(ref) != 3:
+            raise ValueError("Incorrect indexing of mode vectors.")
+
+        freqs = np.arange(self.omega.shape[0])[ref[0]]
+        if np.ndim(freqs) == 0:
+            band, offset = divmod(int(freqs), self.band_size)
+            return self.getBand(band)[(offset,) + tuple(ref[1:])]
+
+        # Gather the requested bins, then index them exactly like the full tensor
+        flat = freqs.ravel()
+        rows = np.empty((flat.shape[0],) + self.tau.shape[1:], dtype=self.dtype)
+        bands = flat // self.band_size
+        for band in np.unique(bands):
+            mask = bands == band
+            rows[mask] = self.getBand(band)[flat[mask] - band * self.band_size]
+        local = slice(None) if isinstance(ref[0], slice) else np.arange(flat.shape[0]).reshape(freqs.shape)
+        return rows[(local,) + tuple(ref[1:])]
+
+    def cache_info(self):
+        """
+        Statistics of the lazy band cache.
+
+        :return: Dictionary with hits, misses, evictions, cached bands and cached bytes
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bands": len(self._bands),
+            "bytes": self._cached_bytes,
+        }
+
+class SpatialCovariance:
+    """
+    Running per-frequency spatial covariance of a microphone array.
+
+    Every frame updates R[f] = forget * R[f] + (1 - forget) * x[f] x[f]^H at a cost of
+    O(num_mics**2 * num_freq_bins), so the estimators can read a smoothed
+    covariance instead of rebuilding cross-spectra from all frames of every call.
+    The overall scale of R does not matter to the PHAT and subspace estimators.
+    """
+
+    def __init__(self, num_mics, num_freq_bins, forget=0.9, dtype=np.complex128):
+        """
+        :param num_mics: Number of microphones
+        :param num_freq_bins: Number of frequency bins
+        :param forget: Forgetting factor per frame, closer to 1 smooths over more frames
+        :param dtype: Complex type of the covariance
+        """
+        self.forget = forget
+        self.R = np.zeros((num_freq_bins, num_mics, num_mics), dtype=dtype)
+        self._reference = np.zeros_like(self.R)  # R at the last mark()
+        self.frames = 0
+
+    def update(self, X):
+        """
+        Folds all frames of a block into the covariance, oldest first.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        """
+        num_frames = X.shape[2]
+        if num_frames == 0:
+            return
+        # Frame t of the block ends up weighted by (1 - forget) * forget ** (num_frames - 1 - t)
+        weights = (1 - self.forget) * self.forget ** np.arange(num_frames - 1, -1, -1)
+        Xf = np.asarray(X).transpose(1, 0, 2)
+        self.R *= self.forget ** num_frames
+        self.R += (Xf * weights) @ Xf.conj().transpose(0, 2, 1)
+        self.frames += num_frames
+
+    def change(self):
+        """
+        :return: Relative Frobenius distance of the covariance from the last mark()
+        """
+        ref = np.linalg.norm(self._reference)
+        return np.linalg.norm(self.R - self._reference) / ref if ref > 0 else np.inf
+
+    def mark(self):
+        """
+        Remembers the current covariance as the reference of change().
+        """
+        self._reference[:] = self.R
+
+    def reset(self):
+        self.R[:] = 0
+        self._reference[:] = 0
+        self.frames = 0
+
+class BinSelection:
+    """
+    Chooses the frequency bins a DOA estimate is computed from, per call.
+
+    'topk' keeps the num_bins bins with the most energy. 'snr' tracks a noise floor
+    per bin (falling fast, rising slowly) and weights every bin by its Wiener gain
+    1 - noise / energy, keeping at most num_bins of the bins with a positive weight.
+    """
+
+    def __init__(self, method="topk", num_bins=32, floor_rise=0.01):
+        """
+        :param method: 'topk' or 'snr'
+        :param num_bins: Largest number of bins kept
+        :param floor_rise: Fraction of the gap the noise floor rises by per call when the energy is above it
+        """
+        if method not in ("topk", "snr"):
+            raise ValueError("Unknown bin selection '{}'.".format(method))
+        self.method = method
+        self.num_bins = num_bins
+        self.floor_rise = floor_rise
+        self.noise_floor = None
+
+    def __call__(self, energy):
+        """
+        :param energy: Energy of every candidate bin
+        :return: Sorted indices of the kept bins and their weights (None for equal weights)
+        """
+        k = min(self.num_bins, energy.shape[0])
+        if self.method == "topk":
+            return np.sort(np.argpartition(-energy, k - 1)[:k]), None
+
+        if self.noise_floor is None:
+            self.noise_floor = energy.copy()
+        else:
+            rise = self.floor_rise * (energy - self.noise_floor)
+            self.noise_floor = np.where(energy < self.noise_floor, energy, self.noise_floor + rise)
+        weights = np.clip(1.0 - self.noise_floor / (energy + tol), 0.0, 1.0)
+        if not np.any(weights > 0):
+            # Nothing stands out of the floor yet, fall back to the loudest bins
+            return np.sort(np.argpartition(-energy, k - 1)[:k]), None
+        bins = np.sort(np.argpartition(-weights, k - 1)[:k])
+        bins = bins[weights[bins] > 0]
+        return bins, weights[bins]
+
+class Grid:
+    """
+    A set of candidate source locations on a circle or sphere, described by
+    azimuth/colatitude pairs and their Cartesian coordinates.
+    """
+
+    def __init__(self, azimuth, colatitude=None, r=None):
+        """
+        Builds the grid from the candidate angles.
+
+        :param azimuth: Candidate azimuth angles in radians
+        :param colatitude: Candidate colatitude angles in radians (None for a planar grid)
+        :param r: Distance of the candidate points from the origin (None for unit distance)
+        """
+        azimuth = np.atleast_1d(np.asarray(azimuth, dtype=float))
+        if colatitude is None:
+            colatitude = np.array([np.pi / 2])
+        colatitude = np.atleast_1d(np.asarray(colatitude, dtype=float))
+
+        # Every azimuth is paired with every colatitude, azimuth varying fastest
+        self.azimuth = np.tile(azimuth, colatitude.shape[0])
+        self.colatitude = np.repeat(colatitude, azimuth.shape[0])
+        self.n_azimuth = azimuth.shape[0]
+        self.n_colatitude = colatitude.shape[0]
+        self.n_points = self.azimuth.shape[0]
+
+        r = 1.0 if r is None else r
+        self.x = r * np.sin(self.colatitude) * np.cos(self.azimuth)
+        self.y = r * np.sin(self.colatitude) * np.sin(self.azimuth)
+        self.z = r * np.cos(self.colatitude)
+
+    @property
+    def points(self):
+        """
+        Candidate locations as an array of (azimuth, colatitude) rows.
+        """
+        return np.column_stack((self.azimuth, self.colatitude))
+
 class DOA:
     """
     Base class for Direction of Arrival (DoA) estimation algorithms.
@@ -96,6 +433,21 @@ class DOA:
         :param r: Candidate distances from the origin for near-field mode
         :param azimuth: Candidate azimuth angles
         :param colatitude: Candidate colatitude angles
+        :param refine_levels: Number of coarse-to-fine refinement levels (0 scores every grid point)
+        :param refine_peaks: Number of peaks kept and refined at every level
+        :param min_separation: Smallest azimuth distance in radians between two reported sources
+        :param precompute: Precompute the full mode vector tensor
+        :param cache_bytes: Memory budget of the lazily computed mode vector bands; SRP and MUSIC then read
+                            their steering band by band from this cache instead of holding a full tensor
+        :param band_size: Number of frequency bins per lazily computed band
+        :param dtype: Storage type of the mode vectors and steering tensors, np.complex128 or np.complex64
+        :param cache_dir: Directory of the on-disk cache of precomputed tensors (None disables it)
+        :param freq_range: (low, high) frequencies in Hz; only the bins in between are ever used (None for all)
+        :param bin_select: Per-call bin selection within freq_range, 'topk' or 'snr' (None uses every bin)
+        :param num_bins: Number of bins kept by bin_select
+        :param forget: Forgetting factor of the running spatial covariance (None recomputes from X on every call)
+        :param eval_every: Frames between two evaluations of the spectrum in incremental mode
+        :param change_threshold: Relative covariance change that triggers an early evaluation (None disables it)
         """
         self.L = L  # Microphone positions
         self.fs = fs  # Sampling frequency
@@ -103,8 +455,244 @@ class DOA:
         self.c = c  # Speed of sound
         self.numSrc = numSrc  # Number of sources
         self.mode = mode  # 'far' or 'near'
-        
-        # Additional initialization code for grid and mode vector omitted for brevity
+        self.num_mics = L.shape[1]
+
+        # Default to a 1 degree azimuth grid in the plane of the array
+        if azimuth is None:
+            azimuth = np.linspace(0, 2 * np.pi, 360, endpoint=False)
+        self.grid = Grid(azimuth, colatitude, r if mode == "near" else None)
+
+        # Fixed band: the mode vectors, steering tensors and covariances only cover these bins
+        self.freq_bins = np.arange(nfft // 2 + 1)
+        freq_range = kwargs.get("freq_range")
+        if freq_range is not None:
+            freqs = self.freq_bins * fs / nfft
+            self.freq_bins = self.freq_bins[(freqs >= freq_range[0]) & (freqs <= freq_range[1])]
+            if self.freq_bins.shape[0] == 0:
+                raise ValueError("No FFT bin within the frequency range {}.".format(freq_range))
+        self._band = slice(self.freq_bins[0], self.freq_bins[-1] + 1)
+        bin_select = kwargs.get("bin_select")
+        self.bin_selection = None if bin_select is None else BinSelection(bin_select, kwargs.get("num_bins", 32))
+        self.active_bins = None  # Bins (within freq_bins) used by the last estimate, None for all
+
+        self.mode_vec = ModeVector(L, fs, nfft, c, self.grid, mode=mode, freq_bins=self.freq_bins,
+                                   precompute=kwargs.get("precompute", False),
+                                   cache_bytes=kwargs.get("cache_bytes"),
+                                   band_size=kwargs.get("band_size", 16),
+                                   dtype=kwargs.get("dtype", np.complex128),
+                                   cache_dir=kwargs.get("cache_dir"))
+        self.cache_dir = kwargs.get("cache_dir")
+
+        # Multi-resolution search settings
+        self.refine_levels = kwargs.get("refine_levels", 0)
+        self.refine_peaks = kwargs.get("refine_peaks", 3)
+        self.points_scored = 0  # Grid points evaluated by the last search
+        self.min_separation = kwargs.get("min_separation", np.radians(20))
+
+        self.pair_m, self.pair_n = np.triu_indices(self.num_mics, k=1)
+        self.numPairs = self.pair_m.shape[0]  # Number of microphone pairs
+
+        # Pairwise TDOA of every candidate point, shape (pairs, grid)
+        tau = self.mode_vec.tau[0]
+        self.pair_tau = tau[self.pair_m] - tau[self.pair_n]
+
+        # Incremental mode: a running covariance, evaluated every few frames or on a change
+        forget = kwargs.get("forget")
+        self.covariance = None if forget is None else SpatialCovariance(self.num_mics, self.freq_bins.shape[0], forget)
+        self.eval_every = kwargs.get("eval_every", 1)
+        self.change_threshold = kwargs.get("change_threshold")
+        self._pending_frames = 0
+        self.evaluations = 0
+        self.skipped = 0
+        self.last_estimate = None
+
+        self.grid_values = None  # Spatial spectrum of the last estimate
+        self.azimuth_recon = None
+        self.colatitude_recon = None
+
+    def incremental_due(self, X):
+        """
+        Folds X into the running covariance and decides whether the spectrum needs a new evaluation.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: True when eval_every frames have passed, the covariance changed by more than
+                 change_threshold, or there is no estimate yet
+        """
+        self.covariance.update(self.band(X))
+        self._pending_frames += X.shape[2]
+        due = self.last_estimate is None or self._pending_frames >= self.eval_every
+        if not due and self.change_threshold is not None:
+            due = self.covariance.change() > self.change_threshold
+        if due:
+            self.covariance.mark()
+            self._pending_frames = 0
+            self.evaluations += 1
+        else:
+            self.skipped += 1
+        return due
+
+    def band(self, X):
+        """
+        Restricts full-band signals to the fixed band of the estimator.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, nfft / 2 + 1, num_frames)
+        :return: View of X. Shape: (num_mics, len(freq_bins), num_frames)
+        """
+        return X[:, self._band]
+
+    def choose_bins(self, X=None, R=None):
+        """
+        Runs the per-call bin selection on the band-limited signals or covariance.
+
+        :param X: Band-limited signals. Shape: (num_mics, len(freq_bins), num_frames)
+        :param R: Band-limited covariance, used instead of X. Shape: (len(freq_bins), num_mics, num_mics)
+        :return: Indices into freq_bins and their weights, (None, None) when every bin is used
+        """
+        if self.bin_selection is None:
+            self.active_bins = None
+            return None, None
+        if R is not None:
+            energy = np.einsum("fmm->f", R).real
+        else:
+            energy = np.sum(X.real ** 2 + X.imag ** 2, axis=(0, 2))
+        self.active_bins, weights = self.bin_selection(energy)
+        return self.active_bins, weights
+
+    def cross_spectra(self, X):
+        """
+        Computes the PHAT-weighted cross-spectra of all microphone pairs.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: Normalized cross-spectra. Shape: (num_frames, num_freq_bins, num_pairs)
+        """
+        X = np.asarray(X).transpose(2, 1, 0)
+        CC = X[:, :, self.pair_m] * np.conj(X[:, :, self.pair_n])
+        CC /= np.abs(CC) + tol
+        return CC
+
+    def grid_search(self, score):
+        """
+        Scores the grid, either exhaustively or coarse-to-fine when refine_levels > 0.
+
+        The coarse pass scores every 2**refine_levels-th azimuth (and colatitude). Each
+        refinement halves the step and only scores the neighbours of the refine_peaks
+        best points found so far, down to the full grid resolution. The grid is
+        assumed to be uniformly spaced along each axis.
+
+        :param score: Function mapping an array of flat grid indices to their spectrum values
+        :return: Spatial spectrum over the grid, NaN for points that were never scored
+        """
+        grid = self.grid
+        if self.refine_levels <= 0:
+            self.points_scored = grid.n_points
+            return score(np.arange(grid.n_points))
+
+        n_az, n_col = grid.n_azimuth, grid.n_colatitude
+        az_axis = grid.azimuth[:n_az]
+        wrap = n_az > 1 and np.isclose(n_az * (az_axis[1] - az_axis[0]), 2 * np.pi)
+
+        step = 2 ** self.refine_levels
+        az = np.arange(0, n_az, step)
+        col = np.arange(0, n_col, step) if n_col > 1 else np.zeros(1, dtype=int)
+        idx = (col[:, None] * n_az + az[None, :]).ravel()
+
+        values = np.full(grid.n_points, np.nan)
+        values[idx] = score(idx)
+        scored = idx
+
+        for _ in range(self.refine_levels):
+            step //= 2
+            # Keep the best points found so far and look at their neighbours
+            order = np.argsort(values[scored])[::-1][:self.refine_peaks]
+            peaks = scored[order]
+            offsets = np.array([-step, 0, step])
+            peak_col, peak_az = np.divmod(peaks, n_az)
+
+            cand_az = peak_az[:, None, None] + offsets[None, None, :]
+            if wrap:
+                cand_az %= n_az
+            cand_col = peak_col[:, None, None] + (offsets[None, :, None] if n_col > 1 else 0)
+            valid = (cand_az >= 0) & (cand_az < n_az) & (cand_col >= 0) & (cand_col < n_col)
+            cand = np.unique((cand_col * n_az + cand_az)[valid])
+            cand = cand[np.isnan(values[cand])]
+
+            if cand.size:
+                values[cand] = score(cand)
+                scored = np.concatenate((scored, cand))
+
+        self.points_scored = scored.shape[0]
+        return values
+
+    def find_peaks(self, values, num_src=None):
+        """
+        Picks the strongest peaks of one or a batch of spatial spectra, with non-maximum
+        suppression over azimuth: a local maximum is dropped when a stronger one lies
+        within min_separation. All frames are processed at once.
+
+        :param values: Spectrum over the grid, shape (grid,) or (num_frames, grid), NaN for unscored points
+        :param num_src: Number of peaks to return (default numSrc)
+        :return: Flat grid indices of the peaks, strongest first, shape (num_src,) or (num_frames, num_src), -1 where there are fewer peaks
+        """
+        num_src = self.numSrc if num_src is None else num_src
+        grid = self.grid
+        n_az, n_col = grid.n_azimuth, grid.n_colatitude
+        single = np.ndim(values) == 1
+        values = np.atleast_2d(values)
+        values = np.where(np.isnan(values), -np.inf, values).reshape(values.shape[0], n_col, n_az)
+
+        # Best colatitude of every azimuth, then peaks along the azimuth axis
+        best_col = values.argmax(axis=1)
+        az_values = values.max(axis=1)
+        az_axis = grid.azimuth[:n_az]
+        wrap = n_az > 1 and np.isclose(n_az * (az_axis[1] - az_axis[0]), 2 * np.pi)
+
+        left = np.roll(az_values, 1, axis=1)
+        right = np.roll(az_values, -1, axis=1)
+        if not wrap:
+            left[:, 0] = -np.inf
+            right[:, -1] = -np.inf
+        peak_values = np.where((az_values > left) & (az_values >= right), az_values, -np.inf)
+
+        # Only the strongest few local maxima can survive, compare those pairwise
+        k = min(n_az, 4 * num_src)
+        cand = np.argpartition(-peak_values, k - 1, axis=1)[:, :k]
+        cand_values = np.take_along_axis(peak_values, cand, axis=1)
+        dist = np.abs(az_axis[cand][:, :, None] - az_axis[cand][:, None, :])
+        if wrap:
+            dist = np.minimum(dist, 2 * np.pi - dist)
+        stronger = cand_values[:, None, :] > cand_values[:, :, None]
+        suppressed = np.any(stronger & (dist < self.min_separation), axis=2)
+        cand_values = np.where(suppressed, -np.inf, cand_values)
+
+        order = np.argsort(-cand_values, axis=1, kind="stable")[:, :num_src]
+        top = np.take_along_axis(cand, order, axis=1)
+        found = np.isfinite(np.take_along_axis(cand_values, order, axis=1))
+        peaks = np.take_along_axis(best_col, top, axis=1) * n_az + top
+        peaks[~found] = -1
+        if peaks.shape[1] < num_src:
+            peaks = np.pad(peaks, ((0, 0), (0, num_src - peaks.shape[1])), constant_values=-1)
+        return peaks[0] if single else peaks
+
+    def grid_estimate(self):
+        """
+        Reads the direction(s) off grid_values: the maximum, or numSrc separated peaks.
+
+        :return: Estimated azimuth in degrees, an array of azimuths strongest first when numSrc > 1
+        """
+        if self.numSrc > 1:
+            # One azimuth per separated peak, strongest first
+            peaks = self.find_peaks(self.grid_values)
+            peaks = peaks[peaks >= 0]
+            self.azimuth_recon = self.grid.azimuth[peaks]
+            self.colatitude_recon = self.grid.colatitude[peaks]
+            return np.degrees(self.azimuth_recon) % 360
+
+        # Find the index of the maximum value in the spatial spectrum
+        estimated_source_index = np.nanargmax(self.grid_values)
+        self.azimuth_recon = self.grid.azimuth[estimated_source_index]
+        self.colatitude_recon = self.grid.colatitude[estimated_source_index]
+
+        return np.degrees(self.azimuth_recon) % 360
 
 class SRP(DOA):
     """
@@ -116,54 +704,454 @@ class SRP(DOA):
         Initializes the SRP object with the same parameters as the DOA class.
         """
         super().__init__(L, fs, nfft, c, numSrc, mode, r, azimuth, colatitude, **kwargs)
-        self.numPairs = self.L.shape[1] * (self.L.shape[1] - 1) / 2  # Number of microphone pairs
+
+        # Steering phases of every grid point over all (frequency, pair). The real
+        # part of CC * exp(-1j * phase) is CC.real * cos + CC.imag * sin, so the
+        # cos/sin halves are stacked into one real row per grid point and the grid
+        # (or any subset of its rows) is scored with a single matrix product.
+        # With a cache_bytes budget the matrix is never built: the grid is scored band by
+        # band from the lazily cached mode vectors, as a_m * conj(a_n) = cos + 1j * sin.
+        shape = (self.grid.n_points, 2 * self.mode_vec.omega.shape[0] * self.numPairs)
+        dtype = np.finfo(self.mode_vec.dtype).dtype
+        self.feature_dtype = dtype
+        self.steering_from_cache = False
+        if self.mode_vec.lazy:
+            self.steering = None
+        elif self.cache_dir is None:
+            self.steering = np.empty(shape, dtype=dtype)
+            self.fillSteering(self.steering)
+        else:
+            # Spot check the first and last grid points, cos and sin halves (cos alone misses a mirrored geometry)
+            spot = np.array([0, self.grid.n_points - 1])
+            check = lambda cached: np.allclose(cached[spot], self.steeringRows(spot), atol=1e-5)
+            self.steering, self.steering_from_cache = load_or_build(self.cache_dir, "srp_steering", self.mode_vec.geometry_key,
+                                                                    shape, dtype, self.fillSteering, check)
+        self.norm = self.numPairs * self.mode_vec.omega.shape[0]
+        self.active_steering = self.steering  # Columns of the bins used by the last features
+        self.active_norm = self.norm
+        self.active_freqs = np.arange(self.mode_vec.omega.shape[0])  # Bins of the last features
+
+    def fillSteering(self, out):
+        """
+        Fills the steering matrix with the cos/sin rows of every grid point.
+
+        :param out: Array of shape (grid, 2 * num_freq_bins * num_pairs) to fill
+        """
+        for start in range(0, self.grid.n_points, 256):
+            out[start:start + 256] = self.steeringRows(slice(start, start + 256))
+
+    def steeringRows(self, rows):
+        """
+        Computes rows of the steering matrix.
+
+        :param rows: Slice or indices of grid points
+        :return: cos/sin rows. Shape: (rows, 2 * num_freq_bins * num_pairs)
+        """
+        phase = self.mode_vec.omega[None, :, None] * self.pair_tau.T[rows, None, :]
+        phase = phase.reshape(phase.shape[0], -1)
+        return np.concatenate((np.cos(phase), np.sin(phase)), axis=1)
+
+    def activate_bins(self, bins, weights):
+        """
+        Selects the steering columns of the bins the next features are computed from.
+
+        :param bins: Indices into freq_bins (None for all)
+        :param weights: Weights of the bins (None for equal weights)
+        """
+        if bins is None:
+            self.active_steering = self.steering
+            self.active_norm = self.norm
+            self.active_freqs = np.arange(self.mode_vec.omega.shape[0])
+            return
+        self.active_freqs = bins
+        self.active_norm = self.numPairs * (bins.shape[0] if weights is None else np.sum(weights))
+        if self.steering is None:
+            return
+        cols = (bins[:, None] * self.numPairs + np.arange(self.numPairs)).ravel()
+        self.active_steering = self.steering[:, np.concatenate((cols, cols + self.steering.shape[1] // 2))]
+
+    def flatten_features(self, CC, weights):
+        """
+        :param CC: PHAT-weighted cross-spectra. Shape: (rows, bins, num_pairs)
+        :param weights: Weights of the bins (None for equal weights)
+        :return: Feature rows. Shape: (rows, 2 * bins * num_pairs)
+        """
+        if weights is not None:
+            CC = CC * weights[:, None]
+        CC = CC.reshape(CC.shape[0], -1)
+        return np.concatenate((CC.real, CC.imag), axis=1).astype(self.feature_dtype, copy=False)
+
+    def pair_features(self, X, per_frame=False):
+        """
+        Flattens the cross-spectra into the real feature rows matched against the steering matrix.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, nfft / 2 + 1, num_frames)
+        :param per_frame: Keep one row per frame instead of the average over frames
+        :return: Feature rows. Shape: (num_frames or 1, 2 * bins used * num_pairs)
+        """
+        X = self.band(X)
+        bins, weights = self.choose_bins(X=X)
+        self.activate_bins(bins, weights)
+        CC = self.cross_spectra(X if bins is None else X[:, bins])
+        if not per_frame:
+            CC = CC.mean(axis=0, keepdims=True)
+        return self.flatten_features(CC, weights)
+
+    def covariance_features(self):
+        """
+        Feature rows of the PHAT-weighted pair entries of the running spatial covariance.
+
+        :return: Feature rows. Shape: (1, 2 * bins used * num_pairs)
+        """
+        R = self.covariance.R
+        bins, weights = self.choose_bins(R=R)
+        self.activate_bins(bins, weights)
+        CC = (R if bins is None else R[bins])[:, self.pair_m, self.pair_n]
+        return self.flatten_features((CC / (np.abs(CC) + tol))[None], weights)
+
+    def score(self, features, idx=None):
+        """
+        Evaluates the SRP-PHAT power of the given grid points.
+
+        :param features: Rows returned by the last pair_features or covariance_features call
+        :param idx: Flat grid indices to score (None for the whole grid)
+        :return: Power scaled to the average PHAT correlation of a pair, 1.0 for a perfect match
+        """
+        if self.steering is None:
+            return self.score_bands(features, idx)
+        steering = self.active_steering if idx is None else self.active_steering[idx]
+        return (features @ steering.T) / self.active_norm
+
+    def score_bands(self, features, idx=None):
+        """
+        score() from the lazily cached mode vectors, band_size bins at a time.
+
+        :param features: Rows returned by the last pair_features or covariance_features call
+        :param idx: Flat grid indices to score (None for the whole grid)
+        :return: Power scaled to the average PHAT correlation of a pair
+        """
+        freqs = self.active_freqs
+        half = features.shape[1] // 2
+        real = features[:, :half].reshape(features.shape[0], freqs.shape[0], self.numPairs)
+        imag = features[:, half:].reshape(real.shape)
+        power = 0.0
+        for start in range(0, freqs.shape[0], self.mode_vec.band_size):
+            band = slice(start, start + self.mode_vec.band_size)
+            A = self.mode_vec[freqs[band], :, :]
+            if idx is not None:
+                A = A[:, :, idx]
+            pairs = A[:, self.pair_m] * np.conj(A[:, self.pair_n])  # exp(1j * omega * pair_tau)
+            power = power + np.einsum("rfp,fpg->rg", real[:, band], pairs.real) \
+                + np.einsum("rfp,fpg->rg", imag[:, band], pairs.imag)
+        return power / self.active_norm
+
+    def spatial_spectrum(self, X, per_frame=False):
+        """
+        Computes the SRP-PHAT power of every grid point.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :param per_frame: Return one spectrum per frame instead of the average over frames
+        :return: Spatial spectrum. Shape: (grid,) or (num_frames, grid)
+        """
+        power = self.score(self.pair_features(X, per_frame))
+        return power if per_frame else power[0]
 
     def Mic_tuning_direction(self, X):
+        """
+        Process the given multichannel signals to estimate DOA using the SRP-PHAT algorithm.
+        
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: Estimated azimuth in degrees
+        """
+        if self.covariance is None:
+            features = self.pair_features(X)
+        elif self.incremental_due(X):
+            features = self.covariance_features()
+        else:
+            return self.last_estimate
+        self.grid_values = self.grid_search(lambda idx: self.score(features, idx)[0])
+        self.last_estimate = self.grid_estimate()
+        return self.last_estimate
+
+    def multi_direction(self, X, num_src=None):
+        """
+        Estimates up to num_src directions in every frame of a batch, without a grid search per frame.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :param num_src: Number of sources per frame (default numSrc)
+        :return: Azimuths in degrees, strongest first, shape (num_frames, num_src), NaN where fewer peaks were found
+        """
+        peaks = self.find_peaks(self.spatial_spectrum(X, per_frame=True), num_src)
+        azimuth = np.degrees(self.grid.azimuth[np.maximum(peaks, 0)]) % 360
+        return np.where(peaks >= 0, azimuth, np.nan)
+
+class GCCPHAT(DOA):
     """
-    Process the given multichannel signals to estimate DOA using the SRP-PHAT algorithm.
-    
-    :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+    Implements pairwise GCC-PHAT time delay estimation with a least-squares direction solve.
+
+    The PHAT cross-spectra of all microphone pairs are turned into cross-correlations
+    with one batched, zero-padded irfft. The peak of every pair within the physically
+    possible lags is refined by parabolic interpolation, and the far-field direction
+    follows from the TDOAs in closed form through the pseudo-inverse of the pair
+    baselines. No grid is scanned, so an estimate costs a fraction of SRP.
     """
-    # Number of points in the search grid
-    n_points = self.grid.n_points
-    
-    # Initialize the SRP-PHAT spectrum
-    srp_phat_spectrum = np.zeros(n_points)
-    
-    # Loop over all grid points to compute SRP-PHAT
-    for i, point in enumerate(self.grid.points):
-        # Initialize accumulator for this grid point
-        accumulator = 0
-        
-        # Loop over all pairs of microphones
-        for m in range(self.num_mics - 1):
-            for n in range(m + 1, self.num_mics):
-                # Calculate the Time Difference of Arrival (TDOA) for this pair and grid point
-                tdoa = self.calculateTDOA(m, n, point)
-                
-                # Convert TDOA to phase difference
-                phase_diff = 2 * np.pi * self.freq_bins * tdoa / self.fs
-                
-                # Apply the PHAT weighting
-                X_weighted_m = X[m, :, :] * np.exp(-1j * phase_diff)
-                X_weighted_n = X[n, :, :]
-                
-                # Cross-correlation between the two weighted signals
-                cross_corr = np.sum(np.conj(X_weighted_m) * X_weighted_n, axis=1)
-                
-                # Accumulate the power (magnitude of cross-correlation)
-                accumulator += np.abs(cross_corr)
-        
-        # Store the accumulated power for this grid point
-        srp_phat_spectrum[i] = np.sum(accumulator)
-    
-    # Find the index of the maximum value in the SRP-PHAT spectrum
-    estimated_source_index = np.argmax(srp_phat_spectrum)
-    
-    # Retrieve the corresponding grid point as the estimated DOA
-    estimated_doa = self.grid.points[estimated_source_index]
-    
-    return estimated_doa
+
+    def __init__(self, L, fs, nfft, c=343.0, numSrc=1, mode="far", r=None, azimuth=None, colatitude=None, **kwargs):
+        """
+        Initializes the GCCPHAT object with the same parameters as the DOA class.
+
+        :param interp: Upsampling factor of the cross-correlations (zero-padded irfft length / nfft)
+        """
+        super().__init__(L, fs, nfft, c, numSrc, mode, r, azimuth, colatitude, **kwargs)
+        if mode == "near":
+            warnings.warn("GCCPHAT solves for a far-field direction, the near-field model is ignored.")
+        self.interp = kwargs.get("interp", 4)
+        self.n_corr = nfft * self.interp
+
+        # Baselines of the pairs; a far-field source gives D @ u = c * tdoa
+        L3 = np.vstack((L, np.zeros((3 - L.shape[0], L.shape[1])))) if L.shape[0] < 3 else np.asarray(L, dtype=float)
+        D = (L3[:, self.pair_m] - L3[:, self.pair_n]).T
+        self.solver = c * np.linalg.pinv(D)
+        self.planar = np.allclose(D[:, 2], 0)
+
+        # Only lags up to the longest baseline can hold a peak, plus one for the interpolation
+        max_lag = int(np.ceil(np.max(np.linalg.norm(D, axis=1)) / c * fs * self.interp)) + 1
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self._lag_idx = self.lags % self.n_corr
+        self.pair_peaks = None  # Interpolated correlation peaks of the last estimate
+
+    def tdoa(self, X, per_frame=False):
+        """
+        Estimates the time difference of arrival of every microphone pair.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :param per_frame: Keep one estimate per frame instead of using the average cross-spectrum
+        :return: TDOAs in seconds. Shape: (num_frames or 1, num_pairs)
+        """
+        X = self.band(X)
+        bins, weights = self.choose_bins(X=X)
+        CC = self.cross_spectra(X if bins is None else X[:, bins])
+        if not per_frame:
+            CC = CC.mean(axis=0, keepdims=True)
+        return self.pair_tdoa(CC, bins, weights)
+
+    def pair_tdoa(self, CC, bins=None, weights=None):
+        """
+        Estimates the TDOAs from a batch of PHAT-weighted cross-spectra.
+
+        :param CC: Cross-spectra of the band or of the given bins. Shape: (num_frames, bins, num_pairs)
+        :param bins: Indices into freq_bins of the rows of CC (None for the whole band)
+        :param weights: Weights of the bins (None for equal weights)
+        :return: TDOAs in seconds. Shape: (num_frames, num_pairs)
+        """
+        if weights is not None:
+            CC = CC * weights[:, None]
+        if bins is not None or self.freq_bins.shape[0] != self.nfft // 2 + 1:
+            # Unused bins stay zero in the spectrum handed to the irfft
+            full = np.zeros((CC.shape[0], self.nfft // 2 + 1, CC.shape[2]), dtype=CC.dtype)
+            full[:, self.freq_bins if bins is None else self.freq_bins[bins]] = CC
+            CC = full
+        cc = np.fft.irfft(CC, n=self.n_corr, axis=1)[:, self._lag_idx, :]
+
+        # Integer peak, kept off the window edges so both neighbours exist
+        k = np.clip(np.argmax(cc, axis=1), 1, self.lags.shape[0] - 2)[:, None, :]
+        y0 = np.take_along_axis(cc, k - 1, axis=1)[:, 0]
+        y1 = np.take_along_axis(cc, k, axis=1)[:, 0]
+        y2 = np.take_along_axis(cc, k + 1, axis=1)[:, 0]
+        denom = y0 - 2 * y1 + y2
+        delta = np.where(denom < -tol, 0.5 * (y0 - y2) / np.where(denom < -tol, denom, -1.0), 0.0)
+        self.pair_peaks = y1 - 0.25 * (y0 - y2) * delta
+
+        # A phase of omega * (tau_m - tau_n) peaks the correlation at the negative lag
+        return -(self.lags[k[:, 0]] + delta) / (self.fs * self.interp)
+
+    def directions(self, tdoa):
+        """
+        Solves the far-field direction of one or more sets of pair TDOAs.
+
+        :param tdoa: TDOAs in seconds. Shape: (num_pairs,) or (num_frames, num_pairs)
+        :return: Azimuth and colatitude in radians
+        """
+        u = np.asarray(tdoa) @ self.solver.T
+        azimuth = np.arctan2(u[..., 1], u[..., 0])
+        if self.planar:
+            # A planar array cannot tell elevation apart, the source is assumed in its plane
+            colatitude = np.full(azimuth.shape, np.pi / 2)
+        else:
+            norm = np.linalg.norm(u, axis=-1) + tol
+            colatitude = np.arccos(np.clip(u[..., 2] / norm, -1, 1))
+        return azimuth, colatitude
+
+    def Mic_tuning_direction(self, X):
+        """
+        Process the given multichannel signals to estimate DOA using GCC-PHAT.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: Estimated azimuth in degrees
+        """
+        if self.covariance is None:
+            tdoa = self.tdoa(X)[0]
+        elif self.incremental_due(X):
+            R = self.covariance.R
+            bins, weights = self.choose_bins(R=R)
+            CC = (R if bins is None else R[bins])[None, :, self.pair_m, self.pair_n]
+            tdoa = self.pair_tdoa(CC / (np.abs(CC) + tol), bins, weights)[0]
+        else:
+            return self.last_estimate
+        self.azimuth_recon, self.colatitude_recon = self.directions(tdoa)
+        self.last_estimate = np.degrees(self.azimuth_recon) % 360
+        return self.last_estimate
+
+class MUSIC(DOA):
+    """
+    Implements the MUltiple SIgnal Classification (MUSIC) algorithm for DoA estimation.
+
+    The spatial covariance of every frequency bin is decomposed with one batched
+    eigh call; its num_mics - numSrc weakest eigenvectors span the noise subspace,
+    which is orthogonal to the mode vectors of the sources. The broadband
+    pseudo-spectrum is the average over bins of 1 / ||En^H a||^2. Since the mode
+    vectors have unit-modulus entries, ||En^H a||^2 = num_mics - ||Es^H a||^2 and
+    only the numSrc columns of the signal subspace Es are multiplied with the grid.
+
+    Subspaces are kept between calls: only the bins whose covariance moved by
+    more than subspace_tolerance (relative Frobenius distance) since their last
+    decomposition are decomposed again, and on the full grid their per-bin
+    pseudo-spectra are cached as well, so the cost of an estimate follows the number
+    of bins that changed. This pays off with the running covariance of the
+    incremental mode, which changes slowly from frame to frame.
+    """
+
+    def __init__(self, L, fs, nfft, c=343.0, numSrc=1, mode="far", r=None, azimuth=None, colatitude=None, **kwargs):
+        """
+        Initializes the MUSIC object with the same parameters as the DOA class.
+
+        :param subspace_tolerance: Relative covariance change of a bin below which its subspace is reused
+        """
+        super().__init__(L, fs, nfft, c, numSrc, mode, r, azimuth, colatitude, **kwargs)
+        if numSrc >= self.num_mics:
+            raise ValueError("MUSIC needs fewer sources than microphones.")
+        self.subspace_tolerance = kwargs.get("subspace_tolerance", 0.05)
+
+        # Mode vectors of the whole grid, shape (len(freq_bins), num_mics, grid); under a
+        # cache_bytes budget they are read band by band from the ModeVector cache instead
+        if self.mode_vec.precompute:
+            self.steering = self.mode_vec.modeVec
+        elif self.mode_vec.lazy:
+            self.steering = None
+        else:
+            self.steering = np.empty((self.freq_bins.shape[0], self.num_mics, self.grid.n_points), dtype=self.mode_vec.dtype)
+            self.mode_vec.fillBands(self.steering)
+
+        num_freq = self.freq_bins.shape[0]
+        self.signal_subspace = np.zeros((num_freq, self.num_mics, numSrc), dtype=self.mode_vec.dtype)
+        self._R_ref = np.zeros((num_freq, self.num_mics, self.num_mics), dtype=complex)
+        self._has_subspace = np.zeros(num_freq, dtype=bool)
+        self._bin_spectra = np.zeros((num_freq, self.grid.n_points))  # Pseudo-spectrum of every bin over the grid
+        self._weights = None  # Weights of the active bins in the broadband average
+        self.bins_decomposed = 0
+        self.bins_reused = 0
+
+    def covariance_matrix(self, X):
+        """
+        Computes the spatial covariance of every frequency bin, averaged over the frames.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: Covariance matrices. Shape: (num_freq_bins, num_mics, num_mics)
+        """
+        Xf = np.asarray(X).transpose(1, 0, 2)
+        return (Xf @ Xf.conj().transpose(0, 2, 1)) / max(Xf.shape[2], 1)
+
+    def update_subspace(self, R, bins=None):
+        """
+        Refreshes the subspaces of the bins whose covariance changed enough.
+
+        :param R: Covariance matrices of the bins. Shape: (bins, num_mics, num_mics)
+        :param bins: Indices into freq_bins of the rows of R (None for all)
+        :return: Indices into freq_bins of the bins that were decomposed again
+        """
+        bins = np.arange(self.freq_bins.shape[0]) if bins is None else bins
+        ref = self._R_ref[bins]
+        change = np.linalg.norm(R - ref, axis=(1, 2))
+        stale = ~self._has_subspace[bins] | (change > self.subspace_tolerance * (np.linalg.norm(ref, axis=(1, 2)) + tol))
+        num_stale = int(np.count_nonzero(stale))
+        if num_stale:
+            # Eigenvalues come in ascending order, the signal subspace is the last columns
+            _, V = np.linalg.eigh(R[stale])
+            self.signal_subspace[bins[stale]] = V[:, :, self.num_mics - self.numSrc:]
+            self._R_ref[bins[stale]] = R[stale]
+            self._has_subspace[bins[stale]] = True
+        self.bins_decomposed += num_stale
+        self.bins_reused += bins.shape[0] - num_stale
+        return bins[stale]
+
+    def bin_spectra(self, bins=slice(None), idx=None):
+        """
+        Evaluates the narrowband MUSIC pseudo-spectra with the current subspaces.
+
+        :param bins: Indices into freq_bins to evaluate (or a slice)
+        :param idx: Flat grid indices to score (None for the whole grid)
+        :return: Pseudo-spectra. Shape: (bins, grid points)
+        """
+        if self.steering is not None:
+            return self.narrowband(self.signal_subspace[bins], self.steering[bins], idx)
+        bins = np.arange(self.freq_bins.shape[0])[bins]
+        spectra = np.empty((bins.shape[0], self.grid.n_points if idx is None else len(idx)))
+        for start in range(0, bins.shape[0], self.mode_vec.band_size):
+            part = bins[start:start + self.mode_vec.band_size]
+            spectra[start:start + part.shape[0]] = self.narrowband(self.signal_subspace[part], self.mode_vec[part, :, :], idx)
+        return spectra
+
+    def narrowband(self, Es, A, idx=None):
+        """
+        :param Es: Signal subspaces of some bins. Shape: (bins, num_mics, numSrc)
+        :param A: Mode vectors of the same bins. Shape: (bins, num_mics, grid)
+        :param idx: Flat grid indices to score (None for the whole grid)
+        :return: Pseudo-spectra. Shape: (bins, grid points)
+        """
+        if idx is not None:
+            A = A[:, :, idx]
+        proj = Es.conj().transpose(0, 2, 1) @ A
+        denom = 1.0 - np.sum(proj.real ** 2 + proj.imag ** 2, axis=1) / self.num_mics
+        return 1.0 / (denom + tol)
+
+    def score(self, idx=None):
+        """
+        Evaluates the broadband MUSIC pseudo-spectrum of the given grid points.
+
+        :param idx: Flat grid indices to score (None for the whole grid)
+        :return: Pseudo-spectrum, averaged over the active frequency bins
+        """
+        bins = slice(None) if self.active_bins is None else self.active_bins
+        return np.average(self.bin_spectra(bins, idx), axis=0, weights=self._weights)
+
+    def Mic_tuning_direction(self, X):
+        """
+        Process the given multichannel signals to estimate DOA using the MUSIC algorithm.
+
+        :param X: Multichannel signals in the frequency domain. Shape: (num_mics, num_freq_bins, num_frames)
+        :return: Estimated azimuth in degrees, an array of azimuths strongest first when numSrc > 1
+        """
+        if self.covariance is None:
+            X = self.band(X)
+            bins, self._weights = self.choose_bins(X=X)
+            R = self.covariance_matrix(X if bins is None else X[:, bins])
+        elif self.incremental_due(X):
+            bins, self._weights = self.choose_bins(R=self.covariance.R)
+            R = self.covariance.R if bins is None else self.covariance.R[bins]
+        else:
+            return self.last_estimate
+        stale = self.update_subspace(R, bins)
+        if self.refine_levels <= 0:
+            # Only the bins with a new subspace change the cached narrowband spectra
+            if stale.shape[0]:
+                self._bin_spectra[stale] = self.bin_spectra(stale)
+            active = self._bin_spectra if bins is None else self._bin_spectra[bins]
+            self.grid_values = np.average(active, axis=0, weights=self._weights)
+            self.points_scored = self.grid.n_points
+        else:
+            self.grid_values = self.grid_search(self.score)
+        self.last_estimate = self.grid_estimate()
+        return self.last_estimate
 
 
 # Example of instantiation and usage
@@ -172,4 +1160,4 @@ class SRP(DOA):
 # nfft = 512  # Example FFT length
 # srp = SRP(L, fs, nfft)
 # X = np.random.rand(L.shape[1], nfft//2+1, 100)  # Simulated frequency-domain signals
-# srp.process(X)
+# srp.Mic_tuning_direction(X)
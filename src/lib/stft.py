@@ -0,0 +1,187 @@
+import inspect
+import numpy as np
+
+# numpy >= 2.0 can write the FFT straight into a preallocated array
+_RFFT_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+class StreamingSTFT:
+    """
+    Streaming short-time Fourier transform of an interleaved multichannel audio stream.
+
+    Incoming chunks are written into a preallocated ring buffer. Every complete,
+    windowed frame is transformed with one rfft across all channels, and the result
+    is handed out as X of shape (num_mics, num_freq_bins, num_frames), the layout
+    the DOA estimators in srp.py consume.
+
+    The ring buffer is stored twice back to back, so every frame is a contiguous
+    slice and all frames of a chunk are a single strided view. Nothing is allocated
+    per chunk: the X handed out is a view into an internal buffer and is overwritten
+    by the next push.
+    """
+
+    def __init__(self, num_channels, nfft=512, hop=None, window=None, channels=None, chunk=1024, dtype=np.float64):
+        """
+        Initializes the buffers of the streaming STFT.
+
+        :param num_channels: Number of interleaved channels in the incoming stream
+        :param nfft: FFT length
+        :param hop: Hop size between frames (default nfft // 2)
+        :param window: Analysis window of length nfft (default Hann)
+        :param channels: Indices of the channels to transform (default all)
+        :param chunk: Largest number of samples per channel pushed at once
+        :param dtype: Floating point type of the time-domain buffers
+        """
+        if nfft % 2 == 1:
+            raise ValueError("FFT length must be even.")
+
+        self.num_channels = num_channels
+        self.nfft = nfft
+        self.hop = nfft // 2 if hop is None else hop
+        self.channels = np.arange(num_channels) if channels is None else np.asarray(channels)
+        # Contiguous channel ranges are selected with a slice, which is a view and not a copy
+        if np.all(np.diff(self.channels) == 1):
+            self._select = slice(self.channels[0], self.channels[-1] + 1)
+        else:
+            self._select = self.channels
+        self.chunk = chunk
+        self.window = np.hanning(nfft + 1)[:-1] if window is None else np.asarray(window)
+        self.window = self.window.astype(dtype)
+
+        # The capacity covers a partial frame plus the largest chunk
+        self.capacity = nfft + chunk
+        self.max_frames = (self.capacity - nfft) // self.hop + 1
+        num_mics = self.channels.shape[0]
+        self._ring = np.zeros((num_mics, 2 * self.capacity), dtype=dtype)
+        self._frames = np.empty((num_mics, self.max_frames, nfft), dtype=dtype)
+        complex_dtype = np.result_type(dtype, np.complex64)
+        self._spec = np.empty((num_mics, self.max_frames, nfft // 2 + 1), dtype=complex_dtype)
+
+        self.scale = 1.0 / 32768  # int16 full scale to [-1, 1)
+        self.samples_written = 0  # Samples per channel received so far
+        self.next_frame = 0  # Sample index where the next frame starts
+        self.frames_out = 0  # Frames produced so far
+
+    def reset(self):
+        """
+        Forgets all buffered samples.
+        """
+        self._ring[:] = 0
+        self.samples_written = 0
+        self.next_frame = 0
+        self.frames_out = 0
+
+    def _write(self, samples):
+        """
+        Copies (samples, channels) data into both halves of the ring buffer.
+        """
+        n = samples.shape[0]
+        pos = self.samples_written % self.capacity
+        first = min(n, self.capacity - pos)
+        for start, length, src in ((pos, first, 0), (0, n - first, first)):
+            if length == 0:
+                continue
+            block = samples[src:src + length].T
+            np.multiply(block, self.scale, out=self._ring[:, start:start + length])
+            np.multiply(block, self.scale, out=self._ring[:, start + self.capacity:start + self.capacity + length])
+        self.samples_written += n
+
+    def push(self, data):
+        """
+        Adds one chunk of audio and transforms every frame that became complete.
+
+        :param data: Interleaved int16 bytes or an array of shape (samples, num_channels)
+        :return: View of X with shape (num_mics, num_freq_bins, num_frames), possibly with zero frames
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = np.frombuffer(data, dtype=np.int16).reshape(-1, self.num_channels)
+        if data.shape[0] > self.chunk:
+            raise ValueError("Chunk of {} samples exceeds the configured maximum of {}.".format(data.shape[0], self.chunk))
+
+        self._write(data[:, self._select])
+
+        num_frames = 0
+        if self.samples_written >= self.next_frame + self.nfft:
+            num_frames = (self.samples_written - self.next_frame - self.nfft) // self.hop + 1
+
+        if num_frames:
+            # All new frames as one strided view of the doubled ring buffer
+            start = self.next_frame % self.capacity
+            ring = self._ring[:, start:]
+            view = np.lib.stride_tricks.as_strided(
+                ring, shape=(ring.shape[0], num_frames, self.nfft),
+                strides=(ring.strides[0], self.hop * ring.strides[1], ring.strides[1]), writeable=False)
+            frames = self._frames[:, :num_frames]
+            np.multiply(view, self.window, out=frames)
+            if _RFFT_OUT:
+                np.fft.rfft(frames, axis=-1, out=self._spec[:, :num_frames])
+            else:
+                self._spec[:, :num_frames] = np.fft.rfft(frames, axis=-1)
+            self.next_frame += num_frames * self.hop
+            self.frames_out += num_frames
+
+        return self._spec[:, :num_frames].transpose(0, 2, 1)
+
+    def stream(self, chunks):
+        """
+        Generator producing X blocks from an iterable of chunks, skipping chunks that completed no frame.
+
+        :param chunks: Iterable of interleaved int16 bytes or (samples, num_channels) arrays
+        :return: Generator of X views with shape (num_mics, num_freq_bins, num_frames)
+        """
+        for data in chunks:
+            X = self.push(data)
+            if X.shape[2]:
+                yield X
+
+class StreamingISTFT:
+    """
+    Streaming inverse of StreamingSTFT by overlap-add.
+
+    The default periodic Hann window at a hop of nfft / 2 (or nfft / 4, ...) sums to a
+    constant, so frames are added back without a synthesis window and divided by
+    that constant. Every frame completes hop output samples; the remaining
+    nfft - hop samples are carried over to the next push.
+    """
+
+    def __init__(self, nfft=512, hop=None, window=None, scale=32768.0):
+        """
+        :param nfft: FFT length
+        :param hop: Hop size between frames (default nfft // 2), must divide nfft
+        :param window: Analysis window used by the STFT (default Hann)
+        :param scale: Factor undoing the int16 scaling of StreamingSTFT
+        """
+        self.nfft = nfft
+        self.hop = nfft // 2 if hop is None else hop
+        if nfft % self.hop:
+            raise ValueError("The hop size must divide the FFT length.")
+        window = np.hanning(nfft + 1)[:-1] if window is None else np.asarray(window)
+        # Overlap-added analysis windows sum to this gain at every sample
+        self.gain = window.reshape(-1, self.hop).sum(axis=0).mean()
+        self.scale = scale / self.gain
+        self._carry = None
+
+    def reset(self):
+        self._carry = None
+
+    def push(self, Y):
+        """
+        Turns a block of frames back into samples.
+
+        :param Y: Spectra of shape (..., num_freq_bins, num_frames)
+        :return: Samples of shape (..., num_frames * hop)
+        """
+        num_frames = Y.shape[-1]
+        lead = Y.shape[:-2]
+        if self._carry is None or self._carry.shape[:-1] != lead:
+            self._carry = np.zeros(lead + (self.nfft - self.hop,))
+        frames = np.fft.irfft(np.moveaxis(Y, -1, -2), n=self.nfft, axis=-1)
+
+        # Each hop-sized piece of a frame lands hop samples after the previous one
+        out = np.zeros(lead + ((num_frames + self.nfft // self.hop - 1) * self.hop,))
+        out[..., :self._carry.shape[-1]] = self._carry
+        span = num_frames * self.hop
+        for r in range(self.nfft // self.hop):
+            piece = frames[..., r * self.hop:(r + 1) * self.hop]
+            out[..., r * self.hop:r * self.hop + span] += piece.reshape(lead + (span,))
+        self._carry = out[..., span:].copy()
+        return out[..., :span] * self.scale
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import sys
+import time
 import struct
-import usb.core
-import usb.util
+try:
+    from lib.metrics import METRICS
+except ImportError:  # Run from inside lib/
+    from metrics import METRICS
 
 USAGE = """Usage: python {} -h
         -p      show all parameters
@@ -60,12 +63,35 @@ PARAMETERS = {
     'DOAANGLE': (21, 0, 'int', 359, 0, 'ro', 'DOA angle. Current value. Orientation depends on build configuration.')
 }
 
+# Precompiled read commands
+# name: (id, cmd, is int)
+READ_COMMANDS = {
+    name: (data[0], 0x80 | data[1] | (0x40 if data[2] == 'int' else 0), data[2] == 'int')
+    for name, data in PARAMETERS.items()
+}
+
+# Seconds a read value stays valid, for parameters that change slowly
+CACHE_TTL = {
+    'RT60': 2.0,
+    'AGCGAIN': 0.5,
+}
+
+# usb.util.CTRL_IN/CTRL_OUT | CTRL_TYPE_VENDOR | CTRL_RECIPIENT_DEVICE, so this module (and -p) imports without pyusb
+READ_REQUEST = 0x80 | 0x40 | 0x00
+WRITE_REQUEST = 0x00 | 0x40 | 0x00
+RESPONSE = struct.Struct(b'ii')
+INT_PAYLOAD = struct.Struct(b'iii')
+FLOAT_PAYLOAD = struct.Struct(b'ifi')
+
 
 class Tuning:
     TIMEOUT = 100000
 
-    def __init__(self, dev):
+    def __init__(self, dev, ttl=None):
         self.dev = dev
+        self.ttl = dict(CACHE_TTL if ttl is None else ttl)
+        self.cache = {}  # name: (value, time read)
+        self.transfers = 0  # ctrl_transfer calls made so far
 
     def write(self, name, value):
         try:
@@ -80,42 +106,80 @@ class Tuning:
 
         # 4 bytes offset, 4 bytes value, 4 bytes type
         if data[2] == 'int':
-            payload = struct.pack(b'iii', data[1], int(value), 1)
+            value = int(value)
+            payload = INT_PAYLOAD.pack(data[1], value, 1)
         else:
-            payload = struct.pack(b'ifi', data[1], float(value), 0)
+            value = float(value)
+            payload = FLOAT_PAYLOAD.pack(data[1], value, 0)
+
+        self.transfers += 1
+        self.dev.ctrl_transfer(WRITE_REQUEST, 0, 0, id, payload, self.TIMEOUT)
 
-        self.dev.ctrl_transfer(
-            usb.util.CTRL_OUT | usb.util.CTRL_TYPE_VENDOR | usb.util.CTRL_RECIPIENT_DEVICE,
-            0, 0, id, payload, self.TIMEOUT)
+        # Write through, so cached reads see the new value
+        if name in self.ttl:
+            self.cache[name] = (value, time.monotonic())
 
     def read(self, name):
         try:
-            data = PARAMETERS[name]
+            id, cmd, is_int = READ_COMMANDS[name]
         except KeyError:
             return
 
-        id = data[0]
-
-        cmd = 0x80 | data[1]
-        if data[2] == 'int':
-            cmd |= 0x40
+        ttl = self.ttl.get(name)
+        if ttl is not None:
+            cached = self.cache.get(name)
+            if cached is not None and time.monotonic() - cached[1] < ttl:
+                return cached[0]
 
         length = 8
 
-        response = self.dev.ctrl_transfer(
-            usb.util.CTRL_IN | usb.util.CTRL_TYPE_VENDOR | usb.util.CTRL_RECIPIENT_DEVICE,
-            0, cmd, id, length, self.TIMEOUT)
-
-        response = struct.unpack(b'ii', response.tobytes())
+        self.transfers += 1
+        t0 = METRICS.start()
+        try:
+            response = self.dev.ctrl_transfer(READ_REQUEST, 0, cmd, id, length, self.TIMEOUT)
+        except OSError:  # usb.core.USBError
+            METRICS.count("usb.errors")
+            raise
+        METRICS.stop("usb.read", t0)
 
+        response = RESPONSE.unpack(response.tobytes())
 
-        if data[2] == 'int':
+        if is_int:
             result = response[0]
         else:
             result = response[0] * (2.**response[1])
 
+        if ttl is not None:
+            self.cache[name] = (result, time.monotonic())
+
         return result
 
+    def snapshot(self, names=None):
+        """
+        Reads a set of parameters in one call. Every parameter still needs its own
+        control transfer (the firmware has no multi-read), but each name is read once
+        and slow-changing values are served from the TTL cache.
+
+        names: parameter names, all parameters when None
+        returns: dict of name: value, None for unknown names
+        """
+        if names is None:
+            names = sorted(PARAMETERS.keys())
+        result = {}
+        for name in names:
+            if name not in result:
+                result[name] = self.read(name)
+        return result
+
+    def invalidate(self, name=None):
+        """
+        Drops one cached value, or all of them when name is None.
+        """
+        if name is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(name, None)
+
     def set_vad_threshold(self, db):
         self.write('GAMMAVAD_SR', db)
 
@@ -128,18 +192,19 @@ class Tuning:
 
     @property
     def version(self):
-        return self.dev.ctrl_transfer(
-            usb.util.CTRL_IN | usb.util.CTRL_TYPE_VENDOR | usb.util.CTRL_RECIPIENT_DEVICE,
-            0, 0x80, 0, 1, self.TIMEOUT)[0]
+        self.transfers += 1
+        return self.dev.ctrl_transfer(READ_REQUEST, 0, 0x80, 0, 1, self.TIMEOUT)[0]
 
     def close(self):
         """
         close the interface
         """
+        import usb.util
         usb.util.dispose_resources(self.dev)
 
 
 def find(vid=0x2886, pid=0x0018):
+    import usb.core
     dev = usb.core.find(idVendor=vid, idProduct=pid)
     if not dev:
         return
@@ -157,9 +222,10 @@ def find(vid=0x2886, pid=0x0018):
 
 
 
-def main():
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '-p':
+def main(argv=None):
+    argv = sys.argv if argv is None else [sys.argv[0]] + list(argv)
+    if len(argv) > 1:
+        if argv[1] == '-p':
             print('name\t\t\ttype\tmax\tmin\tr/w\tinfo')
             print('-------------------------------')
             for name in sorted(PARAMETERS.keys()):
@@ -175,16 +241,16 @@ def main():
 
             # print('version: {}'.format(dev.version))
 
-            if sys.argv[1] == '-r':
+            if argv[1] == '-r':
                 print('{:24} {}'.format('name', 'value'))
                 print('-------------------------------')
-                for name in sorted(PARAMETERS.keys()):
-                    print('{:24} {}'.format(name, dev.read(name)))
+                for name, value in dev.snapshot().items():
+                    print('{:24} {}'.format(name, value))
             else:
-                name = sys.argv[1].upper()
+                name = argv[1].upper()
                 if name in PARAMETERS:
-                    if len(sys.argv) > 2:
-                        dev.write(name, sys.argv[2])
+                    if len(argv) > 2:
+                        dev.write(name, argv[2])
                     
                     print('{}: {}'.format(name, dev.read(name)))
                 else:
@@ -192,7 +258,7 @@ def main():
 
             dev.close()
     else:
-        print(USAGE.format(sys.argv[0]))
+        print(USAGE.format(argv[0]))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,158 @@
+import time
+import numpy as np
+
+class EnergyVAD:
+    """
+    Host-side voice activity detector based on short-time energy and zero-crossing rate.
+
+    A chunk is voiced when its RMS exceeds an adaptive noise floor by `threshold_db`
+    (and the absolute `min_rms`) while its zero-crossing rate stays below `max_zcr`,
+    which rejects broadband hiss. The noise floor follows the quiet chunks. Only one
+    channel is inspected, so the gate costs a fraction of the work it saves.
+    """
+
+    def __init__(self, channel=1, threshold_db=9.0, min_rms=200.0, max_zcr=0.4, floor_alpha=0.05):
+        """
+        :param channel: Index of the channel inspected in (samples, channels) chunks
+        :param threshold_db: Margin above the noise floor for a voiced chunk
+        :param min_rms: Absolute RMS (int16 units) below which a chunk is always silent
+        :param max_zcr: Largest zero crossings per sample of a voiced chunk
+        :param floor_alpha: Adaptation speed of the noise floor
+        """
+        self.channel = channel
+        self.ratio = 10 ** (threshold_db / 20)
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.floor_alpha = floor_alpha
+        self.noise_floor = None
+        self.rms = 0.0
+        self.zcr = 0.0
+
+    def __call__(self, chunk):
+        """
+        :param chunk: Audio of shape (samples, channels)
+        :return: True when the chunk contains voice
+        """
+        x = chunk[:, self.channel].astype(np.float32)
+        self.rms = float(np.sqrt(np.dot(x, x) / x.shape[0]))
+        self.zcr = np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1])) / x.shape[0]
+
+        if self.noise_floor is None:
+            self.noise_floor = self.rms
+        voiced = self.rms >= max(self.min_rms, self.ratio * self.noise_floor) and self.zcr <= self.max_zcr
+        if not voiced:
+            self.noise_floor += self.floor_alpha * (self.rms - self.noise_floor)
+        return voiced
+
+class BoardVAD:
+    """
+    Voice activity gate reading the ReSpeaker's own detector (Tuning.is_voice).
+
+    The USB read is rate limited: the last answer is reused for `interval` seconds,
+    so gating every chunk does not add a control transfer per chunk.
+    """
+
+    def __init__(self, tuning, interval=0.05):
+        """
+        :param tuning: Tuning instance of the microphone array
+        :param interval: Seconds a VOICEACTIVITY reading is reused
+        """
+        self.tuning = tuning
+        self.interval = interval
+        self._voiced = False
+        self._read_at = None
+
+    def __call__(self, chunk):
+        now = time.monotonic()
+        if self._read_at is None or now - self._read_at >= self.interval:
+            self._voiced = bool(self.tuning.is_voice())
+            self._read_at = now
+        return self._voiced
+
+class GatedPipeline:
+    """
+    Runs the bandpass, STFT and DOA stages only on chunks a cheap gate marks as voiced.
+
+    Silent chunks only advance the filter state and restart the STFT framing, so the
+    pipeline resumes cleanly at the next voiced chunk. The gate stays open for
+    `hangover` chunks after the last voiced one so word endings are not cut. Every
+    stage is optional; duty-cycle and timing statistics are kept per stage.
+    """
+
+    def __init__(self, gate, bandpass=None, stft=None, doa=None, hangover=2):
+        """
+        :param gate: Function returning True for voiced (samples, channels) chunks
+        :param bandpass: FIRFilterBank applied to voiced chunks
+        :param stft: StreamingSTFT turning filtered chunks into X
+        :param doa: DOA estimator called as doa.Mic_tuning_direction(X)
+        :param hangover: Chunks processed after the gate closes
+        """
+        self.gate = gate
+        self.bandpass = bandpass
+        self.stft = stft
+        self.doa = doa
+        self.hangover = hangover
+        self._open_for = 0
+
+        self.chunks = 0
+        self.active = 0
+        self.stage_time = {"gate": 0.0, "bandpass": 0.0, "stft": 0.0, "doa": 0.0, "skip": 0.0}
+
+    def process(self, chunk):
+        """
+        Passes one chunk through the gate and, when voiced, through the stages.
+
+        :param chunk: Audio of shape (samples, channels)
+        :return: Output of the last stage that ran (DOA estimate, X or filtered chunk), None for silent chunks
+        """
+        self.chunks += 1
+        t0 = time.perf_counter()
+        if self.gate(chunk):
+            self._open_for = self.hangover + 1
+        t1 = time.perf_counter()
+        self.stage_time["gate"] += t1 - t0
+
+        if self._open_for == 0:
+            if self.bandpass is not None:
+                self.bandpass.skip(chunk)
+            if self.stft is not None and self.stft.samples_written:
+                self.stft.reset()
+            self.stage_time["skip"] += time.perf_counter() - t1
+            return None
+
+        self._open_for -= 1
+        self.active += 1
+        result = chunk
+        if self.bandpass is not None:
+            result = self.bandpass.process(result)
+            t2 = time.perf_counter()
+            self.stage_time["bandpass"] += t2 - t1
+            t1 = t2
+        if self.stft is not None:
+            result = self.stft.push(result)
+            t2 = time.perf_counter()
+            self.stage_time["stft"] += t2 - t1
+            t1 = t2
+            if result.shape[2] == 0:
+                return None
+        if self.doa is not None:
+            result = self.doa.Mic_tuning_direction(result)
+            self.stage_time["doa"] += time.perf_counter() - t1
+        return result
+
+    def stats(self):
+        """
+        Duty cycle and the processing time saved by the gate.
+
+        :return: Dictionary of chunk counts, duty cycle, per-stage seconds and estimated seconds saved
+        """
+        work = self.stage_time["bandpass"] + self.stage_time["stft"] + self.stage_time["doa"]
+        per_active = work / self.active if self.active else 0.0
+        skipped = self.chunks - self.active
+        return {
+            "chunks": self.chunks,
+            "active": self.active,
+            "duty_cycle": self.active / self.chunks if self.chunks else 0.0,
+            "stage_seconds": dict(self.stage_time),
+            "saved_seconds": skipped * per_active - self.stage_time["skip"],
+        }
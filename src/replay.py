@@ -0,0 +1,86 @@
+"""
+Replays a recorded 6-channel WAV through the DOA processing path without PyAudio,
+faster than realtime, and reports per-stage latency percentiles and the realtime factor.
+
+Usage: python replay.py RECORDING.wav [--pipeline volume|srp] [--labels LABELS.csv] [--json]
+
+The labels file holds rows of start_s,end_s,angle with the true direction in degrees;
+it is compared against the angle estimates of the srp pipeline.
+"""
+import json
+import argparse
+import numpy as np
+
+import volumeDOA
+from lib.filterbank import FIRFilterBank
+from lib.replay import StageTimer, TimedProxy, replay, load_labels, format_report
+
+# ReSpeaker 4-mic array, raw microphones on channels 1-4 of the 6-channel firmware
+MIC_RADIUS = 0.032
+MIC_CHANNELS = [1, 2, 3, 4]
+NFFT = 512
+
+def mic_positions():
+    """
+    Positions of the MIC_CHANNELS microphones, shape (3, 4).
+    """
+    angles = 2 * np.pi * np.arange(len(MIC_CHANNELS)) / len(MIC_CHANNELS)
+    return np.vstack((MIC_RADIUS * np.cos(angles), MIC_RADIUS * np.sin(angles), np.zeros(len(MIC_CHANNELS))))
+
+def volume_pipeline(timer, threshold=volumeDOA.initial_volume_threshold):
+    """
+    The exact path of volumeDOA.audio_stream_loop: volume gate, bandpass, loudest microphone.
+    """
+    bandpass = TimedProxy(FIRFilterBank(volumeDOA.b, volumeDOA.RESPEAKER_CHANNELS, volumeDOA.CHUNK),
+                          timer, "bandpass", ["process", "skip"])
+    doa = timer.wrap("estimate_doa", volumeDOA.estimate_doa)
+    return lambda chunk: volumeDOA.process_chunk(chunk, bandpass, threshold, doa)
+
+def srp_pipeline(timer):
+    """
+    VAD gate, bandpass, streaming STFT and SRP-PHAT, returning azimuths in degrees.
+    """
+    from lib.srp import SRP
+    from lib.stft import StreamingSTFT
+    from lib.vad import EnergyVAD, GatedPipeline
+
+    L = mic_positions()
+    pipeline = GatedPipeline(
+        timer.wrap("vad", EnergyVAD()),
+        bandpass=TimedProxy(FIRFilterBank(volumeDOA.b, volumeDOA.RESPEAKER_CHANNELS, volumeDOA.CHUNK),
+                            timer, "bandpass", ["process", "skip"]),
+        stft=TimedProxy(StreamingSTFT(volumeDOA.RESPEAKER_CHANNELS, NFFT, channels=MIC_CHANNELS, chunk=volumeDOA.CHUNK),
+                        timer, "stft", ["push", "reset"]),
+        doa=TimedProxy(SRP(L, volumeDOA.RESPEAKER_RATE, NFFT), timer, "srp", ["Mic_tuning_direction"]))
+    return pipeline.process
+
+PIPELINES = {
+    "volume": volume_pipeline,
+    "srp": srp_pipeline,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recording through the DOA pipeline.")
+    parser.add_argument("recording", help="6-channel int16 WAV file")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINES), default="volume")
+    parser.add_argument("--labels", help="CSV of start_s,end_s,angle ground truth")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="Largest error in degrees counted as correct")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    timer = StageTimer()
+    process = PIPELINES[args.pipeline](timer)
+    # The volume pipeline reports microphone channels, not angles
+    labels = load_labels(args.labels) if args.labels and args.pipeline == "srp" else None
+
+    report = replay(args.recording, process, volumeDOA.CHUNK, timer, labels, args.tolerance)
+
+    if args.json:
+        report.pop("outputs")
+        print(json.dumps(report, indent=2, default=float))
+    else:
+        print(format_report(report))
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import numpy as np
-import pyaudio
-import tkinter as tk
 from threading import Thread
-from scipy.signal import firwin, lfilter
+from lib.filterbank import FIRFilterBank
+from lib.capture import Capture
+from lib.metrics import METRICS
 
 # Configuration for audio input and processing
 RESPEAKER_RATE = 16000
@@ -17,8 +17,21 @@ num_taps = 101  # Number of taps in the FIR filter for signal processing
 low_cutoff_freq = 50  # Low cutoff frequency in Hz for the filter
 high_cutoff_freq = 1000  # High cutoff frequency in Hz for the filter
 nyquist_rate = RESPEAKER_RATE / 2
-# Creating the FIR filter
-b = firwin(num_taps, [low_cutoff_freq / nyquist_rate, high_cutoff_freq / nyquist_rate], pass_zero=False)
+_taps = None
+
+# Creating the FIR filter on first use, so importing this module does not load scipy
+def bandpass_taps():
+    global _taps
+    if _taps is None:
+        from scipy.signal import firwin
+        _taps = firwin(num_taps, [low_cutoff_freq / nyquist_rate, high_cutoff_freq / nyquist_rate], pass_zero=False)
+    return _taps
+
+def __getattr__(name):
+    # volumeDOA.b stays available to the replay tools and benchmarks
+    if name == "b":
+        return bandpass_taps()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 # Function to estimate the direction of arrival (DOA) of sound
 def estimate_doa(audio_data):
@@ -26,51 +39,101 @@ def estimate_doa(audio_data):
     intensities = np.sum(np.abs(mic_channels), axis=0)
     max_intensity = np.max(intensities)
     normalized_intensities = intensities / max_intensity if max_intensity > 0 else intensities
-    print(normalized_intensities)
+    METRICS.gauge("doa.intensities", normalized_intensities)
     loudest_mic_index = np.argmax(intensities)
     return loudest_mic_index + 1  # Adjust to match microphone channel indexing
 
+# Processing path of one chunk, shared by the live loop and the offline replay
+def process_chunk(npdata, bandpass, volume_threshold, doa=estimate_doa):
+    initial_intensities = np.sum(np.abs(npdata[:, 1:5]), axis=0)
+    if np.max(initial_intensities) >= volume_threshold:
+        t0 = METRICS.start()
+        filtered_data = bandpass.process(npdata)
+        METRICS.stop("filter", t0)
+        t0 = METRICS.start()
+        mic_index = doa(filtered_data)
+        METRICS.stop("doa", t0)
+        return mic_index
+    bandpass.skip(npdata)  # Keep the filter state continuous through quiet chunks
+    METRICS.count("chunks.quiet")
+    return None
+
 # Main loop for processing audio input
 def audio_stream_loop(volume_threshold):
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        rate=RESPEAKER_RATE,
-        format=p.get_format_from_width(RESPEAKER_WIDTH),
-        channels=RESPEAKER_CHANNELS,
-        input=True,
-        input_device_index=RESPEAKER_INDEX,
-        frames_per_buffer=CHUNK
-    )
+    # Callback-mode capture into a ring buffer; overruns and drops are counted, not swallowed
+    capture = Capture(RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, RESPEAKER_INDEX, RESPEAKER_WIDTH).start()
+    # Filters all channels in one call and carries the state across chunks
+    bandpass = FIRFilterBank(bandpass_taps(), RESPEAKER_CHANNELS, CHUNK)
     print("* listening")
     try:
         while True:
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            npdata = np.frombuffer(data, dtype=np.int16).reshape(-1, RESPEAKER_CHANNELS)
-            initial_intensities = np.sum(np.abs(npdata[:, 1:5]), axis=0)
-            if np.max(initial_intensities) >= volume_threshold.get():
-                filtered_data = np.copy(npdata)  # Create a copy for filtering
-                for i in range(RESPEAKER_CHANNELS):
-                    filtered_data[:, i] = lfilter(b, 1, npdata[:, i])
-                mic_index = estimate_doa(filtered_data)
-                print(f"Direction of arrival: Microphone Channel {mic_index}")
+            t0 = METRICS.start()
+            npdata = capture.read()
+            METRICS.stop("capture.wait", t0)
+            mic_index = process_chunk(npdata, bandpass, volume_threshold.get())
+            METRICS.count("chunks")
+            METRICS.gauge("capture.overruns", capture.overruns)
+            METRICS.gauge("capture.dropped_frames", capture.ring.dropped_frames)
+            if mic_index is not None:
+                # Served by the metrics endpoint/dump (ECHO_METRICS_PORT, ECHO_METRICS_DUMP) instead of printed per chunk
+                METRICS.gauge("doa.channel", int(mic_index))
+                METRICS.count("doa.estimates")
     except KeyboardInterrupt:
         print("* done listening")
     finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
+        capture.stop()
+        print(capture.stats())
+        print(METRICS.report())
+
+# Same GUI, with capture, bandpass/STFT and SRP-PHAT in three processes (lib.mp_pipeline)
+def process_stream_loop(volume_threshold):
+    from lib.mp_pipeline import ProcessPipeline, CaptureSource
+    from replay import mic_positions, MIC_CHANNELS
+
+    source = CaptureSource(RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, RESPEAKER_INDEX)
+    pipeline = ProcessPipeline(source, mic_positions(), bandpass_taps(), RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK,
+                               mic_channels=MIC_CHANNELS, volume_threshold=volume_threshold.get(), start_method="spawn")
+    print("* listening (capture, DSP and DOA processes)")
+    with pipeline:
+        try:
+            # Until the stream ends or a stage dies (e.g. no capture device)
+            while pipeline.finished is None and all(process.is_alive() for process in pipeline.processes):
+                # The slider drives the gate of the DSP process
+                pipeline.threshold.value = volume_threshold.get()
+                for angle, _, _ in pipeline.results(timeout=0.5):
+                    METRICS.gauge("doa.angle", angle)
+                    METRICS.count("doa.estimates")
+                    pipeline.threshold.value = volume_threshold.get()
+        except KeyboardInterrupt:
+            print("* done listening")
+        finally:
+            print(pipeline.metrics())
+            print(METRICS.report())
+
+def main(processes=False):
+    import tkinter as tk
+
+    METRICS.start_from_env()
+
+    # Setting up the GUI for threshold control
+    root = tk.Tk()
+    root.title("Volume Threshold Control")
+    volume_threshold = tk.IntVar(value=initial_volume_threshold)
+    threshold_slider = tk.Scale(root, from_=18000, to=500000, orient='horizontal', label='Volume Threshold', variable=volume_threshold)
+    threshold_slider.pack()
 
-# Setting up the GUI for threshold control
-root = tk.Tk()
-root.title("Volume Threshold Control")
-volume_threshold = tk.IntVar(value=initial_volume_threshold)
-threshold_slider = tk.Scale(root, from_=18000, to=500000, orient='horizontal', label='Volume Threshold', variable=volume_threshold)
-threshold_slider.pack()
+    # Starting the audio stream in a separate thread
+    loop = process_stream_loop if processes else audio_stream_loop
+    audio_thread = Thread(target=loop, args=(volume_threshold,))
+    audio_thread.daemon = True
+    audio_thread.start()
 
-# Starting the audio stream in a separate thread
-audio_thread = Thread(target=audio_stream_loop, args=(volume_threshold,))
-audio_thread.daemon = True
-audio_thread.start()
+    # Start the GUI event loop
+    root.mainloop()
 
-# Start the GUI event loop
-root.mainloop()
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Loudest-microphone DOA with the threshold GUI.")
+    parser.add_argument("--processes", action="store_true",
+                        help="SRP-PHAT DOA with capture, DSP and DOA in separate processes")
+    main(parser.parse_args().processes)
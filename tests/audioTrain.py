@@ -1,6 +1,11 @@
-import pyaudio
-import numpy as np
-import wave
+import os
+import sys
+import argparse
+
+# The recorder lives in src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from lib.capture import Capture
+from lib.recorder import Recorder
 
 # Configuration
 RESPEAKER_RATE = 16000
@@ -9,41 +14,32 @@ RESPEAKER_WIDTH = 2
 RESPEAKER_INDEX = 2
 CHUNK = 1024
 RECORD_SECONDS = 10
-file_number = 1  # Start with audio file 'audio1.wav'
 
-def record_audio(file_number):
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        format=p.get_format_from_width(RESPEAKER_WIDTH),
-        channels=RESPEAKER_CHANNELS,
-        rate=RESPEAKER_RATE,
-        input=True,
-        input_device_index=RESPEAKER_INDEX,
-        frames_per_buffer=CHUNK
-    )
-    
-    print(f"* Recording audio{file_number}.wav")
-    frames = []
-    
-    for _ in range(0, int(RESPEAKER_RATE / CHUNK * RECORD_SECONDS)):
-        data = stream.read(CHUNK)
-        frames.append(data)
-    
-    # Stop and close the stream
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
-    
-    # Save the recorded data as a WAV file
-    wf = wave.open(f'audio{file_number}.wav', 'wb')
-    wf.setnchannels(RESPEAKER_CHANNELS)
-    wf.setsampwidth(p.get_sample_size(p.get_format_from_width(RESPEAKER_WIDTH)))
-    wf.setframerate(RESPEAKER_RATE)
-    wf.writeframes(b''.join(frames))
-    wf.close()
-    print(f"* Done recording audio{file_number}.wav")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record numbered takes from the ReSpeaker.")
+    parser.add_argument("--seconds", type=float, default=RECORD_SECONDS, help="Length of every take")
+    parser.add_argument("--format", choices=["wav", "raw"], default="wav",
+                        help="WAV, or raw int16 with a JSON sidecar that lib.recorder.load_raw memory-maps")
+    parser.add_argument("--split-seconds", type=float, help="Start a new file after this many seconds")
+    parser.add_argument("--split-mb", type=float, help="Start a new file after this many megabytes")
+    parser.add_argument("--directory", default=".", help="Folder of the recordings")
+    args = parser.parse_args(argv)
+
+    # One audio session for all takes; chunks stream to disk from the writer thread
+    capture = Capture(RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, RESPEAKER_INDEX, RESPEAKER_WIDTH, slots=64)
+    max_bytes = None if args.split_mb is None else args.split_mb * 1e6
+    recorder = Recorder(capture, args.directory, "audio", args.format, args.split_seconds, max_bytes)
+    with recorder:
+        try:
+            while True:
+                done = recorder.record(args.seconds)
+                print(f"* Recording audio{recorder.takes}")
+                done.wait()
+                print(f"* Done recording audio{recorder.takes}")
+                input(f"Press Enter to record another {args.seconds:g}-second audio file or Ctrl+C to stop...")
+        except KeyboardInterrupt:
+            pass
+    print(recorder.stats())
 
-while True:
-    record_audio(file_number)
-    file_number += 1  # Increment the file number for the next recording
-    input("Press Enter to record another 10-second audio file or Ctrl+C to stop...")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures SRP construction time with and without the on-disk steering cache:
+no cache, cold start (cache being written) and warm start (cache memory-mapped).
+Then corrupts the cache files (truncated, mirrored steering, stale mode vectors)
+and checks that every one of them is detected and rebuilt, as is a near-field
+cache written by the delay model of CACHE_VERSION 1.
+
+Run from the tests folder: python bench_cache.py
+"""
+import glob
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE
+import lib.srp
+from lib.srp import SRP
+
+NFFT = 512
+GRID = dict(azimuth=np.radians(np.arange(0, 360, 1.0)), colatitude=np.radians(np.arange(30, 91, 15)))
+
+def tamper(cache_dir, prefix, change):
+    # Rewrites the cached tensor in place, keeping its name, shape and dtype
+    path, = glob.glob(os.path.join(cache_dir, prefix + '_*.npy'))
+    data = np.array(np.load(path))
+    change(data)
+    np.save(path, data)
+
+def truncate(cache_dir, prefix):
+    path, = glob.glob(os.path.join(cache_dir, prefix + '_*.npy'))
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+def mirror(data):
+    # The steering of a mirrored geometry: same cos half, negated sin half
+    data[:, data.shape[1] // 2:] *= -1
+
+def stale(data):
+    # Mode vectors of a geometry that is not the current one
+    data[...] = np.conj(data)
+
+def old_time_of_flight(L, x, y, z, c, mode="near"):
+    # Near-field delay model of CACHE_VERSION 1: the distance to every microphone, a lag instead of a lead
+    p = np.stack((x, y, z))[:, None, :]
+    return np.sqrt(np.sum((p - L[:, :, None]) ** 2, axis=0))[None] / c
+
+def old_model(cache_dir):
+    # Writes the near-field cache as version 1 did, then loads it with the current code
+    near = dict(cache_dir=cache_dir, mode='near', r=0.5)
+    current = lib.srp.CACHE_VERSION, lib.srp.time_of_flight
+    lib.srp.CACHE_VERSION, lib.srp.time_of_flight = 1, old_time_of_flight
+    try:
+        _, old = build(**near)
+    finally:
+        lib.srp.CACHE_VERSION, lib.srp.time_of_flight = current
+    _, srp = build(**near)
+    _, fresh = build(mode='near', r=0.5)
+    rebuilt = not (srp.steering_from_cache or srp.mode_vec.from_cache)
+    print('{:24} rebuilt: {}'.format('version 1 near field', rebuilt))
+    # A different key, not only the staleness checks, keeps the old files from being loaded
+    assert rebuilt and old.mode_vec.geometry_key != srp.mode_vec.geometry_key
+    assert not np.allclose(old.steering, fresh.steering)
+    np.testing.assert_array_equal(srp.steering, fresh.steering)
+
+def build(**kwargs):
+    start = time.perf_counter()
+    srp = SRP(ARRAYS['6-mic'], RESPEAKER_RATE, NFFT, precompute=True, **GRID, **kwargs)
+    return time.perf_counter() - start, srp
+
+if __name__ == '__main__':
+    cache_dir = tempfile.mkdtemp()
+    try:
+        t_none, _ = build()
+        t_cold, _ = build(cache_dir=cache_dir)
+        t_warm, srp = build(cache_dir=cache_dir)
+        size = srp.steering.nbytes + srp.mode_vec.modeVec.nbytes
+        print('cached tensors: {:.1f} MB, warm start from cache: {}'.format(size / 2 ** 20, srp.mode_vec.from_cache))
+        print('{:12} {:>10}'.format('start', 'time [ms]'))
+        for name, t in (('no cache', t_none), ('cold', t_cold), ('warm', t_warm)):
+            print('{:12} {:10.1f}'.format(name, 1e3 * t))
+        assert srp.steering_from_cache and srp.mode_vec.from_cache
+        reference = np.array(srp.steering), np.array(srp.mode_vec.modeVec)
+        del srp
+
+        for name, corrupt in (('truncated steering', lambda: truncate(cache_dir, 'srp_steering')),
+                              ('mirrored steering', lambda: tamper(cache_dir, 'srp_steering', mirror)),
+                              ('truncated mode vectors', lambda: truncate(cache_dir, 'modevec')),
+                              ('stale mode vectors', lambda: tamper(cache_dir, 'modevec', stale))):
+            corrupt()
+            _, srp = build(cache_dir=cache_dir)
+            rebuilt = not (srp.steering_from_cache and srp.mode_vec.from_cache)
+            print('{:24} rebuilt: {}'.format(name, rebuilt))
+            assert rebuilt
+            np.testing.assert_array_equal(srp.steering, reference[0])
+            np.testing.assert_array_equal(srp.mode_vec.modeVec, reference[1])
+            del srp
+        old_model(cache_dir)
+    finally:
+        shutil.rmtree(cache_dir)
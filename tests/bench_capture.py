@@ -0,0 +1,53 @@
+"""
+Drives the callback-mode capture layer with a fake PyAudio stream playing a recording,
+checks that every chunk arrives intact when the consumer keeps up, and shows the
+overrun/drop counters of both backpressure policies when it does not.
+
+Run from the tests folder: python bench_capture.py [recording.wav]
+"""
+import sys
+import time
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_recording, read_wav
+from fakedevices import FakeAudioStream
+from lib.capture import Capture
+
+RESPEAKER_CHANNELS = 6
+CHUNK = 1024
+
+def consume(audio, policy, work, speed, overflow_every=None):
+    # Plays the audio through the callback and runs `work` seconds of processing per chunk
+    capture = Capture(RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, slots=8, policy=policy,
+                      open_stream=lambda cb: FakeAudioStream(cb, audio, CHUNK, RESPEAKER_RATE, speed, overflow_every))
+    received = []
+    with capture:
+        while True:
+            chunk = capture.read(timeout=0.5)
+            if chunk is None:
+                break
+            received.append(int(chunk[0, 0]))  # Views are only valid until the next read
+            if work:
+                time.sleep(work)
+    return capture.stats(), received
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        audio, _ = read_wav(sys.argv[1])
+    else:
+        audio = synthetic_recording(ARRAYS['4-mic'], 20)
+    # Stamp every chunk with its index so order and losses can be checked
+    audio = audio[:audio.shape[0] // CHUNK * CHUNK].copy()
+    audio[::CHUNK, 0] = np.arange(audio.shape[0] // CHUNK)
+    n_chunks = audio.shape[0] // CHUNK
+
+    stats, received = consume(audio, 'block', 0, speed=0)
+    assert received == list(range(n_chunks)), 'chunks lost or reordered'
+    print('fast consumer, {} chunks as fast as possible: all received in order'.format(n_chunks))
+
+    print('{:12} {:>10} {:>10} {:>15} {:>10}'.format('policy', 'overruns', 'received', 'dropped frames', 'newest'))
+    for policy in ('drop-oldest', 'block'):
+        # Processing takes twice as long as the audio it processes
+        stats, received = consume(audio, policy, 2 * CHUNK / RESPEAKER_RATE / 20, speed=20, overflow_every=50)
+        # Every chunk played was either read, dropped or is still queued
+        assert stats['frames_read'] + stats['dropped_frames'] + stats['queued_chunks'] * CHUNK == n_chunks * CHUNK
+        print('{:12} {:10} {:10} {:15} {:10}'.format(policy, stats['overruns'], len(received), stats['dropped_frames'], received[-1]))
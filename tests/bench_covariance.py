@@ -0,0 +1,58 @@
+"""
+Incremental DOA from a running spatial covariance: cost of the per-frame covariance
+update, and how often the spectrum is evaluated, how long a frame takes and how well
+a slowly moving source that jumps by 90 degrees halfway is tracked for several
+evaluation cadences, compared with recomputing the cross-spectra of every block
+from scratch.
+
+Run from the tests folder: python bench_covariance.py
+"""
+import time
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_stft, timeit, angle_error
+from lib.srp import SRP, GCCPHAT, SpatialCovariance
+
+NFFT = 512
+BLOCK = 4  # Frames per pushed chunk, as StreamingSTFT delivers them for CHUNK=1024
+BLOCKS = 200
+DEG_PER_BLOCK = 0.5  # Source moving 0.5 degree per chunk, about 8 degrees per second
+JUMP = BLOCKS // 2  # Block where another talker takes over, 90 degrees away
+
+CONFIGS = [
+    ('from scratch', {}),
+    ('every block', dict(forget=0.8)),
+    ('every 4 blocks', dict(forget=0.8, eval_every=4 * BLOCK)),
+    ('every 16 blocks', dict(forget=0.8, eval_every=16 * BLOCK)),
+    ('16 or 70% change', dict(forget=0.8, eval_every=16 * BLOCK, change_threshold=0.7)),
+]
+
+def moving_source(L):
+    truth = 30.0 + DEG_PER_BLOCK * np.arange(BLOCKS)
+    truth[JUMP:] += 90.0
+    blocks = [synthetic_stft(L, RESPEAKER_RATE, NFFT, az, BLOCK, snr_db=5.0, seed=i) for i, az in enumerate(truth)]
+    return blocks, truth
+
+def track(estimator, blocks, truth):
+    errors = np.empty(len(blocks))
+    start = time.perf_counter()
+    for i, X in enumerate(blocks):
+        errors[i] = angle_error(estimator.Mic_tuning_direction(X), truth[i])
+    return (time.perf_counter() - start) / len(blocks), errors
+
+if __name__ == '__main__':
+    for name, L in ARRAYS.items():
+        blocks, truth = moving_source(L)
+        cov = SpatialCovariance(L.shape[1], NFFT // 2 + 1)
+        t_update, _ = timeit(cov.update, blocks[0][:, :, :1], repeat=50)
+        print('== {} == covariance update {:.1f} us per frame'.format(name, 1e6 * t_update))
+        print('{:10} {:18} {:>12} {:>12} {:>10} {:>10}'.format('estimator', 'cadence', 'evaluations', 'ms/block', 'mean err', 'after jump'))
+        for cls in (SRP, GCCPHAT):
+            for label, kwargs in CONFIGS:
+                estimator = cls(L, RESPEAKER_RATE, NFFT, **kwargs)
+                per_block, errors = track(estimator, blocks, truth)
+                evaluations = estimator.evaluations if estimator.covariance is not None else len(blocks)
+                print('{:10} {:18} {:12} {:12.3f} {:10.1f} {:10.1f}'.format(
+                    cls.__name__, label, evaluations, 1e3 * per_block, errors.mean(), errors[JUMP:JUMP + 4].max()))
+                if label != 'every 16 blocks':
+                    # Only the fixed slow cadence may miss the jump
+                    assert errors[JUMP:JUMP + 4].max() < 10.0, '{} {} missed the jump'.format(cls.__name__, label)
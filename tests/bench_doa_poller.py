@@ -0,0 +1,71 @@
+"""
+Compares boardDOA's old busy loop with the background DOAPoller against a fake
+USB device whose DOA angle jitters around a talker that moves every second.
+Reports USB transfers/sec, CPU use and how many readings reach the consumer,
+and checks the hysteresis and confirmation rules of DOAPoller.update.
+
+Run from the tests folder: python bench_doa_poller.py
+"""
+import time
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from fakedevices import FakeUSBDevice
+from lib.tuning import Tuning
+from lib.doa_poller import DOAPoller
+
+SECONDS = 3.0
+LATENCY = 0.0002  # Seconds per simulated control transfer
+
+def make_tuning():
+    rng = np.random.default_rng(0)
+    start = time.monotonic()
+    # A talker jumping by 90 degrees every second, with +-4 degrees of jitter
+    angle = lambda: int(90 * int(time.monotonic() - start) + rng.integers(-4, 5)) % 360
+    return Tuning(FakeUSBDevice(LATENCY, {(21, 0): angle}))
+
+def busy_loop():
+    mic = make_tuning()
+    readings = 0
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    while time.monotonic() - start < SECONDS:
+        mic.direction
+        readings += 1
+    cpu = time.process_time() - cpu_start
+    return mic.transfers / SECONDS, 100 * cpu / SECONDS, readings
+
+def poller():
+    mic = make_tuning()
+    events = 0
+    with DOAPoller(mic, rate=10, hysteresis=10) as doa:
+        start = time.monotonic()
+        while time.monotonic() - start < SECONDS:
+            try:
+                doa.events.get(timeout=0.1)
+                events += 1
+            except Exception:
+                pass
+        stats = doa.stats()
+    return stats['transfers_per_sec'], stats['cpu_percent'], events
+
+def hysteresis():
+    doa = DOAPoller(None, hysteresis=10, confirm=2)
+    delivered = lambda angles: [doa.update(angle) is not None for angle in angles]
+    assert delivered([100]) == [True]  # The first reading is published right away
+    assert not any(delivered([104, 96, 109, 91, 100]))  # Jitter below the threshold
+    assert not any(delivered([150, 100]))  # A single outlier is never confirmed
+    assert delivered([150, 152]) == [False, True] and doa.angle == 152  # A sustained change is
+    assert not any(delivered([150, 160, 157]))  # Jitter around the new angle
+    assert delivered([355, 356]) == [False, True]
+    assert not any(delivered([2, 350, 4]))  # Jitter across 0 degrees
+    assert doa.published == 3 and doa.events.qsize() == 3
+    print('hysteresis: jitter suppressed, outliers unconfirmed, sustained changes published')
+
+if __name__ == '__main__':
+    hysteresis()
+    print('{:12} {:>15} {:>8} {:>20}'.format('loop', 'transfers/sec', 'CPU %', 'readings delivered'))
+    for name, func in (('busy loop', busy_loop), ('DOAPoller', poller)):
+        rate, cpu, delivered = func()
+        print('{:12} {:15.0f} {:8.1f} {:20}'.format(name, rate, cpu, delivered))
+    # The jitter never gets through: one event per position of the talker
+    assert 2 <= delivered <= int(SECONDS) + 1
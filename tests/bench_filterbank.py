@@ -0,0 +1,64 @@
+"""
+Checks the stateful multichannel FIR filter bank against offline filtering of the
+concatenated signal, then compares its speed with the per-channel lfilter loop
+volumeDOA used to run on every chunk.
+
+Run from the tests folder: python bench_filterbank.py
+"""
+import time
+import numpy as np
+from scipy.signal import firwin, lfilter
+from benchutil import RESPEAKER_RATE
+from lib.filterbank import FIRFilterBank
+
+RESPEAKER_CHANNELS = 6
+CHUNK = 1024
+SECONDS = 30
+
+# Same bandpass as volumeDOA.py
+b = firwin(101, [50 / (RESPEAKER_RATE / 2), 1000 / (RESPEAKER_RATE / 2)], pass_zero=False)
+
+def check_against_offline(method, audio, rng):
+    # Random chunk sizes, some chunks skipped, must match the offline result everywhere it was computed
+    bank = FIRFilterBank(b, RESPEAKER_CHANNELS, CHUNK, method=method)
+    expected = lfilter(b, 1, audio, axis=0)
+    pos = 0
+    worst = 0.0
+    while pos < audio.shape[0]:
+        n = int(rng.integers(1, CHUNK + 1))
+        chunk = audio[pos:pos + n]
+        if rng.random() < 0.2:
+            bank.skip(chunk)
+        else:
+            worst = max(worst, np.max(np.abs(bank.process(chunk) - expected[pos:pos + n])))
+        pos += n
+    assert worst < 1e-6 * np.max(np.abs(expected)), '{}: max error {}'.format(method, worst)
+    return worst
+
+def per_channel_loop(chunks):
+    for npdata in chunks:
+        filtered_data = np.copy(npdata)
+        for i in range(RESPEAKER_CHANNELS):
+            filtered_data[:, i] = lfilter(b, 1, npdata[:, i])
+
+def filter_bank(bank, chunks):
+    for npdata in chunks:
+        bank.process(npdata)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((RESPEAKER_RATE * SECONDS, RESPEAKER_CHANNELS)) * 3000).astype(np.int16)
+    chunks = [audio[i:i + CHUNK] for i in range(0, audio.shape[0], CHUNK)]
+
+    for method in ('direct', 'fft'):
+        print('{:6} max abs error vs offline: {:.2e}'.format(method, check_against_offline(method, audio[:RESPEAKER_RATE * 5], rng)))
+
+    print('{:18} {:>12} {:>10}'.format('implementation', 'us/chunk', 'realtime'))
+    runs = [('per-channel loop', per_channel_loop, (chunks,))]
+    for method in ('direct', 'fft'):
+        runs.append((method, filter_bank, (FIRFilterBank(b, RESPEAKER_CHANNELS, CHUNK, method=method), chunks)))
+    for name, func, args in runs:
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        print('{:18} {:12.1f} {:9.0f}x'.format(name, 1e6 * elapsed / len(chunks), SECONDS / elapsed))
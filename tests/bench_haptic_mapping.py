@@ -0,0 +1,46 @@
+"""
+Direction-to-haptics mapping: cost per update of the HapticPanner lookup table
+compared with evaluating the panning law for every estimate, single and batched,
+and the agreement between the two.
+
+Run from the tests folder: python bench_haptic_mapping.py
+"""
+import time
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from lib.haptic_mapping import HapticPanner, pan_weights
+
+UPDATES = 20000
+
+def per_update(func, angles, confidences):
+    start = time.perf_counter()
+    for angle, confidence in zip(angles, confidences):
+        func(angle, confidence)
+    return (time.perf_counter() - start) / len(angles)
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    angles = rng.uniform(0, 360, UPDATES).round()
+    confidences = rng.uniform(0.2, 1.0, UPDATES)
+
+    print('{:8} {:7} {:>14} {:>14} {:>14} {:>10}'.format('motors', 'law', 'direct [us]', 'table [us]', 'batch [us]', 'max diff'))
+    for num_motors in (4, 8, 16):
+        motor_angles = 360.0 * np.arange(num_motors) / num_motors
+        for law in ('pair', 'cosine'):
+            panner = HapticPanner(motor_angles, law=law)
+            direct = lambda angle, confidence: (pan_weights([angle], motor_angles, law)[0] * confidence * 255).astype(int)
+            t_direct = per_update(direct, angles[:2000], confidences[:2000])
+            t_table = per_update(panner.intensities, angles, confidences)
+            start = time.perf_counter()
+            batch = panner.intensities_batch(angles, confidences)
+            t_batch = (time.perf_counter() - start) / UPDATES
+            reference = (pan_weights(angles, motor_angles, law) * confidences[:, None] * 255).astype(int)
+            diff = np.abs(batch - reference).max()
+            print('{:8} {:7} {:14.2f} {:14.2f} {:14.3f} {:10}'.format(
+                num_motors, law, 1e6 * t_direct, 1e6 * t_table, 1e6 * t_batch, diff))
+            assert diff <= 1, 'lookup table differs from the panning law'
+            assert t_table < t_direct
+
+        panner.set_layout(motor_angles)
+        assert panner.builds == 1, 'table rebuilt without a layout change'
+    print('updates per second with the table: {:.0f}'.format(1 / t_table))
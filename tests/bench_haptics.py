@@ -0,0 +1,96 @@
+"""
+Haptic output over a fake multiplexed I2C bus: bus transactions of writing every
+motor on every DOA update (mux select + TOP_CTL2 write, as i2c_multiplexer.py does)
+compared with the HapticScheduler, which caches written intensities, groups writes
+by mux channel and runs at its own tick rate. Also checks that the final register
+state matches the last update, with and without injected bus errors, and that
+HapticMotorDriver skips unchanged writes per mux channel only.
+
+Run from the tests folder: python bench_haptics.py
+"""
+import time
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from fakedevices import FakeSMBus
+from lib.haptic_scheduler import HapticScheduler
+from lib.i2c_hapticmotordriver import HapticMotorDriver
+
+DRIVER_ADDRESS, TOP_CTL2 = HapticMotorDriver.DEVICE_ADDRESS, HapticMotorDriver.TOP_CTL2
+MUX_ADDRESS = HapticMotorDriver.Multiplexer_Address
+
+MOTORS = 8
+UPDATE_RATE = 100.0  # DOA updates per second
+TICK_RATE = 50.0
+SECONDS = 2.0
+LATENCY = 0.0001  # Seconds per simulated I2C transaction
+
+def intensities(t):
+    # A talker circling slowly; motors within 90 degrees of it vibrate, in 8 levels
+    direction = 40.0 * t
+    motor_angles = 360.0 * np.arange(MOTORS) / MOTORS
+    distance = np.abs((motor_angles - direction + 180) % 360 - 180)
+    return np.round(np.clip(1 - distance / 90, 0, 1) * 7).astype(int) * 36
+
+def updates():
+    for i in range(int(SECONDS * UPDATE_RATE)):
+        yield i / UPDATE_RATE, intensities(i / UPDATE_RATE)
+
+def naive():
+    bus = FakeSMBus(latency=LATENCY)
+    start = time.perf_counter()
+    for _, values in updates():
+        for motor, value in enumerate(values):
+            bus.write_byte(MUX_ADDRESS, 1 << motor)
+            bus.write_byte_data(DRIVER_ADDRESS, TOP_CTL2, int(value))
+    return bus, time.perf_counter() - start, values
+
+def scheduled(fail_every=None):
+    bus = FakeSMBus(latency=LATENCY, fail_every=fail_every)
+    scheduler = HapticScheduler(bus, range(MOTORS), rate=TICK_RATE).start()
+    set_time = 0.0
+    deadline = time.monotonic()
+    for _, values in updates():
+        t0 = time.perf_counter()
+        scheduler.set_all(values)
+        set_time += time.perf_counter() - t0
+        deadline += 1 / UPDATE_RATE
+        time.sleep(max(0.0, deadline - time.monotonic()))
+    scheduler.stop(silence=False)
+    for _ in range(10):
+        scheduler.flush()  # Let writes that failed on the last tick through
+    return bus, scheduler, set_time / (SECONDS * UPDATE_RATE), values
+
+def driver_per_channel():
+    # One HapticMotorDriver object moved between two mux channels by its caller
+    bus = FakeSMBus(registers={(c, DRIVER_ADDRESS, HapticMotorDriver.CHIP_REV_REG): HapticMotorDriver.EXPECTED_CHIP_REV
+                               for c in (0, 1)})
+    bus.write_byte(MUX_ADDRESS, 1 << 0)
+    hap = HapticMotorDriver(bus, channel=0)
+    hap.set_vibration(100)
+    bus.write_byte(MUX_ADDRESS, 1 << 1)
+    hap.channel = 1
+    hap.set_vibration(100)  # Same intensity, other motor: still written
+    writes = bus.transactions
+    hap.set_vibration(100)  # Unchanged on this channel: skipped
+    assert bus.transactions == writes
+    assert bus.registers[(0, DRIVER_ADDRESS, TOP_CTL2)] == bus.registers[(1, DRIVER_ADDRESS, TOP_CTL2)] == 100
+    print('HapticMotorDriver: unchanged writes skipped per mux channel')
+
+def final_state(bus):
+    return [bus.registers.get((motor, DRIVER_ADDRESS, TOP_CTL2)) for motor in range(MOTORS)]
+
+if __name__ == '__main__':
+    driver_per_channel()
+    bus, elapsed, last = naive()
+    print('naive:     {:6} transactions, {:.0f} ms of bus time per second of updates'.format(
+        bus.transactions, 1e3 * bus.transactions * LATENCY / SECONDS))
+
+    for fail_every in (None, 37):
+        bus, scheduler, set_cost, last = scheduled(fail_every)
+        stats = scheduler.stats()
+        label = 'scheduled' if fail_every is None else 'w/ errors'
+        print('{}: {:6} transactions ({} mux, {} register, {} errors), {} saved, set_all {:.1f} us'.format(
+            label, bus.transactions, stats['mux_writes'], stats['register_writes'], stats['bus_errors'],
+            stats['transactions_saved'], 1e6 * set_cost))
+        assert final_state(bus) == list(last), 'motor registers differ from the last update'
+        assert stats['mux_writes'] <= stats['ticks'] * MOTORS
@@ -0,0 +1,118 @@
+"""
+Overhead of the lib.metrics instrumentation: one timer (start/stop pair) and one
+counter, enabled and disabled, next to the per-chunk print it replaces, and the
+volumeDOA chunk path with metrics on and off. Also checks the rolling percentiles,
+the HTTP/JSON endpoint, the periodic JSON dump and the I2C error counter.
+
+Run from the tests folder: python bench_metrics.py
+"""
+import io
+import os
+import json
+import time
+import tempfile
+import contextlib
+import urllib.request
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from benchutil import ARRAYS, synthetic_recording
+from fakedevices import FakeSMBus
+from lib.metrics import Metrics, METRICS
+from lib.filterbank import FIRFilterBank
+from lib.haptic_scheduler import HapticScheduler
+from volumeDOA import process_chunk, b, RESPEAKER_CHANNELS, CHUNK
+
+N = 100000
+
+def per_call(func, n=N):
+    start = time.perf_counter()
+    func(n)
+    return (time.perf_counter() - start) / n
+
+def timers(metrics):
+    def run(n):
+        for _ in range(n):
+            t0 = metrics.start()
+            metrics.stop("stage", t0)
+            metrics.count("chunks")
+    return run
+
+def prints(n):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            print(f"Direction of arrival: Microphone Channel {i % 4 + 1}")
+
+def chunk_loop(audio, enabled):
+    METRICS.enabled = enabled
+    METRICS.reset()
+    bandpass = FIRFilterBank(b, RESPEAKER_CHANNELS, CHUNK)
+    start = time.perf_counter()
+    for pos in range(0, audio.shape[0] - CHUNK + 1, CHUNK):
+        process_chunk(audio[pos:pos + CHUNK], bandpass, 200000)
+        METRICS.count("chunks")
+    return time.perf_counter() - start
+
+def main():
+    print("Per call overhead (one timer + one counter)")
+    enabled = per_call(timers(Metrics(enabled=True)))
+    disabled = per_call(timers(Metrics(enabled=False)))
+    printed = per_call(prints, 20000)
+    print(f"  enabled        {1e6 * enabled:8.2f} us")
+    print(f"  disabled       {1e6 * disabled:8.2f} us")
+    print(f"  print (stdout) {1e6 * printed:8.2f} us  (to a buffer, a terminal is slower)")
+    assert disabled < enabled
+
+    audio = synthetic_recording(ARRAYS['4-mic'], 20.0)
+    chunk_loop(audio, True)  # Warm up
+    on = min(chunk_loop(audio, True) for _ in range(3))
+    snapshot = METRICS.snapshot()
+    off = min(chunk_loop(audio, False) for _ in range(3))
+    print(f"volumeDOA chunk path, 20 s of audio: metrics on {1e3 * on:.1f} ms, off {1e3 * off:.1f} ms "
+          f"({100 * (on - off) / off:+.1f}%)")
+    assert snapshot["counters"]["chunks"] == audio.shape[0] // CHUNK
+    assert snapshot["timers"]["filter"]["count"] + snapshot["counters"]["chunks.quiet"] == audio.shape[0] // CHUNK
+    print("  filter p50/p95/p99 [us]:", " ".join(f"{1e6 * snapshot['timers']['filter'][q]:.1f}" for q in ("p50", "p95", "p99")))
+
+    # Rolling percentiles only see the last `window` samples
+    metrics = Metrics(window=1000)
+    for value in np.random.default_rng(0).uniform(10, 20, 5000):
+        metrics.observe("old", value)
+    for value in range(2000):
+        metrics.observe("latency", value)
+    t = metrics.snapshot()["timers"]
+    assert abs(t["latency"]["p50"] - 1499.5) < 1 and abs(t["latency"]["p99"] - 1989.0) < 1
+    assert t["latency"]["count"] == 2000 and t["latency"]["max"] == 1999
+    assert 10 <= t["old"]["p50"] <= 20
+
+    # I2C bus errors of the scheduler end up in the shared registry
+    METRICS.enabled = True
+    METRICS.reset()
+    scheduler = HapticScheduler(FakeSMBus(fail_every=5), range(4))
+    for i in range(50):
+        scheduler.set_all([i % 256] * 4)
+        scheduler.flush()
+    snapshot = METRICS.snapshot()
+    assert snapshot["counters"]["i2c.errors"] == scheduler.bus_errors > 0
+    assert snapshot["timers"]["i2c.flush"]["count"] == 50
+
+    # Local endpoint and periodic dump
+    server = METRICS.serve(port=0)
+    port = server.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        served = json.loads(response.read())
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/") as response:
+        report = response.read().decode()
+    server.shutdown()
+    assert served["counters"]["i2c.errors"] == scheduler.bus_errors
+    assert "i2c.flush" in report
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "metrics.json")
+        stop = METRICS.dump_every(path, interval=0.05)
+        time.sleep(0.3)
+        stop.set()
+        with open(path) as f:
+            assert json.load(f)["timers"]["i2c.flush"]["count"] == 50
+    print("Percentiles, endpoint, dump and I2C error counter OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares ModeVector access speed and memory for precomputed, lazy (LRU band cache)
+and on-the-fly modes, replaying sweeps over frequency bins like a DOA estimator does:
+once over the full band and once over the 1 kHz band volumeDOA filters to.
+Then checks that SRP under a cache_bytes budget scores from the band cache,
+matching the full steering matrix without ever holding it.
+
+Run from the tests folder: python bench_modevector.py
+"""
+import time
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, SPEED_OF_SOUND, synthetic_stft
+from lib.srp import ModeVector, Grid, SRP
+
+NFFT = 512
+SWEEPS = 20
+
+def sweep(mv, bins):
+    # One pass over the bins, one bin at a time
+    for f in bins:
+        mv[f, :, :]
+
+def timed_sweeps(mv, bins):
+    sweep(mv, bins)  # warm up the cache
+    start = time.perf_counter()
+    for _ in range(SWEEPS):
+        sweep(mv, bins)
+    return (time.perf_counter() - start) / SWEEPS
+
+if __name__ == '__main__':
+    L = ARRAYS['6-mic']
+    grid = Grid(np.radians(np.arange(0, 360, 0.5)), np.radians(np.arange(10, 91, 10)))
+    n_freq = NFFT // 2 + 1
+    full_bytes = n_freq * L.shape[1] * grid.n_points * 16
+
+    configs = [
+        ('precompute c128', dict(precompute=True)),
+        ('precompute c64', dict(precompute=True, dtype=np.complex64)),
+        ('lazy 100% c64', dict(cache_bytes=full_bytes // 2, dtype=np.complex64)),
+        ('lazy 25% c64', dict(cache_bytes=full_bytes // 8, dtype=np.complex64)),
+        ('lazy 25% c128', dict(cache_bytes=full_bytes // 4)),
+        ('on the fly', dict()),
+    ]
+    print('grid points: {}, full complex128 tensor: {:.1f} MB'.format(grid.n_points, full_bytes / 2 ** 20))
+    band_bins = range(int(1000 * NFFT / RESPEAKER_RATE) + 1)
+    print('{:18} {:>10} {:>11} {:>12} {:>8} {:>8} {:>10}'.format(
+        'mode', 'init [s]', 'full [ms]', '<1kHz [ms]', 'hits', 'misses', 'mem [MB]'))
+    for name, kwargs in configs:
+        start = time.perf_counter()
+        mv = ModeVector(L, RESPEAKER_RATE, NFFT, SPEED_OF_SOUND, grid, **kwargs)
+        t_init = time.perf_counter() - start
+        t_full = timed_sweeps(mv, range(n_freq))
+        t_band = timed_sweeps(mv, band_bins)
+        info = mv.cache_info()
+        mem = mv.modeVec.nbytes if mv.modeVec is not None else info['bytes']
+        print('{:18} {:10.3f} {:11.2f} {:12.2f} {:8} {:8} {:10.1f}'.format(
+            name, t_init, 1e3 * t_full, 1e3 * t_band, info['hits'], info['misses'], mem / 2 ** 20))
+
+    # SRP under a budget: the same spectrum, and no steering tensor beyond the band cache
+    X = synthetic_stft(L, RESPEAKER_RATE, NFFT, 117.0, 16)
+    budget = full_bytes // 8
+    for label, kwargs in (('full band', dict()), ('top 24 bins', dict(freq_range=(300, 3500), bin_select='topk', num_bins=24))):
+        full = SRP(L, RESPEAKER_RATE, NFFT, azimuth=grid.azimuth[:grid.n_azimuth], **kwargs)
+        lazy = SRP(L, RESPEAKER_RATE, NFFT, azimuth=grid.azimuth[:grid.n_azimuth], cache_bytes=budget, **kwargs)
+        start = time.perf_counter()
+        doa = lazy.Mic_tuning_direction(X)
+        t_lazy = time.perf_counter() - start
+        assert doa == full.Mic_tuning_direction(X)
+        np.testing.assert_allclose(lazy.grid_values, full.grid_values, atol=1e-9)
+        assert lazy.steering is None and lazy.mode_vec.cache_info()['bytes'] <= budget
+        print('SRP {:12} lazy {:6.2f} ms, steering {:5.1f} MB -> band cache {:5.1f} MB'.format(
+            label, 1e3 * t_lazy, full.steering.nbytes / 2 ** 20, lazy.mode_vec.cache_info()['bytes'] / 2 ** 20))
@@ -0,0 +1,92 @@
+"""
+Compares the single-thread DSP path with the multi-process pipeline (capture,
+bandpass/STFT and DOA in separate processes joined by shared-memory rings):
+throughput as fast as possible, and end-to-end latency with a realtime source.
+Also checks the volume gate of the DSP process (volumeDOA.py / echo.py run --processes),
+and that the runtime of `echo.py run --processes` stops on time while the gate is closed.
+
+Run from the tests folder: python bench_mp_pipeline.py [recording.wav]
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import numpy as np
+from scipy.signal import firwin
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_recording, write_wav
+from lib.filterbank import FIRFilterBank
+from lib.stft import StreamingSTFT
+from lib.srp import SRP
+from lib.replay import wav_chunks
+from lib.mp_pipeline import ProcessPipeline, WavSource
+from lib.runtime import Runtime
+from volumeDOA import initial_volume_threshold
+
+RESPEAKER_CHANNELS = 6
+CHUNK = 1024
+NFFT = 512
+SECONDS = 30
+
+b = firwin(101, [50 / (RESPEAKER_RATE / 2), 1000 / (RESPEAKER_RATE / 2)], pass_zero=False)
+L = ARRAYS['4-mic']
+
+def single_thread(path):
+    bandpass = FIRFilterBank(b, RESPEAKER_CHANNELS, CHUNK)
+    stft = StreamingSTFT(RESPEAKER_CHANNELS, NFFT, channels=[1, 2, 3, 4], chunk=CHUNK)
+    srp = SRP(L, RESPEAKER_RATE, NFFT)
+    chunks = 0
+    start = time.perf_counter()
+    for data in wav_chunks(path, CHUNK):
+        X = stft.push(bandpass.process(data))
+        if X.shape[2]:
+            srp.Mic_tuning_direction(X)
+        chunks += 1
+    return chunks / (time.perf_counter() - start)
+
+def multi_process(path, realtime, volume_threshold=None, start_method=None):
+    with ProcessPipeline(WavSource(path, CHUNK, realtime), L, b, RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, NFFT,
+                         block_capture=not realtime, volume_threshold=volume_threshold,
+                         start_method=start_method) as pipeline:
+        for _ in pipeline.results(timeout=5.0):
+            pass
+        return pipeline.metrics()
+
+def quiet_runtime(path, duration=2.0):
+    # echo.py run --processes in a silent room: the gate is closed and no angle ever arrives
+    with ProcessPipeline(WavSource(path, CHUNK, realtime=True), L, b, RESPEAKER_RATE, RESPEAKER_CHANNELS, CHUNK, NFFT,
+                         volume_threshold=initial_volume_threshold, start_method='spawn') as pipeline:
+        start = time.monotonic()
+        stats = asyncio.run(Runtime(pipeline.angles, float).run(duration))
+        return time.monotonic() - start, stats['estimates']
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(tmp, 'audio1.wav')
+        if len(sys.argv) == 1:
+            write_wav(path, synthetic_recording(L, SECONDS))
+
+        print('cores: {}'.format(os.cpu_count()))
+        print('single thread : {:8.0f} chunks/s'.format(single_thread(path)))
+        metrics = multi_process(path, realtime=False)
+        print('multi process : {:8.0f} chunks/s, stage load {}'.format(
+            metrics['chunks_per_sec'], {k: round(v, 2) for k, v in metrics['load'].items()}))
+        results = metrics['results']
+
+        # Background noise sums to ~25000 per chunk and microphone, speech to millions.
+        # Spawned like the --processes mode of the apps
+        gated = multi_process(path, realtime=False, volume_threshold=100000, start_method='spawn')['results']
+        closed = multi_process(path, realtime=False, volume_threshold=1e12)['results']
+        print('volume gate   : {} of {} estimates kept, {} with the gate closed'.format(gated, results, closed))
+        assert 0 < gated < results and closed == 0
+
+        quiet = os.path.join(tmp, 'quiet.wav')
+        write_wav(quiet, np.zeros((SECONDS * RESPEAKER_RATE, RESPEAKER_CHANNELS), dtype=np.int16))
+        elapsed, estimates = quiet_runtime(quiet)
+        print('quiet runtime : stopped after {:.2f} s of 2 s, {} estimates'.format(elapsed, estimates))
+        assert elapsed < 3.0 and estimates == 0
+
+        metrics = multi_process(path, realtime=True)
+        print('realtime source: latency p50 {:.1f} ms, p95 {:.1f} ms, p99 {:.1f} ms, dropped {} of {} chunks'.format(
+            1e3 * metrics['latency_p50'], 1e3 * metrics['latency_p95'], 1e3 * metrics['latency_p99'],
+            metrics['dropped_chunks'], metrics['chunks'] + metrics['dropped_chunks']))
@@ -0,0 +1,74 @@
+"""
+MUSIC compared with SRP-PHAT: detection of two closely spaced talkers, and the
+latency of MUSIC on a stream of blocks with and without reusing the subspaces of
+bins whose running covariance barely changed, and MUSIC under a cache_bytes
+budget for its mode vectors.
+
+Run from the tests folder: python bench_music.py
+"""
+import time
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_stft, angle_error
+from lib.srp import SRP, MUSIC
+
+NFFT = 512
+FRAMES = 8
+TRIALS = 10
+TOLERANCE = 5.0
+BLOCKS = 200
+
+def resolved(estimator, truth, seed):
+    # Both talkers found within TOLERANCE by one estimate over FRAMES frames
+    X = synthetic_stft(estimator.L, RESPEAKER_RATE, NFFT, truth, FRAMES, seed=seed)
+    estimates = np.atleast_1d(np.asarray(estimator.Mic_tuning_direction(X), dtype=float))
+    if estimates.size == 0:
+        return False
+    errors = angle_error(estimates[:, None], np.asarray(truth)[None, :])
+    return bool(np.all(errors.min(axis=0) <= TOLERANCE))
+
+def stream(estimator, blocks, truth):
+    errors = np.empty(len(blocks))
+    start = time.perf_counter()
+    for i, X in enumerate(blocks):
+        errors[i] = angle_error(estimator.Mic_tuning_direction(X), truth[i])
+    return (time.perf_counter() - start) / len(blocks), errors
+
+if __name__ == '__main__':
+    for name, L in ARRAYS.items():
+        print('== {} =='.format(name))
+        kwargs = dict(numSrc=2, min_separation=np.radians(10))
+        estimators = {'srp': SRP(L, RESPEAKER_RATE, NFFT, **kwargs), 'music': MUSIC(L, RESPEAKER_RATE, NFFT, **kwargs)}
+        print('{:>12} {:>10} {:>10}'.format('separation', 'srp', 'music'))
+        for separation in (15, 20, 30, 45, 60):
+            truth = [50.0, 50.0 + separation]
+            rates = {key: np.mean([resolved(est, truth, 100 * separation + i) for i in range(TRIALS)])
+                     for key, est in estimators.items()}
+            print('{:>10.0f}deg {:>10.0%} {:>10.0%}'.format(separation, rates['srp'], rates['music']))
+            if separation >= 30:
+                assert rates['music'] == 1.0, 'MUSIC did not resolve talkers {} deg apart'.format(separation)
+
+        truth = 30.0 + 0.5 * np.arange(BLOCKS)
+        blocks = [synthetic_stft(L, RESPEAKER_RATE, NFFT, az, 4, snr_db=10.0, seed=i) for i, az in enumerate(truth)]
+        print('{:24} {:>12} {:>10} {:>10}'.format('streaming', 'decomposed', 'ms/block', 'mean err'))
+        for label, kwargs in [('srp per block', None), ('music per block', {}),
+                              ('music running, tol 0', dict(forget=0.9, subspace_tolerance=0.0)),
+                              ('music running, tol 0.1', dict(forget=0.9, subspace_tolerance=0.1)),
+                              ('music running, tol 0.3', dict(forget=0.9, subspace_tolerance=0.3)),
+                              ('music 1 MB mode vectors', dict(cache_bytes=2 ** 20))]:
+            estimator = SRP(L, RESPEAKER_RATE, NFFT) if kwargs is None else MUSIC(L, RESPEAKER_RATE, NFFT, **kwargs)
+            per_block, errors = stream(estimator, blocks, truth)
+            if kwargs is None:
+                decomposed = '-'
+            else:
+                decomposed = '{:.0%}'.format(estimator.bins_decomposed / (estimator.bins_decomposed + estimator.bins_reused))
+            print('{:24} {:>12} {:10.3f} {:10.1f}'.format(label, decomposed, 1e3 * per_block, errors.mean()))
+            assert errors.mean() < 5.0, '{} lost the source'.format(label)
+            if kwargs and 'cache_bytes' in kwargs:
+                # Band by band from the ModeVector cache, never the full tensor
+                assert estimator.steering is None and estimator.mode_vec.cache_info()['bytes'] <= kwargs['cache_bytes']
+
+        # The budget does not change the estimates
+        full, lazy = (MUSIC(L, RESPEAKER_RATE, NFFT, numSrc=2, refine_levels=2, **extra) for extra in ({}, dict(cache_bytes=2 ** 20)))
+        for i, X in enumerate(blocks[:20]):
+            np.testing.assert_array_equal(full.Mic_tuning_direction(X), lazy.Mic_tuning_direction(X))
+            np.testing.assert_allclose(lazy.grid_values, full.grid_values, rtol=1e-9)
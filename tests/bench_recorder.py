@@ -0,0 +1,113 @@
+"""
+Recording takes through lib.recorder.Recorder compared with the old audioTrain.py
+approach of collecting every chunk in a list and writing the WAV at the end:
+peak Python memory of a long 6-channel take, exact file contents (WAV, split
+parts, raw + sidecar), the frames lost between back-to-back takes on one open
+session, and reading one channel from a raw memory map vs decoding the WAV.
+
+Run from the tests folder: python bench_recorder.py
+"""
+import os
+import time
+import wave
+import tempfile
+import tracemalloc
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from benchutil import read_wav
+from fakedevices import FakeAudioStream
+from lib.capture import Capture
+from lib.recorder import Recorder, load_raw
+
+RATE = 16000
+CHANNELS = 6
+CHUNK = 1024
+SECONDS = 60
+
+def recording(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((int(seconds * RATE) // CHUNK * CHUNK, CHANNELS)) * 3000).astype(np.int16)
+
+def old_take(audio, path):
+    # record_audio of the old audioTrain.py, with the stream replaced by the array
+    frames = []
+    for pos in range(0, audio.shape[0], CHUNK):
+        frames.append(audio[pos:pos + CHUNK].tobytes())
+    wf = wave.open(path, 'wb')
+    wf.setnchannels(CHANNELS)
+    wf.setsampwidth(2)
+    wf.setframerate(RATE)
+    wf.writeframes(b''.join(frames))
+    wf.close()
+
+def capture(audio, speed=0):
+    # Lossless: the fake stream waits for the writer instead of dropping
+    return Capture(RATE, CHANNELS, CHUNK, slots=32, policy="block",
+                   open_stream=lambda callback: FakeAudioStream(callback, audio, CHUNK, RATE, speed))
+
+def new_take(audio, folder, **kwargs):
+    recorder = Recorder(capture(audio), folder, **kwargs)
+    done = recorder.record(audio.shape[0] / RATE)  # Armed before the stream starts, so it gets every frame
+    recorder.start()
+    done.wait()
+    recorder.close()
+    return recorder
+
+def peak_memory(func, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed, result
+
+def main():
+    audio = recording(SECONDS)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "old.wav")
+        old_peak, old_time, _ = peak_memory(old_take, audio, path)
+        new_peak, new_time, recorder = peak_memory(new_take, audio, folder)
+        print(f"{SECONDS} s take, {audio.nbytes / 1e6:.1f} MB of audio")
+        print(f"  list + write at end: peak {old_peak / 1e6:6.2f} MB, {1e3 * old_time:6.1f} ms")
+        print(f"  streaming recorder : peak {new_peak / 1e6:6.2f} MB, {1e3 * new_time:6.1f} ms")
+        assert new_peak < old_peak / 10
+        data, rate = read_wav(recorder.files[0])
+        assert rate == RATE and np.array_equal(data, audio)
+
+        # Parts of at most 7 s (or 1 MB) add up to the take
+        recorder = new_take(audio[:20 * RATE // CHUNK * CHUNK], folder, prefix="split", max_seconds=7)
+        parts = [read_wav(f)[0] for f in recorder.files]
+        print("  split by 7 s:", [os.path.basename(f) for f in recorder.files], [p.shape[0] / RATE for p in parts])
+        assert len(parts) == 3 and np.array_equal(np.concatenate(parts), audio[:20 * RATE // CHUNK * CHUNK])
+        recorder = new_take(audio[:20 * RATE // CHUNK * CHUNK], folder, prefix="mb", max_bytes=1e6)
+        parts = [read_wav(f)[0] for f in recorder.files]
+        assert all(p.nbytes <= 1e6 for p in parts) and np.array_equal(np.concatenate(parts), audio[:20 * RATE // CHUNK * CHUNK])
+
+        # Raw + sidecar: one channel straight from the memory map
+        recorder = new_take(audio, folder, prefix="raw", format="raw")
+        start = time.perf_counter()
+        data, header = load_raw(recorder.files[0])
+        channel = np.array(data[:, 3])
+        raw_time = time.perf_counter() - start
+        start = time.perf_counter()
+        channel_wav = read_wav(os.path.join(folder, "audio1.wav"))[0][:, 3].copy()
+        wav_time = time.perf_counter() - start
+        print(f"  one channel of {SECONDS} s: raw memmap {1e3 * raw_time:.1f} ms, WAV decode {1e3 * wav_time:.1f} ms")
+        assert header["frames"] == audio.shape[0] and header["channels"] == CHANNELS
+        assert np.array_equal(channel, audio[:, 3]) and np.array_equal(channel_wav, channel)
+        assert np.array_equal(load_raw(recorder.files[0], [1, 2, 3, 4])[0], audio[:, 1:5])
+
+        # Back-to-back takes on one realtime session
+        recorder = Recorder(capture(audio[:10 * RATE // CHUNK * CHUNK], speed=4), folder, prefix="take").start()
+        for _ in range(3):
+            recorder.record(0.5).wait()
+        recorder.close()
+        stats = recorder.stats()
+        lengths = [read_wav(f)[0].shape[0] for f in recorder.files]
+        print(f"  3 takes of 0.5 s: {lengths} frames, {stats['frames_discarded']} frames read outside takes, "
+              f"{stats['dropped_frames']} dropped")
+        assert lengths == [RATE // 2] * 3 and stats["dropped_frames"] == 0
+
+if __name__ == "__main__":
+    main()
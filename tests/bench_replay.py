@@ -0,0 +1,42 @@
+"""
+Regression benchmark of the replay harness: synthesizes a labeled 6-channel recording,
+replays it through the volumeDOA path and the SRP path without hardware, and fails
+when a pipeline runs slower than realtime or the SRP estimates drift off the labels.
+
+Run from the tests folder: python bench_replay.py [--min-realtime 5] [--min-accuracy 0.9]
+"""
+import os
+import sys
+import argparse
+import tempfile
+from benchutil import ARRAYS, synthetic_recording, write_wav
+import replay
+
+SECONDS = 30
+AZIMUTH = 135.0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--min-realtime', type=float, default=5.0)
+    parser.add_argument('--min-accuracy', type=float, default=0.9)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, 'audio1.wav')
+        labels = os.path.join(tmp, 'audio1.csv')
+        write_wav(recording, synthetic_recording(ARRAYS['4-mic'], SECONDS, AZIMUTH))
+        with open(labels, 'w') as f:
+            f.write('start_s,end_s,angle\n0,{},{}\n'.format(SECONDS, AZIMUTH))
+
+        for pipeline in ('volume', 'srp'):
+            print('== {} =='.format(pipeline))
+            report = replay.main([recording, '--pipeline', pipeline, '--labels', labels])
+            if report['realtime_factor'] < args.min_realtime:
+                failures.append('{} realtime factor {:.1f}'.format(pipeline, report['realtime_factor']))
+            if pipeline == 'srp' and (report.get('accuracy') or 0) < args.min_accuracy:
+                failures.append('srp accuracy {}'.format(report.get('accuracy')))
+
+    if failures:
+        print('FAILED: ' + ', '.join(failures))
+        sys.exit(1)
@@ -0,0 +1,128 @@
+"""
+The asyncio Runtime on fake devices: a realtime recording through the SRP path,
+board DOA reads over a fake USB device with control transfer latency, and haptic
+output over a fake multiplexed I2C bus, all in one process. Reports the rate every
+stage achieves, the capture-to-motor latency and how late the event loop wakes up
+(nothing blocking may run on it). Then checks backpressure (drop-oldest vs block
+with a slow DSP stage) and clean cancellation of a live, never-ending source.
+
+Run from the tests folder: python bench_runtime.py
+"""
+import time
+import asyncio
+import threading
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from benchutil import ARRAYS, synthetic_recording, angle_error
+from fakedevices import FakeUSBDevice, FakeSMBus, FakeChunkSource
+from lib.runtime import Runtime
+from lib.tuning import Tuning
+from lib.replay import StageTimer
+from lib.haptic_mapping import HapticPanner
+from lib.haptic_scheduler import HapticScheduler
+from lib.i2c_hapticmotordriver import HapticMotorDriver
+from replay import srp_pipeline
+
+AZIMUTH = 60.0
+BOARD_ANGLE = 200
+MOTOR_ANGLES = [0, 90, 180, 270]
+SECONDS = 5.0
+CHUNK = 1024
+
+def devices(usb_latency=0.002, i2c_latency=0.0002, fail_every=None):
+    tuning = Tuning(FakeUSBDevice(latency=usb_latency, values={(21, 0): BOARD_ANGLE}))
+    bus = FakeSMBus(latency=i2c_latency, fail_every=fail_every)
+    return tuning, bus, HapticScheduler(bus, range(len(MOTOR_ANGLES))), HapticPanner(MOTOR_ANGLES)
+
+async def loop_lag(period=0.01):
+    # How late the event loop wakes up a task that sleeps `period`
+    lags = []
+    try:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(period)
+            lags.append(time.perf_counter() - start - period)
+    except asyncio.CancelledError:
+        return lags
+
+async def run_with_probe(runtime, duration):
+    probe = asyncio.ensure_future(loop_lag())
+    stats = await runtime.run(duration)
+    probe.cancel()
+    return stats, await probe
+
+def motor_levels(bus):
+    return [bus.registers.get((motor, HapticMotorDriver.DEVICE_ADDRESS, HapticMotorDriver.TOP_CTL2)) for motor in range(len(MOTOR_ANGLES))]
+
+def combined(audio, follow):
+    tuning, bus, scheduler, panner = devices()
+    source = FakeChunkSource(audio, CHUNK)
+    srp = srp_pipeline(StageTimer())
+    angles = []
+
+    def process(chunk):
+        angle = srp(chunk)
+        if angle is not None:
+            angles.append(angle)
+        return angle
+
+    runtime = Runtime(source, process, tuning, scheduler, panner, follow=follow)
+    stats, lags = asyncio.run(run_with_probe(runtime, SECONDS))
+    print(f"follow {follow:5}: {stats['chunks_processed']} chunks ({stats['dropped_chunks']} dropped), "
+          f"{stats['estimates']} estimates, {stats['polls_per_sec']:.1f} polls/s, {stats['ticks_per_sec']:.1f} ticks/s, "
+          f"{stats['transactions']} I2C transactions")
+    print(f"              latency to the motors p50 {1e3 * stats['latency_p50']:.1f} ms, p95 {1e3 * stats['latency_p95']:.1f} ms; "
+          f"loop lag p95 {1e3 * np.percentile(lags, 95):.2f} ms, max {1e3 * max(lags):.2f} ms")
+    assert stats["dropped_chunks"] == 0 and stats["chunks_read"] == stats["chunks_processed"]
+    assert abs(stats["polls_per_sec"] - 10) < 1.5 and abs(stats["ticks_per_sec"] - 50) < 7
+    assert source.closed and motor_levels(bus) == [0] * len(MOTOR_ANGLES)  # Silenced on the way out
+    return runtime, angles
+
+def backpressure(audio, policy):
+    slow = lambda chunk: time.sleep(0.02)  # Slower than the unpaced source
+    source = FakeChunkSource(audio[:40 * CHUNK], CHUNK, speed=0)
+    runtime = Runtime(source, slow, queue_size=4, policy=policy)
+    stats = asyncio.run(runtime.run())
+    print(f"{policy:12}: read {stats['chunks_read']}, processed {stats['chunks_processed']}, "
+          f"dropped {stats['dropped_chunks']}, queue high water {stats['queue_high']}")
+    assert stats["queue_high"] <= 4
+    assert stats["chunks_read"] == stats["chunks_processed"] + stats["dropped_chunks"] == 40
+    return stats
+
+async def cancel_after(runtime, delay):
+    task = asyncio.ensure_future(runtime.run())
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return time.perf_counter() - start
+
+def main():
+    audio = synthetic_recording(ARRAYS['4-mic'], SECONDS, azimuth_deg=AZIMUTH)
+
+    runtime, angles = combined(audio, "audio")
+    assert len(angles) > 5 and np.median(angle_error(angles, AZIMUTH)) < 20
+    runtime, _ = combined(audio, "board")
+    assert runtime.rendered[0] == BOARD_ANGLE
+
+    dropped = backpressure(audio, "drop-oldest")
+    blocked = backpressure(audio, "block")
+    assert dropped["dropped_chunks"] > 0 and blocked["dropped_chunks"] == 0
+
+    # Cancelling run() of a live source that never ends, with a failing I2C bus
+    tuning, bus, scheduler, panner = devices(fail_every=7)
+    source = FakeChunkSource(audio, CHUNK, loop=True)
+    runtime = Runtime(source, srp_pipeline(StageTimer()), tuning, scheduler, panner)
+    threads = threading.active_count()
+    seconds = asyncio.run(cancel_after(runtime, 1.0))
+    stats = runtime.stats()
+    print(f"cancel      : stopped in {1e3 * seconds:.1f} ms, {stats['bus_errors']} bus errors counted, "
+          f"threads left {threading.active_count() - threads}")
+    assert source.closed and not [t for t in threading.enumerate() if t.name.startswith("runtime-")]
+    assert stats["bus_errors"] > 0 and seconds < 0.5
+
+if __name__ == "__main__":
+    main()
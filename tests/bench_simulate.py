@@ -0,0 +1,128 @@
+"""
+The array simulator: how fast it synthesizes multichannel audio, whether its
+fractional delays match the geometry, and the DOA accuracy of SRP, near-field
+mode vectors and volumeDOA.estimate_doa against its ground truth. Ends with a
+benchmark matrix of SRP over microphones x grid size x nfft on a moving source,
+reporting the time per estimate and the tracking error.
+
+Run from the tests folder: python bench_simulate.py
+"""
+import time
+import numpy as np
+import benchutil  # noqa: F401  (adds src to the path)
+from benchutil import ARRAYS, RESPEAKER_RATE, SPEED_OF_SOUND, circular_array, angle_error
+from lib.simulate import ArraySimulator, Source, sweep
+from lib.srp import SRP
+from lib.stft import StreamingSTFT
+import volumeDOA
+
+MATRIX_ARRAYS = dict(ARRAYS, **{'8-mic': circular_array(8, 0.0463)})
+GRID_SIZES = [90, 360, 720]
+NFFTS = [256, 512, 1024]
+WINDOW = 4096  # Samples per DOA estimate in the matrix
+
+def generation_speed():
+    print('{:8} {:>8} {:>12} {:>14}'.format('array', 'reverb', 'x realtime', 'audio h/min'))
+    sources = [Source(sweep(0, 180, 30)), Source(250, level_db=-6)]
+    for name, L in MATRIX_ARRAYS.items():
+        for rt60 in (None, 0.4):
+            sim = ArraySimulator(L, rt60=rt60)
+            start = time.perf_counter()
+            audio = sim.render(sources, 30.0)
+            factor = audio.shape[0] / RESPEAKER_RATE / (time.perf_counter() - start)
+            print('{:8} {:>8} {:12.0f} {:14.1f}'.format(name, str(rt60), factor, factor / 60))
+            assert audio.shape == (30 * RESPEAKER_RATE, L.shape[1]) and audio.dtype == np.int16
+            assert factor > 10
+
+def delay(x, y):
+    # Delay of y after x in samples, from the phase slope of the cross spectrum
+    X, Y = np.fft.rfft(x), np.fft.rfft(y)
+    f = np.fft.rfftfreq(x.shape[0], 1 / RESPEAKER_RATE)
+    band = (f > 100) & (f < 3000)
+    phase = np.unwrap(np.angle(Y[band] * np.conj(X[band])))
+    return -np.polyfit(2 * np.pi * f[band], phase, 1)[0] * RESPEAKER_RATE
+
+def fractional_delays():
+    L = ARRAYS['6-mic']
+    signal = np.random.default_rng(1).standard_normal(4 * RESPEAKER_RATE)
+    worst = 0.0
+    for azimuth in (0.0, 37.0, 161.5, 290.0):
+        audio = ArraySimulator(L, snr_db=None).render([Source(azimuth, signal=signal)], 3.0).astype(float)
+        direction = np.array([np.cos(np.radians(azimuth)), np.sin(np.radians(azimuth)), 0.0])
+        expected = (direction @ L[:, :1] - direction @ L) / SPEED_OF_SOUND * RESPEAKER_RATE
+        measured = [delay(audio[:, 0], audio[:, m]) for m in range(L.shape[1])]
+        worst = max(worst, np.max(np.abs(np.array(measured) - expected)))
+    # The source signal itself comes out aligned with the stream
+    lag = delay(signal[:audio.shape[0]], audio[:, 0]) + direction @ L[:, 0] / SPEED_OF_SOUND * RESPEAKER_RATE
+    print(f'fractional delays: worst error {worst:.4f} samples, source lag {lag:.4f} samples')
+    assert worst < 0.02 and abs(lag) < 0.02
+
+def streaming():
+    sim = ArraySimulator(ARRAYS['4-mic'], rt60=0.3, block_seconds=1.0)
+    sources = [Source(sweep(0, 90, 5))]
+    blocks = list(sim.blocks(sources, 5.3, num_channels=6, first_channel=1))
+    audio = np.concatenate(blocks)
+    print(f'streaming: {len(blocks)} blocks, {audio.shape[0]} samples')
+    sizes = [b.shape[0] for b in blocks]
+    assert sizes[:-1] == [sim.block] * (len(blocks) - 1) and sum(sizes) == int(5.3 * RESPEAKER_RATE)
+    assert np.all(audio[:, [0, 5]] == 0) and np.all(audio[:, 1:5].std(axis=0) > 100)
+    assert np.array_equal(audio, sim.render(sources, 5.3, 6, 1))  # Same seed, same stream
+
+def windows(audio, nfft, size=WINDOW):
+    # X of every non-overlapping window and the time of its center
+    stft = StreamingSTFT(audio.shape[1], nfft, chunk=size)
+    for start in range(0, audio.shape[0] - size + 1, size):
+        yield stft.push(audio[start:start + size]), (start + size / 2) / RESPEAKER_RATE
+
+def track(doa, audio, sources, nfft):
+    times, estimates, seconds = [], [], []
+    for X, t in windows(audio, nfft):
+        start = time.perf_counter()
+        estimates.append(doa.Mic_tuning_direction(X))
+        seconds.append(time.perf_counter() - start)
+        times.append(t)
+    errors = angle_error(estimates, ArraySimulator.truth(sources, times)[0])
+    return errors, np.median(seconds)
+
+def accuracy():
+    L = ARRAYS['4-mic']
+    # A moving talker in a reverberant room with diffuse noise
+    sources = [Source(sweep(20, 340, 20), talk_fraction=1.0)]
+    audio = ArraySimulator(L, rt60=0.4, seed=2).render(sources, 20.0)
+    errors, _ = track(SRP(L, RESPEAKER_RATE, 512), audio, sources, 512)
+    print(f'moving source, RT60 0.4 s: median error {np.median(errors):.1f}, p90 {np.percentile(errors, 90):.1f} degrees')
+    assert np.median(errors) < 10
+
+    # A talker 5 cm from the array: near-field mode vectors against the far-field model
+    for azimuth in (30.0, 200.0):
+        sources = [Source(azimuth, distance=0.05, talk_fraction=1.0)]
+        audio = ArraySimulator(L, mode='near', snr_db=30, seed=3).render(sources, 2.0, num_channels=6, first_channel=1)
+        X = StreamingSTFT(6, 512, channels=[1, 2, 3, 4], chunk=audio.shape[0]).push(audio)
+        far = SRP(L, RESPEAKER_RATE, 512).Mic_tuning_direction(X)
+        near = SRP(L, RESPEAKER_RATE, 512, mode='near', r=0.05).Mic_tuning_direction(X)
+        # The loudest microphone is the closest one (channel 1 is the microphone on the x axis)
+        nearest = np.argmin(angle_error(np.degrees(np.arctan2(L[1], L[0])), azimuth)) + 1
+        loudest = volumeDOA.estimate_doa(audio)
+        print(f'near field at {azimuth:g}: far-field SRP error {angle_error(far, azimuth):.1f}, '
+              f'near-field SRP error {angle_error(near, azimuth):.1f}, estimate_doa channel {loudest} (nearest {nearest})')
+        assert angle_error(near, azimuth) < 5 and loudest == nearest
+
+def matrix():
+    print('{:8} {:>6} {:>6} {:>12} {:>10} {:>10}'.format('array', 'grid', 'nfft', 'ms/estimate', 'median', 'p90'))
+    for name, L in MATRIX_ARRAYS.items():
+        sources = [Source(sweep(0, 360, 12), talk_fraction=1.0)]
+        audio = ArraySimulator(L, seed=4).render(sources, 12.0)
+        for size in GRID_SIZES:
+            azimuth = np.linspace(0, 2 * np.pi, size, endpoint=False)
+            for nfft in NFFTS:
+                errors, seconds = track(SRP(L, RESPEAKER_RATE, nfft, azimuth=azimuth), audio, sources, nfft)
+                print('{:8} {:6} {:6} {:12.2f} {:10.1f} {:10.1f}'.format(
+                    name, size, nfft, 1e3 * seconds, np.median(errors), np.percentile(errors, 90)))
+                assert np.median(errors) < 10
+
+if __name__ == '__main__':
+    generation_speed()
+    fractional_delays()
+    streaming()
+    accuracy()
+    matrix()
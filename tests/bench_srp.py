@@ -0,0 +1,41 @@
+"""
+Compares the vectorized SRP-PHAT engine with the original per-point, per-pair loop.
+
+Run from the tests folder: python bench_srp.py
+"""
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_stft, timeit, angle_error
+from lib.srp import SRP, tol
+
+NFFT = 512
+FRAMES = 16
+SOURCE_AZIMUTH = 117.0
+
+def loop_direction(srp, X):
+    # The original algorithm: recompute the TDOA and phase for every grid point and pair
+    srp_phat_spectrum = np.zeros(srp.grid.n_points)
+    for i in range(srp.grid.n_points):
+        accumulator = 0
+        for m in range(srp.num_mics - 1):
+            for n in range(m + 1, srp.num_mics):
+                tdoa = srp.mode_vec.tau[0, m, i] - srp.mode_vec.tau[0, n, i]
+                phase_diff = 2 * np.pi * srp.freq_bins * tdoa * srp.fs / srp.nfft
+                cross = X[m] * np.conj(X[n])
+                cross /= np.abs(cross) + tol
+                accumulator += np.real(np.sum(cross * np.exp(-1j * phase_diff)[:, None]))
+        srp_phat_spectrum[i] = accumulator
+    return np.degrees(srp.grid.azimuth[np.argmax(srp_phat_spectrum)]) % 360, srp_phat_spectrum
+
+if __name__ == '__main__':
+    print('{:8} {:>12} {:>12} {:>9} {:>10} {:>10}'.format('array', 'loop [ms]', 'vector [ms]', 'speedup', 'loop err', 'vec err'))
+    for name, L in ARRAYS.items():
+        srp = SRP(L, RESPEAKER_RATE, NFFT)
+        X = synthetic_stft(L, RESPEAKER_RATE, NFFT, SOURCE_AZIMUTH, FRAMES)
+        t_loop, (doa_loop, loop_spectrum) = timeit(loop_direction, srp, X, repeat=1)
+        t_vec, doa_vec = timeit(srp.Mic_tuning_direction, X)
+        # The vectorized spectrum is the loop's sum averaged over frames, bins and pairs
+        np.testing.assert_allclose(srp.grid_values, loop_spectrum / (FRAMES * srp.norm), rtol=1e-9, atol=1e-12)
+        assert doa_vec == doa_loop and angle_error(doa_vec, SOURCE_AZIMUTH) <= 1
+        print('{:8} {:12.1f} {:12.2f} {:8.0f}x {:10.1f} {:10.1f}'.format(
+            name, 1e3 * t_loop, 1e3 * t_vec, t_loop / t_vec,
+            angle_error(doa_loop, SOURCE_AZIMUTH), angle_error(doa_vec, SOURCE_AZIMUTH)))
@@ -0,0 +1,47 @@
+"""
+Compares the exhaustive SRP grid search with the coarse-to-fine search.
+
+Run from the tests folder: python bench_srp_search.py
+"""
+import numpy as np
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_stft, timeit, angle_error
+from lib.srp import SRP
+
+NFFT = 512
+FRAMES = 16
+TRIALS = 20
+
+GRIDS = {
+    'azimuth 1deg': dict(azimuth=np.radians(np.arange(0, 360, 1.0))),
+    'azimuth 0.5deg': dict(azimuth=np.radians(np.arange(0, 360, 0.5))),
+    'az 2deg x col 5deg': dict(azimuth=np.radians(np.arange(0, 360, 2.0)),
+                               colatitude=np.radians(np.arange(5, 95, 5.0))),
+}
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(1)
+    L = ARRAYS['6-mic']
+    print('{:20} {:>6} {:>6} {:>8} {:>10} {:>10} {:>8}'.format(
+        'grid', 'levels', 'peaks', 'scored', 'full [ms]', 'c2f [ms]', 'agree'))
+    for grid_name, grid in GRIDS.items():
+        full = SRP(L, RESPEAKER_RATE, NFFT, **grid)
+        for levels, peaks in ((2, 2), (3, 3), (4, 3)):
+            c2f = SRP(L, RESPEAKER_RATE, NFFT, refine_levels=levels, refine_peaks=peaks, **grid)
+            t_full = t_c2f = 0.0
+            agree = 0
+            for trial in range(TRIALS):
+                X = synthetic_stft(L, RESPEAKER_RATE, NFFT, rng.uniform(0, 360), FRAMES, seed=trial)
+                t, doa_full = timeit(full.Mic_tuning_direction, X, repeat=3)
+                t_full += t
+                t, doa_c2f = timeit(c2f.Mic_tuning_direction, X, repeat=3)
+                t_c2f += t
+                agree += angle_error(doa_full, doa_c2f) < 1e-6 and full.colatitude_recon == c2f.colatitude_recon
+                # Coarse-to-fine lands on the exhaustive maximum, at worst on a neighbouring grid point
+                az_step = np.degrees(grid['azimuth'][1] - grid['azimuth'][0])
+                assert angle_error(doa_full, doa_c2f) <= az_step + 1e-9
+                if 'colatitude' in grid:
+                    col_step = grid['colatitude'][1] - grid['colatitude'][0]
+                    assert abs(full.colatitude_recon - c2f.colatitude_recon) <= col_step + 1e-9
+            print('{:20} {:6} {:6} {:7.1%} {:10.2f} {:10.2f} {:4}/{}'.format(
+                grid_name, levels, peaks, c2f.points_scored / full.grid.n_points,
+                1e3 * t_full / TRIALS, 1e3 * t_c2f / TRIALS, agree, TRIALS))
@@ -0,0 +1,76 @@
+"""
+Startup cost of every echo.py mode, from `python -X importtime` of the modules the
+mode imports before it does any work. Fails when a mode pulls in a heavy module it
+does not need at import time (plotting, scipy, Tk, GPIO, I2C/USB of other modes),
+which is what made every launch on the Pi take seconds. For comparison the eager
+import set of the old scripts is timed too (only the parts installed here).
+
+Run from the tests folder: python bench_startup.py
+"""
+import os
+import sys
+import subprocess
+import importlib.util
+import benchutil  # noqa: F401  (adds src to the path)
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+REPEAT = 5
+
+HEAVY = {"matplotlib", "scipy", "tkinter", "gpiozero", "smbus", "smbus2", "usb", "pyaudio"}
+
+# Mode: what it imports before doing any work
+MODES = {
+    "cli (--help)": "import echo",
+    "board": "import boardDOA",
+    "volume": "import volumeDOA",
+    "replay": "import replay",
+    "tuning": "import lib.tuning",
+    "mux": "import lib.i2c_multiplexer",
+    "run": "import lib.runtime",
+}
+# Modes that must not even load numpy
+NO_NUMPY = {"cli (--help)", "tuning", "mux"}
+
+# Module-level imports of boardDOA.py, volumeDOA.py and i2c_multiplexer.py before the entry points
+EAGER = ["numpy", "scipy.signal", "usb.core", "usb.util", "matplotlib.pyplot", "gpiozero", "smbus", "smbus2", "tkinter"]
+
+def importtime(statement):
+    """
+    :return: Top-level cumulative import time in seconds, and the set of top-level packages loaded
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=SRC,
+                            capture_output=True, text=True, check=True)
+    total = 0.0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        packages.add(name.strip().split(".")[0])
+        if not name.startswith("  ", 1):
+            total += int(cumulative) * 1e-6  # Only the outermost imports, their children are included
+    return total, packages
+
+def best(statement):
+    runs = [importtime(statement) for _ in range(REPEAT)]
+    return min(t for t, _ in runs), runs[-1][1]
+
+def main():
+    available = [m for m in EAGER if importlib.util.find_spec(m.split(".")[0]) is not None]
+    eager, _ = best("; ".join("import " + m for m in available))
+    print(f"{'old eager imports':16} {1e3 * eager:8.1f} ms  ({', '.join(available)})")
+
+    failures = []
+    for mode, statement in MODES.items():
+        seconds, packages = best(statement)
+        forbidden = HEAVY | ({"numpy"} if mode in NO_NUMPY else set())
+        loaded = sorted(packages & forbidden)
+        print(f"{mode:16} {1e3 * seconds:8.1f} ms  {'loads ' + ', '.join(loaded) if loaded else 'OK'}")
+        if loaded:
+            failures.append((mode, loaded))
+    assert not failures, f"Modes import modules they only need later: {failures}"
+
+if __name__ == "__main__":
+    main()
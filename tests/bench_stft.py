@@ -0,0 +1,30 @@
+"""
+Throughput of the streaming STFT front-end on a synthetic 6-channel int16 stream,
+fed in CHUNK-sized byte blocks exactly as PyAudio delivers them.
+
+Run from the tests folder: python bench_stft.py
+"""
+import time
+import numpy as np
+from benchutil import RESPEAKER_RATE
+from lib.stft import StreamingSTFT
+
+RESPEAKER_CHANNELS = 6
+CHUNK = 1024
+SECONDS = 60
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((RESPEAKER_RATE * SECONDS, RESPEAKER_CHANNELS)) * 3000).astype(np.int16)
+    chunks = [audio[i:i + CHUNK].tobytes() for i in range(0, audio.shape[0], CHUNK)]
+
+    print('{:>6} {:>6} {:>9} {:>12} {:>10}'.format('nfft', 'hop', 'channels', 'frames/s', 'realtime'))
+    for nfft, hop in ((256, 128), (512, 256), (512, 128), (1024, 512)):
+        for channels in (None, [1, 2, 3, 4]):
+            stft = StreamingSTFT(RESPEAKER_CHANNELS, nfft, hop, channels=channels, chunk=CHUNK)
+            start = time.perf_counter()
+            for X in stft.stream(chunks):
+                pass
+            elapsed = time.perf_counter() - start
+            print('{:6} {:6} {:>9} {:12.0f} {:9.0f}x'.format(
+                nfft, hop, 'all' if channels is None else '1-4', stft.frames_out / elapsed, SECONDS / elapsed))
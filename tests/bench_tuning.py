@@ -0,0 +1,49 @@
+"""
+Counts USB control transfers of the Tuning register layer against a fake device:
+a monitoring loop polling DOAANGLE, VOICEACTIVITY, SPEECHDETECTED and AGCGAIN,
+the full -r dump, and write-through of cached values.
+
+Run from the tests folder: python bench_tuning.py
+"""
+import time
+import benchutil  # noqa: F401  (adds src to the path)
+from fakedevices import FakeUSBDevice
+from lib.tuning import Tuning, PARAMETERS
+
+MONITORED = ['DOAANGLE', 'VOICEACTIVITY', 'SPEECHDETECTED', 'AGCGAIN']
+POLLS = 200
+LATENCY = 0.0005  # Seconds per simulated control transfer
+
+def poll_individually(mic):
+    for _ in range(POLLS):
+        for name in MONITORED:
+            mic.read(name)
+
+def poll_snapshot(mic):
+    for _ in range(POLLS):
+        mic.snapshot(MONITORED)
+
+if __name__ == '__main__':
+    runs = [
+        ('read() per name, no cache', Tuning(FakeUSBDevice(LATENCY), ttl={}), poll_individually),
+        ('snapshot(), TTL cache', Tuning(FakeUSBDevice(LATENCY)), poll_snapshot),
+    ]
+    print('{:28} {:>10} {:>12}'.format('monitoring loop', 'transfers', 'time [ms]'))
+    for name, mic, func in runs:
+        start = time.perf_counter()
+        func(mic)
+        print('{:28} {:10} {:12.1f}'.format(name, mic.dev.ctrl_transfers, 1e3 * (time.perf_counter() - start)))
+
+    mic = Tuning(FakeUSBDevice())
+    mic.snapshot()
+    mic.snapshot()
+    assert mic.dev.ctrl_transfers == 2 * len(PARAMETERS) - len(mic.ttl)
+    print('two full dumps: {} transfers for {} parameters'.format(mic.dev.ctrl_transfers, len(PARAMETERS)))
+
+    # Write-through: the cached value is updated without another read
+    mic.write('AGCGAIN', 12.5)
+    before = mic.dev.ctrl_transfers
+    assert mic.read('AGCGAIN') == 12.5 and mic.dev.ctrl_transfers == before
+    mic.invalidate('AGCGAIN')
+    assert abs(mic.read('AGCGAIN') - 12.5) < 1e-5 and mic.dev.ctrl_transfers == before + 1
+    print('write-through OK')
@@ -0,0 +1,77 @@
+"""
+Duty cycle of the VAD-gated pipeline (bandpass, STFT and SRP only on voiced chunks)
+compared with processing every chunk, and a check that the gate closes on the
+silent stretches and opens on speech.
+
+Run from the tests folder: python bench_vad.py [recording.wav]
+Without a recording, a synthetic room recording with 30% talk time is used.
+"""
+import sys
+import time
+import numpy as np
+from scipy.signal import firwin
+from benchutil import ARRAYS, RESPEAKER_RATE, synthetic_recording, read_wav
+from lib.filterbank import FIRFilterBank
+from lib.stft import StreamingSTFT
+from lib.srp import SRP
+from lib.vad import EnergyVAD, GatedPipeline
+
+RESPEAKER_CHANNELS = 6
+CHUNK = 1024
+NFFT = 512
+
+b = firwin(101, [50 / (RESPEAKER_RATE / 2), 1000 / (RESPEAKER_RATE / 2)], pass_zero=False)
+
+def make_pipeline(gate):
+    return GatedPipeline(
+        gate,
+        bandpass=FIRFilterBank(b, RESPEAKER_CHANNELS, CHUNK),
+        stft=StreamingSTFT(RESPEAKER_CHANNELS, NFFT, channels=[1, 2, 3, 4], chunk=CHUNK),
+        doa=SRP(ARRAYS['4-mic'], RESPEAKER_RATE, NFFT))
+
+def run(pipeline, audio):
+    # Also records which chunks went through the stages
+    opened = []
+    start = time.perf_counter()
+    for pos in range(0, audio.shape[0] - CHUNK + 1, CHUNK):
+        active = pipeline.active
+        pipeline.process(audio[pos:pos + CHUNK])
+        opened.append(pipeline.active > active)
+    return time.perf_counter() - start, opened
+
+def check_gate(audio, opened, hangover):
+    # Speech is thousands of int16 units above the background noise of the synthetic recording
+    rms = [np.sqrt(np.mean(audio[pos:pos + CHUNK, 1].astype(float) ** 2))
+           for pos in range(0, audio.shape[0] - CHUNK + 1, CHUNK)]
+    talking = np.array(rms) > 1000
+    silent = np.array(rms) < 100
+    # Silent chunks right after speech are legitimately kept open by the hangover
+    recent = np.convolve(talking, np.ones(hangover + 1), mode='full')[:talking.shape[0]] > 0
+    opened = np.array(opened)
+    closed_silent = np.mean(~opened[silent & ~recent])
+    open_talking = np.mean(opened[talking])
+    print('gate closed on {:.1%} of silent chunks, open on {:.1%} of talking chunks'.format(closed_silent, open_talking))
+    assert silent.sum() > 100 and closed_silent > 0.99 and open_talking > 0.85
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        audio, _ = read_wav(sys.argv[1])
+    else:
+        audio = synthetic_recording(ARRAYS['4-mic'], 60)
+    seconds = audio.shape[0] / RESPEAKER_RATE
+
+    ungated = make_pipeline(lambda chunk: True)
+    gated = make_pipeline(EnergyVAD())
+    t_all, _ = run(ungated, audio)
+    t_gated, opened = run(gated, audio)
+
+    stats = gated.stats()
+    print('recording: {:.0f} s, {} chunks'.format(seconds, stats['chunks']))
+    print('duty cycle: {:.1%} ({} voiced chunks incl. hangover)'.format(stats['duty_cycle'], stats['active']))
+    print('gate cost: {:.1f} us/chunk'.format(1e6 * stats['stage_seconds']['gate'] / stats['chunks']))
+    print('{:10} {:>10} {:>10}'.format('pipeline', 'time [s]', 'realtime'))
+    for name, t in (('ungated', t_all), ('gated', t_gated)):
+        print('{:10} {:10.3f} {:9.0f}x'.format(name, t, seconds / t))
+    print('estimated time saved by the gate: {:.3f} s ({:.0%})'.format(stats['saved_seconds'], 1 - t_gated / t_all))
+    if len(sys.argv) == 1:
+        check_gate(audio, opened, gated.hangover)
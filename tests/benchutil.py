@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Benchmarks run from the tests folder, the DSP code lives in src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+RESPEAKER_RATE = 16000
+SPEED_OF_SOUND = 343.0
+
+def circular_array(num_mics, radius):
+    """
+    Microphone positions of a uniform circular array in the xy plane, shape (3, num_mics).
+    """
+    angles = 2 * np.pi * np.arange(num_mics) / num_mics
+    return np.vstack((radius * np.cos(angles), radius * np.sin(angles), np.zeros(num_mics)))
+
+# ReSpeaker 4-mic array and a 6-mic circular array of the same family
+ARRAYS = {
+    '4-mic': circular_array(4, 0.032),
+    '6-mic': circular_array(6, 0.0463),
+}
+
+def synthetic_stft(L, fs, nfft, azimuth_deg, num_frames, snr_db=20.0, seed=0):
+    """
+    Frequency-domain frames of far-field white noise sources arriving from the given azimuths.
+
+    :return: X of shape (num_mics, nfft // 2 + 1, num_frames)
+    """
+    rng = np.random.default_rng(seed)
+    omega = 2 * np.pi * fs * np.arange(nfft // 2 + 1) / nfft
+    X = np.zeros((L.shape[1], omega.shape[0], num_frames), dtype=complex)
+    for az in np.atleast_1d(azimuth_deg):
+        direction = np.array([np.cos(np.radians(az)), np.sin(np.radians(az)), 0.0])
+        tau = direction @ L / SPEED_OF_SOUND
+        S = rng.standard_normal((omega.shape[0], num_frames)) + 1j * rng.standard_normal((omega.shape[0], num_frames))
+        X += np.exp(1j * omega[None, :, None] * tau[:, None, None]) * S[None]
+    noise = rng.standard_normal(X.shape) + 1j * rng.standard_normal(X.shape)
+    X += noise * 10 ** (-snr_db / 20) * np.sqrt(len(np.atleast_1d(azimuth_deg)))
+    return X
+
+def timeit(func, *args, repeat=5):
+    """
+    Best wall-clock time of func(*args) in seconds, together with its last result.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def angle_error(a, b):
+    """
+    Absolute angular distance in degrees, wrapped to [0, 180].
+    """
+    return np.abs((np.asarray(a) - np.asarray(b) + 180) % 360 - 180)
+
+def synthetic_recording(L, seconds, azimuth_deg=60.0, talk_fraction=0.3, fs=RESPEAKER_RATE, num_channels=6, first_mic=1, seed=0):
+    """
+    Interleaved int16 recording laid out like the ReSpeaker stream: speech-like bursts
+    (syllable-rate modulated noise) from one far-field direction on channels
+    first_mic..first_mic + num_mics - 1, with low background noise everywhere.
+
+    :return: Array of shape (samples, num_channels)
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fs)
+    t = np.arange(n) / fs
+
+    # Talk spurts of 0.5 to 2 s separated by pauses, about talk_fraction of the time
+    active = np.zeros(n, dtype=bool)
+    pos = 0
+    while pos < n:
+        talk = int(rng.uniform(0.5, 2.0) * fs)
+        pause = int(talk * (1 - talk_fraction) / talk_fraction * rng.uniform(0.5, 1.5))
+        active[pos:pos + talk] = True
+        pos += talk + pause
+    envelope = active * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1 / fs)
+    spectrum[(freqs < 100) | (freqs > 3500)] = 0
+    direction = np.array([np.cos(np.radians(azimuth_deg)), np.sin(np.radians(azimuth_deg)), 0.0])
+    tau = direction @ L / SPEED_OF_SOUND
+
+    audio = rng.standard_normal((n, num_channels)) * 30
+    for m in range(L.shape[1]):
+        # Fractional far-field delay applied in the frequency domain
+        delayed = np.fft.irfft(spectrum * np.exp(2j * np.pi * freqs * tau[m]), n)
+        audio[:, first_mic + m] += 8000 * envelope * delayed / np.std(delayed)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+def read_wav(path):
+    """
+    Reads a multichannel int16 WAV recorded by audioTrain.py.
+
+    :return: Array of shape (samples, channels) and the sampling rate
+    """
+    import wave
+    with wave.open(path, 'rb') as wf:
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        return data.reshape(-1, wf.getnchannels()), wf.getframerate()
+
+def write_wav(path, audio, fs=RESPEAKER_RATE):
+    """
+    Writes a (samples, channels) int16 array as a WAV file, like audioTrain.py does.
+    """
+    import wave
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(audio.shape[1])
+        wf.setsampwidth(2)
+        wf.setframerate(fs)
+        wf.writeframes(np.ascontiguousarray(audio, dtype=np.int16).tobytes())
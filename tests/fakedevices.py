@@ -0,0 +1,162 @@
+import struct
+import time
+import threading
+import numpy as np
+
+class FakeUSBDevice:
+    """
+    Stands in for the ReSpeaker usb.core.Device: answers Tuning's control transfers
+    from a register table, counts them and optionally sleeps to mimic USB latency.
+    """
+
+    def __init__(self, latency=0.0, values=None):
+        self.latency = latency
+        self.values = dict(values or {})  # (id, offset): value, or a function returning it
+        self.ctrl_transfers = 0
+
+    def ctrl_transfer(self, bmRequestType, bRequest, wValue, wIndex, data_or_wLength, timeout=None):
+        self.ctrl_transfers += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if bmRequestType & 0x80 == 0:
+            # Write: offset, value, type
+            offset, = struct.unpack(b'i', bytes(data_or_wLength[:4]))
+            kind, = struct.unpack(b'i', bytes(data_or_wLength[8:]))
+            fmt = b'iii' if kind == 1 else b'ifi'
+            self.values[(wIndex, offset)] = struct.unpack(fmt, bytes(data_or_wLength))[1]
+            return len(data_or_wLength)
+        if data_or_wLength == 1:
+            return np.array([1], dtype=np.uint8)
+        value = self.values.get((wIndex, wValue & 0x3F), 0)
+        if callable(value):
+            value = value()
+        if wValue & 0x40:
+            response = struct.pack(b'ii', int(value), 0)
+        else:
+            # Float parameters come back as mantissa * 2 ** exponent
+            response = struct.pack(b'ii', int(round(value * 2 ** 20)), -20)
+        return np.frombuffer(response, dtype=np.uint8)
+
+class FakeAudioStream:
+    """
+    Stands in for a PyAudio callback-mode stream: a thread plays an int16 recording
+    back through the callback chunk by chunk, at `speed` times realtime (0 for as
+    fast as possible). Every `overflow_every`-th callback is flagged as an input overflow.
+    """
+
+    def __init__(self, callback, audio, chunk=1024, rate=16000, speed=1.0, overflow_every=None):
+        self.callback = callback
+        self.audio = np.ascontiguousarray(audio, dtype=np.int16)
+        self.chunk = chunk
+        self.rate = rate
+        self.speed = speed
+        self.overflow_every = overflow_every
+        self._stop = False
+        self._thread = None
+
+    @classmethod
+    def from_wav(cls, callback, path, chunk=1024, speed=1.0):
+        import wave
+        with wave.open(path, 'rb') as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).reshape(-1, wf.getnchannels())
+            return cls(callback, audio, chunk, wf.getframerate(), speed)
+
+    def _run(self):
+        period = self.chunk / self.rate / self.speed if self.speed else 0
+        deadline = time.monotonic()
+        for i, pos in enumerate(range(0, self.audio.shape[0] - self.chunk + 1, self.chunk)):
+            if self._stop:
+                break
+            flags = 0x2 if self.overflow_every and (i + 1) % self.overflow_every == 0 else 0
+            self.callback(self.audio[pos:pos + self.chunk].tobytes(), self.chunk, {}, flags)
+            if period:
+                deadline += period
+                time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def start_stream(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def is_active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop_stream(self):
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+class FakeChunkSource:
+    """
+    Stands in for mp_pipeline.CaptureSource: a callable returning a generator of
+    (chunk, channels) int16 chunks of a recording, paced at `speed` times realtime
+    (0 for as fast as possible), looping forever when `loop` is set. Records how
+    many chunks were handed out and whether the generator was closed.
+    """
+
+    def __init__(self, audio, chunk=1024, rate=16000, speed=1.0, loop=False):
+        self.audio = np.ascontiguousarray(audio, dtype=np.int16)
+        self.chunk = chunk
+        self.rate = rate
+        self.speed = speed
+        self.loop = loop
+        self.chunks = 0
+        self.closed = False
+
+    def __call__(self):
+        period = self.chunk / self.rate / self.speed if self.speed else 0
+        deadline = time.monotonic()
+        try:
+            while True:
+                for pos in range(0, self.audio.shape[0] - self.chunk + 1, self.chunk):
+                    if period:
+                        deadline += period
+                        time.sleep(max(0.0, deadline - time.monotonic()))
+                    self.chunks += 1
+                    yield self.audio[pos:pos + self.chunk]
+                if not self.loop:
+                    break
+        finally:
+            self.closed = True
+
+class FakeSMBus:
+    """
+    Stands in for smbus/smbus2.SMBus with TCA9548A-multiplexed devices: remembers the
+    selected mux channel and the registers of every (channel, address), logs each
+    transaction and optionally sleeps per transaction or fails every n-th one.
+    """
+
+    def __init__(self, mux_address=0x70, latency=0.0, fail_every=None, registers=None):
+        self.mux_address = mux_address
+        self.latency = latency
+        self.fail_every = fail_every
+        self.registers = dict(registers or {})  # (channel, address, register): value
+        self.channel = None
+        self.log = []
+        self.transactions = 0
+
+    def _transaction(self, entry):
+        self.transactions += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and self.transactions % self.fail_every == 0:
+            raise OSError(121, 'Remote I/O error')
+        self.log.append(entry)
+
+    def write_byte(self, address, value):
+        self._transaction(('write_byte', address, value))
+        if address == self.mux_address:
+            self.channel = value.bit_length() - 1 if value else None
+
+    def write_byte_data(self, address, register, value):
+        self._transaction(('write_byte_data', address, register, value))
+        self.registers[(self.channel, address, register)] = value
+
+    def read_byte_data(self, address, register):
+        self._transaction(('read_byte_data', address, register))
+        return self.registers.get((self.channel, address, register), 0)
+
+    def close(self):
+        pass